@@ -1,5 +1,6 @@
 import numpy as np
 from stats.helpers import stars_from_p, assign_letters_from_pairwise
+from stats.pairwise import PairwiseMatrix
 
 def _draw_bracket(ax, x1, x2, y, h, text, fontsize):
     ax.plot([x1,x1],[y-h,y], linewidth=1.2, color='black')
@@ -8,6 +9,21 @@ def _draw_bracket(ax, x1, x2, y, h, text, fontsize):
     if text:
         ax.text((x1+x2)/2.0, y + (h*0.2), text, ha='center', va='bottom', fontsize=fontsize, fontweight='bold')
 
+def _as_matrix(labels, pmap_pairwise, pmap_vs_control, control):
+    """PairwiseMatrix alinhada a labels (aceita também os dicts antigos)."""
+    if isinstance(pmap_pairwise, PairwiseMatrix):
+        pm = pmap_pairwise.reindex(labels)
+    else:
+        pm = PairwiseMatrix.from_dict(pmap_pairwise or {}, labels=labels)
+    if pmap_vs_control and control is not None and str(control) in pm.index:
+        c = pm.index[str(control)]
+        for g, p in pmap_vs_control.items():
+            j = pm.index.get(str(g))
+            if j is not None and p is not None:
+                pm.p[c, j] = pm.p[j, c] = float(p)
+        pm.control = str(control)
+    return pm
+
 def annotate_significance(
     ax,
     labels,
@@ -25,15 +41,14 @@ def annotate_significance(
     Adiciona brackets entre pares significativos ou controle vs others.
     labels: list of group labels (in order)
     means_arr, sem_arr: numpy arrays same length as labels
-    pmap_pairwise: dict[frozenset({g1,g2})] -> p
-    pmap_vs_control: dict[str(group)] -> p  (control is key used separately)
+    pmap_pairwise: PairwiseMatrix (ou o dict antigo frozenset({g1,g2}) -> p)
+    pmap_vs_control: dict[str(group)] -> p  (opcional, formato antigo; uma
+        PairwiseMatrix com control definido já traz essas comparações)
     bracket_scope: 'control' or 'all'
     """
     ymin, ymax = ax.get_ylim()
     yrange = ymax - ymin if ymax - ymin > 0 else max(np.abs(means_arr.max()),1.0)
     base_offset = yrange * 0.05
-    x_positions = np.arange(len(labels))
-    label_to_x = {str(l): x_positions[i] for i,l in enumerate(labels)}
     bracket_levels = []
 
 
@@ -45,45 +60,18 @@ def annotate_significance(
         bracket_levels.append(y)
         return y
 
-    comps = []
-    method_all = (bracket_scope == 'all')
-    # all pairwise
-    if method_all:
-        for key,p in pmap_pairwise.items():
-            if p is None: continue
-            try:
-                if float(p) < alpha:
-                    a,b = list(key)
-                    if str(a) in label_to_x and str(b) in label_to_x:
-                        comps.append((label_to_x[str(a)], label_to_x[str(b)], float(p)))
-            except:
-                continue
+    pm = _as_matrix(labels, pmap_pairwise, pmap_vs_control, control)
+
+    # pares significativos (triângulo superior, já na ordem das barras).
+    # Com controle e escopo 'control' não há brackets: as estrelas acima de
+    # cada barra (bloco abaixo) mostram as comparações com o controle.
+    if bracket_scope == 'all' or control is None:
+        x1s, x2s, pvals = pm.pairs(alpha)
     else:
-        # control comparisons: for Dunnett-like tests prefer showing stars above
-        # each bar rather than drawing brackets between control and others.
-        # We'll skip adding bracket comps here and rely on the stars block
-        # below which plots significance symbols directly above the affected bars.
-        if control is not None:
-            # no-op here (stars will be drawn later using pmap_vs_control)
-            pass
-        # (no further fallback here)
-        else:
-            # fallback: draw any significant pair from pairwise map
-            for key,p in pmap_pairwise.items():
-                if p is None: continue
-                try:
-                    if float(p) < alpha:
-                        a,b = list(key)
-                        if str(a) in label_to_x and str(b) in label_to_x:
-                            comps.append((label_to_x[str(a)], label_to_x[str(b)], float(p)))
-                except:
-                    continue
-    # normalize and sort to reduce overlaps (shorter spans first)
-    comps_norm = []
-    for a,b,p in comps:
-        x1 = min(a,b); x2 = max(a,b)
-        comps_norm.append((x1,x2,p))
-    comps_norm.sort(key=lambda t: (t[1]-t[0], t[0]))
+        x1s = x2s = pvals = np.array([], dtype=int)
+    # shorter spans first to reduce overlaps
+    order = np.lexsort((x1s, x2s - x1s))
+    comps_norm = list(zip(x1s[order], x2s[order], pvals[order]))
 
     for x1_idx, x2_idx, pval in comps_norm:
         top1 = means_arr[int(x1_idx)] + sem_arr[int(x1_idx)]
@@ -100,16 +88,10 @@ def annotate_significance(
 
     # Additionally, for control comparisons (e.g., Dunnett), show stars directly above each bar
     try:
-        if pmap_vs_control:
-            for i, lab in enumerate(labels):
-                key = str(lab)
-                p = pmap_vs_control.get(key, None)
-                if p is None:
-                    # maybe pairwise contains the frozenset
-                    kset = frozenset({str(control), str(lab)}) if control is not None else None
-                    if kset is not None:
-                        p = pmap_pairwise.get(kset, None)
-                s = stars_from_p(p)
+        c = pm.index.get(pm.control) if pm.control is not None else None
+        if c is not None and (~np.isnan(np.delete(pm.p[c], c))).any():
+            for i, p in enumerate(pm.p[c]):
+                s = stars_from_p(None if i == c or np.isnan(p) else float(p))
                 if s:
                     # stars slightly higher than letters to increase visibility
                     y = means_arr[i] + sem_arr[i] + (max(means_arr) - min(means_arr)) * 0.08
@@ -118,15 +100,14 @@ def annotate_significance(
     except Exception:
         pass
 
-    # Tukey letters: if we have pairwise pmap, create letters and plot above bars
+    # Tukey letters: if we have pairwise p-values, create letters and plot above bars
     try:
-        # ensure pairwise keys are stringified in helper
-        letters = assign_letters_from_pairwise([str(l) for l in labels], pmap_pairwise, alpha)
-        for i, lab in enumerate(labels):
-            txt = letters.get(str(lab), '')
+        letters = assign_letters_from_pairwise(pm.labels, pm, alpha)
+        for i, lab in enumerate(pm.labels):
+            txt = letters.get(lab, '')
             if txt:
                 # letters slightly above the error bar
                 y = means_arr[i] + sem_arr[i] + (max(means_arr) - min(means_arr)) * 0.05
                 ax.text(i, y, txt, ha='center', va='bottom', fontsize=fontsize, fontweight='bold')
     except Exception:
-        pass
\ No newline at end of file
+        pass
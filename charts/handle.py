@@ -0,0 +1,135 @@
+# graph_app/charts/handle.py
+"""
+Handle de um gráfico gerado por charts/plotter.py.
+
+Os plotters devolvem um ChartHandle com a figura e referências aos artistas
+(containers de barras, textos das anotações, legenda). Mudanças só
+cosméticas (título, rótulos dos eixos, tamanho da fonte, cor das barras,
+modo de cor) são aplicadas alterando esses artistas, sem refazer groupby,
+stripplot, layout das anotações nem criar outra Figure. matches() diz se os
+demais argumentos (dados, estatísticas, opções que mudam o desenho) são os
+mesmos do gráfico atual; se não forem, o gráfico deve ser gerado de novo.
+
+Uso:
+    chart = generate_barplot(df, "grupo", "valor", title="A")
+    chart.fig
+    if chart.matches(generate_barplot, **kwargs):
+        chart.update(**kwargs)          # só aplica as opções cosméticas
+    else:
+        chart = generate_barplot(**kwargs)
+"""
+
+import inspect
+
+import matplotlib.pyplot as plt
+import seaborn as sns
+from matplotlib.patches import Rectangle
+
+# argumentos dos plotters aplicados por update(), sem regerar o gráfico
+COSMETIC_OPTIONS = ("title", "xlabel", "ylabel", "fontsize", "bar_color", "color_mode", "colors")
+
+# argumentos comparados por valor em matches(); os demais (DataFrame,
+# GroupedData, PairwiseMatrix...) precisam ser o mesmo objeto
+_VALUE_TYPES = (str, int, float, bool, tuple, list, dict, type(None))
+
+
+def bar_palette(color_mode, bar_color, n):
+    """Cores das n barras: paleta Set2 alternada ou bar_color em todas."""
+    if color_mode == "Alternate":
+        return sns.color_palette("Set2", n)
+    return [bar_color] * n
+
+
+def group_colors(colors, n):
+    """Cores dos n grupos do gráfico agrupado (tab10 se colors não for dado)."""
+    if colors is None:
+        cmap = plt.get_cmap("tab10")
+        colors = [cmap(i) for i in range(n)]
+    return [colors[i % len(colors)] for i in range(n)]
+
+
+def _same(a, b) -> bool:
+    if a is b:
+        return True
+    return isinstance(a, _VALUE_TYPES) and type(a) is type(b) and a == b
+
+
+class ChartHandle:
+    """Figura + artistas de um gráfico, para atualizações cosméticas no lugar."""
+
+    def __init__(self, fig, ax, plotter, inputs, bars=(), annotations=(), legend_fontsize=None):
+        self.fig = fig
+        self.ax = ax
+        self.plotter = plotter          # nome da função de charts/plotter.py
+        self.inputs = dict(inputs)      # argumentos usados para gerar o gráfico
+        self.bars = list(bars)          # BarContainer(s), um por série
+        self.annotations = list(annotations)   # textos de significância
+        # tamanho da fonte da legenda em função de fontsize (None: legenda não acompanha)
+        self.legend_fontsize = legend_fontsize
+
+    def matches(self, plotter, *args, **kwargs) -> bool:
+        """True se plotter(*args, **kwargs) só difere deste gráfico em opções cosméticas."""
+        if plotter.__name__ != self.plotter:
+            return False
+        bound = inspect.signature(plotter).bind(*args, **kwargs)
+        bound.apply_defaults()
+        return all(_same(v, self.inputs.get(k)) for k, v in bound.arguments.items()
+                   if k not in COSMETIC_OPTIONS)
+
+    def update(self, **options):
+        """
+        Aplica as opções cosméticas que mudaram (as demais são ignoradas) e
+        retorna True se algo mudou; o canvas deve ser redesenhado depois.
+        """
+        changed = {k: v for k, v in options.items()
+                   if k in COSMETIC_OPTIONS and k in self.inputs and not _same(v, self.inputs[k])}
+        if not changed:
+            return False
+        self.inputs.update(changed)
+        ax, fontsize = self.ax, self.inputs["fontsize"]
+
+        # set_text e não set_title/set_xlabel, que voltariam a fonte ao padrão do rcParams
+        if "title" in changed:
+            ax.title.set_text(changed["title"])
+        if "xlabel" in changed:
+            ax.xaxis.label.set_text(changed["xlabel"])
+        if "ylabel" in changed:
+            ax.yaxis.label.set_text(changed["ylabel"])
+        if changed.keys() & {"bar_color", "color_mode", "colors"}:
+            self._recolor()
+        if "fontsize" in changed:
+            for text in [ax.title, ax.xaxis.label, ax.yaxis.label, *ax.get_xticklabels(), *self.annotations]:
+                text.set_fontsize(fontsize)
+            legend = ax.get_legend()
+            if legend is not None and self.legend_fontsize is not None:
+                for text in legend.get_texts():
+                    text.set_fontsize(self.legend_fontsize(fontsize))
+        if changed.keys() & {"title", "xlabel", "ylabel", "fontsize"}:
+            # o texto mudou de tamanho: só o layout é refeito
+            self.fig.tight_layout()
+        return True
+
+    def _recolor(self):
+        if "colors" in self.inputs:
+            palette = group_colors(self.inputs["colors"], len(self.bars))
+            for container, color in zip(self.bars, palette):
+                for patch in container:
+                    patch.set_facecolor(color)
+        elif self.bars:
+            patches = list(self.bars[0])
+            palette = bar_palette(self.inputs.get("color_mode"), self.inputs.get("bar_color"), len(patches))
+            for patch, color in zip(patches, palette):
+                patch.set_color(color)
+        else:
+            return
+        # a legenda copia a cor da primeira barra de cada série (entradas do stripplot ficam)
+        legend = self.ax.get_legend()
+        if legend is None:
+            return
+        handles = getattr(legend, "legend_handles", None) or getattr(legend, "legendHandles", [])
+        first = {c.get_label(): c.patches[0] for c in self.bars if len(c.patches)}
+        for handle, text in zip(handles, legend.get_texts()):
+            patch = first.get(text.get_text())
+            if patch is not None and isinstance(handle, Rectangle):
+                handle.set_facecolor(patch.get_facecolor())
+                handle.set_edgecolor(patch.get_edgecolor())
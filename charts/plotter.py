@@ -1,10 +1,32 @@
 import numpy as np
+import pandas as pd
 from matplotlib.figure import Figure
 import matplotlib.pyplot as plt
 import seaborn as sns
 from charts.annotations import annotate_significance
-from scipy.stats import ttest_ind
+from charts.handle import ChartHandle, bar_palette, group_colors
 from stats.helpers import stars_from_p
+from stats.native import welch_t
+from stats.grouped import grouped_for
+
+# modos de barra de erro aceitos pelos plotters
+ERROR_BAR_MODES = ("sem", "sd", "ci")
+
+
+def _error_bars(gd, mode, ci=0.95, seed=None):
+    """
+    (abaixo, acima) da média para cada célula do GroupedData:
+    'sem', 'sd' (simétricos) ou 'ci' (IC bootstrap da média, assimétrico).
+    """
+    if mode == "ci":
+        lwr, upr = gd.ci("mean", ci=ci, seed=seed)
+        return gd.mean - lwr, upr - gd.mean
+    if mode == "sd":
+        return gd.std, gd.std
+    if mode == "sem":
+        return gd.sem, gd.sem
+    raise ValueError(f"Unknown error bar mode: {mode}")
+
 
 def generate_barplot(
     df,
@@ -22,40 +44,46 @@ def generate_barplot(
     figsize=(8, 5),
     fontsize=10,
     bracket_scope='control',
-    color_mode="Unique"   # "Unique" ou "Alternate"
+    color_mode="Unique",   # "Unique" ou "Alternate"
+    grouped=None,
+    error_bars="sem",      # "sem", "sd" ou "ci" (IC bootstrap da média)
+    ci=0.95,
+    seed=None,
+    dpi=None
 ):
     """
-    Gera um barplot com barras de erro (SEM) e adiciona anotações de significância,
-    permitindo escolher cor única ou cores alternadas.
+    Gera um barplot com barras de erro (SEM, SD ou IC bootstrap) e adiciona
+    anotações de significância, permitindo escolher cor única ou cores alternadas.
+    grouped: GroupedData da análise (stats/grouped.py); se não for passado é construído aqui.
+    dpi: resolução de tela da figura (padrão do matplotlib); a de exportação é dada ao salvar.
+    Retorna ChartHandle (charts/handle.py), com a figura em .fig.
     """
-    fig = Figure(figsize=figsize, dpi=300)
+    inputs = dict(locals())  # argumentos do gráfico, para ChartHandle.matches()
+    fig = Figure(figsize=figsize, dpi=dpi)
     ax = fig.add_subplot(111)
 
     # estilo dos eixos
     ax.spines['top'].set_visible(False)
     ax.spines['right'].set_visible(False)
 
-    # dados básicos
-    grp = df.groupby(group_col)[value_col]
-    means = grp.mean()
-    sem = grp.sem()
-    labels = list(means.index)
+    # dados básicos (momentos já calculados no GroupedData)
+    gd = grouped_for(df, group_col, value_col, grouped)
+    keep = gd.n > 0
+    labels = list(gd.labels[keep])
+    means_arr = gd.mean[keep]
+    err_lo, err_hi = _error_bars(gd, error_bars, ci=ci, seed=seed)
+    err_lo, err_hi = np.nan_to_num(err_lo[keep]), np.nan_to_num(err_hi[keep])
     x = np.arange(len(labels))
 
-    # controle de cores
-    if color_mode == "Alternate":
-        # paleta alternada baseada no seaborn
-        palette = sns.color_palette("Set2", len(labels))
-    else:
-        # cor única
-        palette = [bar_color] * len(labels)
+    # controle de cores: paleta Set2 alternada ou cor única
+    palette = bar_palette(color_mode, bar_color, len(labels))
 
     # desenhar barras
-    bars = ax.bar(x, means.values, yerr=sem.values, capsize=6, label=value_col)
+    bars = ax.bar(x, means_arr, yerr=np.vstack([err_lo, err_hi]), capsize=6, label=value_col)
     for b, c in zip(bars, palette):
         b.set_color(c)
 
-    ax.set_ylim(0, means.values.max() * 1.2)
+    ax.set_ylim(0, means_arr.max() * 1.2)
     ax.set_xticks(x)
     ax.set_xticklabels(labels, rotation=45, ha='right', fontsize=fontsize)
     ax.set_ylabel(ylabel, fontsize=fontsize)
@@ -63,7 +91,9 @@ def generate_barplot(
     ax.set_title(title, fontsize=fontsize)
 
     # Pontos individuais
-    sns.stripplot(x=group_col, y=value_col, data=df, hue=group_col,
+    # mesmos rótulos (texto) e ordem das barras
+    points = df.assign(**{group_col: df[group_col].astype(str)})
+    sns.stripplot(x=group_col, y=value_col, data=points, hue=group_col, order=labels,
                   jitter=0.1, size=1, palette='dark:black', ax=ax, legend=show_legend)
 
     if show_legend:
@@ -73,18 +103,16 @@ def generate_barplot(
 
     fig.tight_layout()
 
-    # call annotations
-    pmap_pairwise = pmap_pairwise or {}
+    # call annotations (pmap_pairwise: PairwiseMatrix ou dict antigo)
     pmap_vs_control = pmap_vs_control or {}
-    means_arr = np.array(means.values)
-    sem_arr = np.array(sem.values)
 
+    n_texts = len(ax.texts)
     try:
         annotate_significance(
             ax=ax,
             labels=labels,
             means_arr=means_arr,
-            sem_arr=sem_arr,
+            sem_arr=err_hi,
             pmap_pairwise=pmap_pairwise,
             pmap_vs_control=pmap_vs_control,
             control=control,
@@ -96,7 +124,8 @@ def generate_barplot(
         # não interrompe a plotagem caso anotações falhem
         pass
 
-    return fig
+    return ChartHandle(fig, ax, "generate_barplot", inputs, bars=[bars],
+                       annotations=ax.texts[n_texts:], legend_fontsize=lambda fs: fs)
 
 
 def generate_barplot_ttest(
@@ -109,7 +138,9 @@ def generate_barplot_ttest(
     xlabel="",
     alpha=0.05,
     figsize=(8, 5),
-    fontsize=10
+    fontsize=10,
+    grouped=None,
+    dpi=None
 ):
     """
     Gera gráfico estilo t-test two-by-two:
@@ -118,30 +149,37 @@ def generate_barplot_ttest(
     - hue = group_col (ex: genotype)
     - error bars = SEM
     - asterisco acima das comparações significativas
+    Retorna ChartHandle (charts/handle.py), com a figura em .fig.
     """
-
-    # calcular estatísticas resumo
-    summary_stats = df.groupby([group_col, fator_col])[value_col].agg(['mean','sem']).reset_index()
-    summary_stats.rename(columns={'sem':'SE'}, inplace=True)
+    inputs = dict(locals())  # argumentos do gráfico, para ChartHandle.matches()
+
+    # calcular estatísticas resumo (células group_col x fator_col do GroupedData)
+    gd = grouped_for(df, group_col, value_col, grouped, fator_col=fator_col)
+    counts = gd.grid('n')
+    rows, cols = np.nonzero(counts > 0)
+    summary_stats = pd.DataFrame({
+        group_col: gd.levels[0][rows],
+        fator_col: gd.levels[1][cols],
+        'mean': gd.grid('mean')[rows, cols],
+        'SE': gd.grid('sem')[rows, cols],
+    })
+    df = df.assign(**{group_col: df[group_col].astype(str), fator_col: df[fator_col].astype(str)})
 
     # ordem dos fatores no eixo X
-    ordens = sorted(summary_stats[group_col].unique())
+    ordens = list(gd.levels[0][(counts > 0).any(axis=1)])
 
-    # mapa de significância (comparando entre grupos dentro de cada fator)
+    # mapa de significância (Welch entre os dois níveis de fator_col dentro de cada grupo)
     sig_map = {}
-    for fator in ordens:
-        sub = df[df[group_col] == fator]
-        groups = sub[fator_col].unique()
-        if len(groups) == 2:  # só funciona para dois grupos por fator
-            g1, g2 = groups
-            vals1 = sub[sub[fator_col] == g1][value_col]
-            vals2 = sub[sub[fator_col] == g2][value_col]
-            stat, pval = ttest_ind(vals1, vals2, equal_var=False)
-            if pval < alpha:
-                sig_map[fator] = "*" if pval < alpha else "ns"
+    two = (counts > 0).sum(axis=1) == 2  # só funciona para dois grupos por fator
+    for r in np.flatnonzero(two):
+        a, b = np.flatnonzero(counts[r] > 0)
+        n, m, v = counts[r], gd.grid('mean')[r], gd.grid('var')[r]
+        _, _, pval = welch_t(n[a], m[a], v[a], n[b], m[b], v[b])
+        if pval < alpha:
+            sig_map[gd.levels[0][r]] = "*"
 
     # criar figura
-    fig, ax = plt.subplots(figsize=figsize, dpi=300)
+    fig, ax = plt.subplots(figsize=figsize, dpi=dpi)
 
     # gráfico de barras
     sns.barplot(
@@ -187,6 +225,7 @@ def generate_barplot_ttest(
         ax.errorbar(x=x_pos, y=media, yerr=erro, fmt='none', c='black', capsize=5, linewidth=0.5)
 
     # adicionar significância entre as barras de cada fator
+    n_texts = len(ax.texts)
     for fator in ordens:
         sig = sig_map.get(fator, "")
         if sig and sig != "ns":
@@ -206,8 +245,8 @@ def generate_barplot_ttest(
 
     sns.despine()
     fig.tight_layout()
-
-    return fig
+    return ChartHandle(fig, ax, "generate_barplot_ttest", inputs, bars=ax.containers,
+                       annotations=ax.texts[n_texts:])
 
 def generate_multi_barplot(
     df,
@@ -222,61 +261,82 @@ def generate_multi_barplot(
     fontsize=10,
     colors=None,
     show_error=True,
-    show_std=False
+    show_std=False,
+    grouped=None,
+    error_bars=None,
+    ci=0.95,
+    seed=None,
+    dpi=None
 ):
     """
     Gera gráfico de barras agrupadas (grupos lado-a-lado por categoria),
-    desenha erro (SEM por padrão ou desvio padrão se show_std=True),
+    desenha erro (SEM por padrão ou desvio padrão se show_std=True; error_bars
+    = "sem"/"sd"/"ci" tem precedência, "ci" sendo o IC bootstrap da média),
     plota pontos individuais e adiciona anotações de significância (ttest
     entre pares de 'group_col' dentro de cada categoria de 'x_col').
 
-    Retorna matplotlib.figure.Figure
+    grouped: GroupedData com chaves [x_col, group_col] (stats/grouped.py), opcional.
+    dpi: resolução de tela da figura; a de exportação é dada ao salvar.
+
+    Retorna ChartHandle (charts/handle.py), com a figura em .fig.
     """
-    # agregações
-    means = df.groupby([x_col, group_col])[value_col].mean().unstack(fill_value=np.nan)
-    sem = df.groupby([x_col, group_col])[value_col].sem().unstack(fill_value=0)
-    std = df.groupby([x_col, group_col])[value_col].std().unstack(fill_value=0)
+    inputs = dict(locals())  # argumentos do gráfico, para ChartHandle.matches()
+    # momentos por célula (categoria x grupo) de uma vez; os t-tests usam os mesmos
+    gd = grouped_for(df, x_col, value_col, grouped, fator_col=group_col)
+    counts = gd.grid('n')
+    empty = counts == 0
+    means = np.where(empty, np.nan, gd.grid('mean'))
+    variances = gd.grid('var')
+    if error_bars is None and show_error:
+        error_bars = "sd" if show_std else "sem"
+    if error_bars:
+        lo, hi = _error_bars(gd, error_bars, ci=ci, seed=seed)
+        err_lo = np.where(empty, 0.0, np.nan_to_num(lo).reshape(gd.shape))
+        err_hi = np.where(empty, 0.0, np.nan_to_num(hi).reshape(gd.shape))
+    else:
+        err_lo = err_hi = np.zeros(gd.shape)
 
-    labels = list(means.index)
-    groups = list(means.columns)
+    labels = list(gd.levels[0])
+    groups = list(gd.levels[1])
 
     n_cat = len(labels)
     n_grp = len(groups)
     if n_cat == 0 or n_grp == 0:
         # figura vazia
-        fig = Figure(figsize=figsize, dpi=300)
-        fig.add_subplot(111).text(0.5, 0.5, "Sem dados", ha="center")
-        return fig
+        fig = Figure(figsize=figsize, dpi=dpi)
+        ax = fig.add_subplot(111)
+        ax.text(0.5, 0.5, "Sem dados", ha="center")
+        return ChartHandle(fig, ax, "generate_multi_barplot", inputs)
 
     x = np.arange(n_cat)
     total_width = 0.8
     bar_width = total_width / n_grp
 
-    fig = Figure(figsize=figsize, dpi=300)
+    fig = Figure(figsize=figsize, dpi=dpi)
     ax = fig.add_subplot(111)
 
-    # cores padrão se não fornecidas
-    if colors is None:
-        cmap = plt.get_cmap("tab10")
-        colors = [cmap(i) for i in range(n_grp)]
+    # cores padrão (tab10) se não fornecidas
+    palette = group_colors(colors, n_grp)
 
     # desenha barras para cada grupo (hue)
     pos_arrays = {}
+    containers = []
     for i, grp in enumerate(groups):
         pos_arr = x - total_width/2 + i*bar_width + bar_width/2
         pos_arrays[grp] = pos_arr  # array de posições por categoria
-        heights = means[grp].values
-        errs = (std[grp].values if show_std else (sem[grp].values if show_error else None))
-        ax.bar(pos_arr, heights, width=bar_width, label=str(grp),
-               color=colors[i % len(colors)], yerr=errs, capsize=5)
+        heights = means[:, i]
+        errs = np.vstack([err_lo[:, i], err_hi[:, i]]) if error_bars else None
+        containers.append(ax.bar(pos_arr, heights, width=bar_width, label=str(grp),
+                                 color=palette[i], yerr=errs, capsize=5))
 
     # stripplot com dados individuais (sobrepor usando posições categóricas)
     sns.stripplot(
         x=x_col,
         y=value_col,
         hue=group_col,
-        data=df,
+        data=df.assign(**{x_col: df[x_col].astype(str), group_col: df[group_col].astype(str)}),
         order=labels,
+        hue_order=groups,
         dodge=True,
         jitter=0.12,
         size=2,
@@ -301,48 +361,47 @@ def generate_multi_barplot(
 
     # ajuste de limites para margem superior
     # usar máximo das médias + erro para cálculo de offset
-    combined_max = np.nanmax((means.values + (std.values if show_std else sem.values))) if means.size else 1.0
+    combined_max = np.nanmax(means + err_hi) if means.size else 1.0
     ax.set_ylim(0, combined_max * 1.25)
 
     # --- anotações de significância por categoria (pares de grupos dentro de cada x) ---
     # configuração de offsets por categoria para evitar sobreposição
-    base_range = (np.nanmax(means.values) - np.nanmin(means.values)) if means.size else 1.0
+    base_range = (np.nanmax(means) - np.nanmin(means)) if means.size else 1.0
     base_offset = base_range * 0.06 if base_range > 0 else 0.5
 
     # Nova lógica: fixar todas as anotações em 1.15 * maior média
-    max_mean = np.nanmax(means.values) if means.size else 1.0
+    max_mean = np.nanmax(means) if means.size else 1.0
     annotation_y = max_mean * 1.15
     # altura das pernas do bracket
     h = base_range * 0
 
+    # Welch t-test para todos os pares de grupos em todas as categorias de uma vez
+    pair_i, pair_j = np.triu_indices(n_grp, 1)
+    n_arr, m_arr, v_arr = counts, means, variances
+    _, _, pvals = welch_t(n_arr[:, pair_i], m_arr[:, pair_i], v_arr[:, pair_i],
+                          n_arr[:, pair_j], m_arr[:, pair_j], v_arr[:, pair_j])
+    n_texts = len(ax.texts)
+
     for idx_cat, label in enumerate(labels):
         # testar todos os pares de grupos dentro desta categoria
-        for i in range(len(groups)):
-            for j in range(i+1, len(groups)):
-                g1 = groups[i]
-                g2 = groups[j]
-                vals1 = df[(df[x_col] == label) & (df[group_col] == g1)][value_col].dropna().values
-                vals2 = df[(df[x_col] == label) & (df[group_col] == g2)][value_col].dropna().values
-                if len(vals1) < 2 or len(vals2) < 2:
-                    continue
-                try:
-                    stat, pval = ttest_ind(vals1, vals2, equal_var=False)
-                except Exception:
-                    continue
-                star = stars_from_p(pval, alpha=alpha, all_pvalue=False)
-                if not star:
-                    continue  # sem anotação se não significativo
-
-                # posições das barras específicas para esta categoria
-                pos_i = pos_arrays[g1][idx_cat]
-                pos_j = pos_arrays[g2][idx_cat]
-
-                # desenha bracket com topo fixo em annotation_y
-                ax.plot([pos_i, pos_i], [annotation_y - h, annotation_y], linewidth=1.2, color='black')
-                ax.plot([pos_j, pos_j], [annotation_y - h, annotation_y], linewidth=1.2, color='black')
-                ax.plot([pos_i, pos_j], [annotation_y, annotation_y], linewidth=1.2, color='black')
-                # texto com estrelas acima do bracket
-                ax.text((pos_i + pos_j) / 2.0, annotation_y + h * 0.2, star, ha='center', va='bottom', fontsize=fontsize, fontweight='bold')
+        for k_pair, (i, j) in enumerate(zip(pair_i, pair_j)):
+            g1 = groups[i]
+            g2 = groups[j]
+            pval = pvals[idx_cat, k_pair]
+            star = stars_from_p(pval, alpha=alpha, all_pvalue=False)
+            if not star:
+                continue  # sem anotação se não significativo
+
+            # posições das barras específicas para esta categoria
+            pos_i = pos_arrays[g1][idx_cat]
+            pos_j = pos_arrays[g2][idx_cat]
+
+            # desenha bracket com topo fixo em annotation_y
+            ax.plot([pos_i, pos_i], [annotation_y - h, annotation_y], linewidth=1.2, color='black')
+            ax.plot([pos_j, pos_j], [annotation_y - h, annotation_y], linewidth=1.2, color='black')
+            ax.plot([pos_i, pos_j], [annotation_y, annotation_y], linewidth=1.2, color='black')
+            # texto com estrelas acima do bracket
+            ax.text((pos_i + pos_j) / 2.0, annotation_y + h * 0.2, star, ha='center', va='bottom', fontsize=fontsize, fontweight='bold')
 
     # garantir que ylim acomode as anotações fixas
     top_needed = annotation_y + base_offset
@@ -351,4 +410,5 @@ def generate_multi_barplot(
         ax.set_ylim(cur_ymin, top_needed)
 
     fig.tight_layout()
-    return fig
\ No newline at end of file
+    return ChartHandle(fig, ax, "generate_multi_barplot", inputs, bars=containers,
+                       annotations=ax.texts[n_texts:], legend_fontsize=lambda fs: max(10, fs - 2))
\ No newline at end of file
@@ -14,4 +14,8 @@ def export_report_xlsx(app):
         app.last_summary_df.to_excel(writer, sheet_name="summary", index=False)
         if app.last_stats_df is not None:
             app.last_stats_df.to_excel(writer, sheet_name="stats", index=False)
+        pairwise = getattr(app, "pairwise", None)
+        if pairwise is not None and len(pairwise):
+            # matriz k x k de p-values (NaN = par não testado)
+            pairwise.p_frame().to_excel(writer, sheet_name="p_matrix")
     messagebox.showinfo("Exported", f"Report saved in{fpath}")
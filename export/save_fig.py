@@ -1,11 +1,15 @@
 from tkinter import filedialog, messagebox
 
+# resolução de exportação quando nenhuma é informada (a figura em si fica na resolução da tela)
+DEFAULT_EXPORT_DPI = 300
+
 
 def save_chart(fig, figsize_inches=None, dpi_override=None):
     """Salva a figura mantendo o tamanho em polegadas definido em fig.get_size_inches().
 
-    Para formatos raster (ex.: TIFF) o tamanho em pixels será figsize * fig.dpi.
-    Usamos o DPI atualmente associado à figura para preservar o tamanho esperado.
+    Para formatos raster (ex.: TIFF) o tamanho em pixels será figsize * dpi.
+    A figura é desenhada na resolução da tela (prévia); a rasterização em alta
+    resolução acontece só aqui, com dpi_override ou DEFAULT_EXPORT_DPI.
     """
     if fig is None:
         messagebox.showinfo("Attention", "Generate a graph first.")
@@ -25,24 +29,15 @@ def save_chart(fig, figsize_inches=None, dpi_override=None):
                 # ignorar falha e prosseguir
                 pass
 
-        # Determina o dpi para salvar imagens raster. Prioriza dpi_override > fig.get_dpi()
-        try:
-            fig_dpi = float(fig.get_dpi())
-        except Exception:
-            fig_dpi = None
-
-        dpi_to_use = None
+        # Determina o dpi para salvar imagens raster. Prioriza dpi_override > DEFAULT_EXPORT_DPI
+        dpi_to_use = DEFAULT_EXPORT_DPI
         if dpi_override is not None:
             try:
                 dpi_to_use = float(dpi_override)
             except Exception:
-                dpi_to_use = None
-        elif fig_dpi is not None:
-            dpi_to_use = fig_dpi
+                pass
 
-        save_kwargs = {}
-        if dpi_to_use is not None:
-            save_kwargs['dpi'] = int(dpi_to_use)
+        save_kwargs = {'dpi': int(dpi_to_use)}
 
         # Salva a figura; para SVG o dpi não altera o vetor, para TIFF controla a resolução
         fig.savefig(fpath, **save_kwargs)
@@ -4,7 +4,10 @@ from reportlab.pdfgen import canvas
 from reportlab.lib.utils import ImageReader
 import io
 
-def export_report_pdf(app):
+from export.save_fig import DEFAULT_EXPORT_DPI
+
+def export_report_pdf(app, dpi=None):
+    """PDF com o gráfico atual rasterizado em dpi (o dpi de exportação escolhido na interface)."""
     if app.last_summary_df is None:
         messagebox.showinfo("Warning","Run analysis before exporting.")
         return
@@ -12,9 +15,11 @@ def export_report_pdf(app):
                                          filetypes=[("PDF","*.pdf")])
     if not fpath: return
 
+    if dpi is None:
+        dpi = getattr(getattr(app, 'plot_tab', None), 'dpi', None) or DEFAULT_EXPORT_DPI
     img_buf = io.BytesIO()
     if app.fig is not None:
-        app.fig.savefig(img_buf, format="png", dpi=300, bbox_inches="tight")
+        app.fig.savefig(img_buf, format="png", dpi=dpi, bbox_inches="tight")
     img_buf.seek(0)
     img = ImageReader(img_buf)
 
@@ -0,0 +1,132 @@
+# graph_app/ingest/csv_reader.py
+"""
+Leitura rápida de CSV com inferência de tipos.
+
+Os tipos são inferidos de uma amostra das primeiras linhas:
+- numeric: coluna numérica (ou texto em que todos os valores convertem para
+  número, convertido com to_numeric depois da leitura). Se algum valor da
+  coluna inteira não converter (ex.: IDs 101/102 com linhas "WT"), a coluna
+  fica como category/text: nada vira NaN no carregamento, e a conversão da
+  coluna de valor escolhida fica para a análise (numeric_values);
+- category: texto com poucos valores distintos (colunas de grupo/fator),
+  lido direto como dtype 'category';
+- text: demais colunas, mantidas como estão. Datas e durações (datetime64,
+  timedelta64 ou objetos Timestamp/date/time, comuns em abas do Excel) são
+  sempre 'text': to_numeric as transformaria em inteiros de nanossegundos.
+
+A leitura completa usa o engine pyarrow (multi-thread) quando o pacote
+estiver instalado e o engine C do pandas caso contrário. As conversões de
+grupo (astype(str)) e valor (to_numeric) passam a ser feitas uma vez, no
+carregamento, e não a cada análise.
+
+Uso:
+    df = read_csv_fast("dados.csv")
+    df = categorize_columns(df)           # mesmo tratamento para abas do Excel
+    df[col] = group_category(df[col])     # coluna de grupo pronta para a análise
+"""
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    _HAS_PYARROW = True
+except ImportError:
+    _HAS_PYARROW = False
+
+SAMPLE_ROWS = 10_000
+# limites para uma coluna de texto ser tratada como grupo
+CATEGORY_MAX_UNIQUE = 1000
+CATEGORY_MAX_RATIO = 0.5
+# infer_dtype de colunas object com datas/horas/durações
+_TEMPORAL_INFERRED = ("datetime64", "datetime", "date", "time", "timedelta64", "timedelta", "period")
+
+
+def _is_temporal(s: pd.Series) -> bool:
+    """True para colunas de datas, horas ou durações (dtype próprio ou objetos)."""
+    if pd.api.types.is_datetime64_any_dtype(s) or pd.api.types.is_timedelta64_dtype(s) \
+            or isinstance(s.dtype, pd.PeriodDtype):
+        return True
+    return s.dtype == object and pd.api.types.infer_dtype(s, skipna=True) in _TEMPORAL_INFERRED
+
+
+def infer_column_kinds(sample: pd.DataFrame) -> dict:
+    """{coluna: 'numeric' | 'category' | 'text'} a partir de uma amostra."""
+    kinds = {}
+    for col in sample.columns:
+        s = sample[col]
+        if _is_temporal(s):
+            kinds[col] = 'text'
+            continue
+        if pd.api.types.is_bool_dtype(s) or isinstance(s.dtype, pd.CategoricalDtype):
+            kinds[col] = 'category'
+            continue
+        if pd.api.types.is_numeric_dtype(s):
+            kinds[col] = 'numeric'
+            continue
+        present = s.dropna()
+        if len(present) and pd.to_numeric(present, errors='coerce').notna().all():
+            kinds[col] = 'numeric'
+            continue
+        kinds[col] = _text_kind(present)
+    return kinds
+
+
+def _text_kind(present: pd.Series) -> str:
+    """'category' para texto com poucos valores distintos, 'text' caso contrário."""
+    n_unique = present.nunique()
+    if n_unique <= CATEGORY_MAX_UNIQUE and n_unique <= max(1, len(present)) * CATEGORY_MAX_RATIO:
+        return 'category'
+    return 'text'
+
+
+def group_category(s: pd.Series) -> pd.Series:
+    """Coluna de grupo como 'category' com rótulos texto (só converte se ainda não estiver)."""
+    if isinstance(s.dtype, pd.CategoricalDtype) and pd.api.types.is_string_dtype(s.cat.categories):
+        return s.cat.remove_unused_categories()
+    return s.astype(str).where(s.notna()).astype('category')
+
+
+def _apply_kinds(df: pd.DataFrame, kinds: dict) -> pd.DataFrame:
+    for col, kind in kinds.items():
+        if col not in df.columns:
+            continue
+        s = df[col]
+        if _is_temporal(s):
+            continue
+        if kind == 'numeric' and not pd.api.types.is_numeric_dtype(s):
+            converted = pd.to_numeric(s, errors='coerce')
+            if converted.notna().sum() == s.notna().sum():
+                df[col] = converted
+                continue
+            # valores não numéricos fora da amostra: a coluna fica como texto
+            kind = _text_kind(s.dropna())
+        if kind == 'category' and not (isinstance(s.dtype, pd.CategoricalDtype)
+                                         and pd.api.types.is_string_dtype(s.cat.categories)):
+            df[col] = group_category(s)
+    return df
+
+
+def categorize_columns(df: pd.DataFrame, sample_rows: int = SAMPLE_ROWS) -> pd.DataFrame:
+    """Aplica a inferência de tipos a um DataFrame já carregado (ex.: aba do Excel)."""
+    return _apply_kinds(df, infer_column_kinds(df.head(sample_rows)))
+
+
+def read_csv_fast(path: str, sample_rows: int = SAMPLE_ROWS, engine: str = None, **read_kwargs) -> pd.DataFrame:
+    """
+    Lê o CSV inteiro com os tipos inferidos da amostra. engine=None escolhe
+    pyarrow se disponível; se o pyarrow não conseguir ler o arquivo, usa o
+    engine C.
+    """
+    sample = pd.read_csv(path, nrows=sample_rows, **read_kwargs)
+    kinds = infer_column_kinds(sample)
+    dtype = {col: 'category' for col, kind in kinds.items() if kind == 'category'}
+
+    engine = engine or ('pyarrow' if _HAS_PYARROW else 'c')
+    if engine == 'pyarrow':
+        try:
+            df = pd.read_csv(path, engine='pyarrow', dtype=dtype, **read_kwargs)
+        except Exception:
+            df = pd.read_csv(path, engine='c', dtype=dtype, **read_kwargs)
+    else:
+        df = pd.read_csv(path, engine=engine, dtype=dtype, **read_kwargs)
+    return _apply_kinds(df, kinds)
@@ -0,0 +1,118 @@
+# graph_app/ingest/profile.py
+"""
+Perfil das colunas de um DataFrame, calculado uma vez após o carregamento.
+
+Para cada coluna: dtype, tipo (numeric/categorical, como is_numeric_dtype),
+cardinalidade, valores ausentes, níveis (como texto, na ordem de aparição)
+das colunas com poucos valores distintos e faixa (min/max) das numéricas.
+A interface lê o perfil para preencher os comboboxes, a lista de controles e
+para achar o fator de 2 níveis do modo two-by-two, em vez de varrer o frame.
+
+O cálculo roda num Job (stats/jobs.py) em segundo plano e pode ser
+cancelado quando outro arquivo é carregado.
+
+Uso:
+    job = start_profile(df, lambda prof: ...)     # callback na thread do job
+    prof = profile_frame(df)                      # síncrono
+    prof.numeric_columns(); prof.levels("grupo"); prof.two_level_factor("WT")
+"""
+
+import numpy as np
+import pandas as pd
+
+from stats.jobs import Job, check_cancelled, set_stage
+
+# colunas com até MAX_LEVELS valores distintos guardam a lista de níveis
+MAX_LEVELS = 1000
+
+
+class ColumnProfile:
+    """Metadados de uma coluna."""
+
+    def __init__(self, name, dtype, numeric, n_rows, n_missing, n_unique,
+                 levels=None, vmin=None, vmax=None):
+        self.name = name
+        self.dtype = dtype
+        self.numeric = numeric
+        self.n_rows = n_rows
+        self.n_missing = n_missing
+        self.n_unique = n_unique
+        self.levels = levels
+        self.min = vmin
+        self.max = vmax
+
+    def __repr__(self):
+        kind = "numeric" if self.numeric else "categorical"
+        return f"ColumnProfile({self.name!r}, {kind}, unique={self.n_unique}, missing={self.n_missing})"
+
+
+def profile_column(name, s: pd.Series, max_levels: int = MAX_LEVELS) -> ColumnProfile:
+    present = s.dropna()
+    numeric = pd.api.types.is_numeric_dtype(s)
+    uniques = present.unique()
+    levels = None
+    if len(uniques) <= max_levels:
+        # texto, sem repetir rótulos que só diferem no tipo (1 e '1')
+        levels = list(dict.fromkeys(str(v) for v in uniques))
+    vmin = vmax = None
+    if numeric and not pd.api.types.is_bool_dtype(s) and len(present):
+        values = present.to_numpy(dtype=np.float64)
+        vmin, vmax = float(values.min()), float(values.max())
+    return ColumnProfile(name, str(s.dtype), numeric, len(s), int(len(s) - len(present)),
+                         len(uniques), levels, vmin, vmax)
+
+
+class FrameProfile:
+    """Perfil de todas as colunas, na ordem do DataFrame."""
+
+    def __init__(self, source, columns):
+        self.source = source
+        self.columns = columns      # {nome: ColumnProfile}
+
+    def matches(self, df) -> bool:
+        """True se o perfil foi calculado para este mesmo objeto DataFrame."""
+        return self.source is df
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def names(self):
+        return list(self.columns)
+
+    def numeric_columns(self):
+        return [c for c, p in self.columns.items() if p.numeric]
+
+    def categorical_columns(self):
+        return [c for c, p in self.columns.items() if not p.numeric]
+
+    def levels(self, name):
+        """Níveis (texto) da coluna, ou [] se tiver valores distintos demais."""
+        p = self.columns.get(name)
+        return list(p.levels) if p is not None and p.levels is not None else []
+
+    def two_level_factor(self, containing=None):
+        """Primeira coluna categórica com exatamente 2 níveis (contendo containing, se dado)."""
+        for c in self.categorical_columns():
+            levels = self.levels(c)
+            if len(levels) == 2 and (containing is None or str(containing) in levels):
+                return c
+        return None
+
+
+def profile_frame(df: pd.DataFrame, max_levels: int = MAX_LEVELS) -> FrameProfile:
+    """Perfil de df, coluna a coluna (verifica o cancelamento do job a cada coluna)."""
+    columns = {}
+    for i, name in enumerate(df.columns):
+        set_stage(f"profile ({i + 1}/{df.shape[1]})")
+        columns[name] = profile_column(name, df[name], max_levels)
+    check_cancelled()
+    return FrameProfile(df, columns)
+
+
+def start_profile(df: pd.DataFrame, callback, max_levels: int = MAX_LEVELS) -> Job:
+    """Calcula o perfil num Job em segundo plano e chama callback(profile) se não for cancelado."""
+    def on_done(job):
+        if not job.cancelled and job.error is None:
+            callback(job.result)
+
+    return Job(lambda: profile_frame(df, max_levels), name="profile", on_done=on_done).start()
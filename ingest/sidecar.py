@@ -0,0 +1,162 @@
+# graph_app/ingest/sidecar.py
+"""
+Sidecars colunares das abas de planilhas já lidas.
+
+Depois da primeira leitura de uma aba, o DataFrame é gravado no diretório de
+cache do usuário num arquivo Feather (mapeado em memória na próxima leitura,
+sem passar pelo XML do openpyxl). O nome do arquivo é um hash de
+(SIDECAR_VERSION, versão do pandas, caminho absoluto, tamanho, mtime, aba): se a planilha for regravada, a
+chave muda e o sidecar antigo deixa de ser usado (e sai pela limpeza por
+tamanho). Os nomes das abas ficam num manifesto JSON com a mesma chave.
+
+Feather exige o pyarrow; sem ele (ou se a tabela não puder ser gravada em
+Feather, ex.: coluna com tipos misturados) o sidecar é um pickle.
+
+Uso:
+    store = get_sidecar_store()
+    df = store.load(path, "Plan1")        # None se não houver sidecar válido
+    store.save(path, "Plan1", df)
+    df = read_columnar("dados.parquet")   # entrada direta Parquet/Feather
+"""
+
+import hashlib
+import json
+import os
+import pickle
+
+import pandas as pd
+
+from stats.cache import user_cache_dir
+
+try:
+    import pyarrow  # noqa: F401
+    _HAS_PYARROW = True
+except ImportError:
+    _HAS_PYARROW = False
+
+COLUMNAR_EXTENSIONS = (".parquet", ".feather")
+DEFAULT_MAX_BYTES = 2 * 2**30
+# entra na chave: incrementar quando o formato/conteúdo dos sidecars mudar
+SIDECAR_VERSION = 1
+
+
+def read_columnar(path: str) -> pd.DataFrame:
+    """Lê um arquivo Parquet ou Feather (requer pyarrow ou, para Parquet, fastparquet)."""
+    ext = os.path.splitext(path.lower())[1]
+    if ext == ".feather":
+        return pd.read_feather(path, memory_map=True)
+    if ext == ".parquet":
+        return pd.read_parquet(path, memory_map=True) if _HAS_PYARROW else pd.read_parquet(path)
+    raise ValueError(f"Unsupported columnar file: {path}")
+
+
+class SidecarStore:
+    """Sidecars por (arquivo, tamanho, mtime, aba) num diretório de cache, com limite de tamanho."""
+
+    def __init__(self, directory: str = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory or os.path.join(user_cache_dir(), "sheets")
+        self.max_bytes = max_bytes
+        self.enabled = True
+
+    def _key(self, path, sheet=None):
+        st = os.stat(path)
+        h = hashlib.blake2b(digest_size=16)
+        h.update(f"v{SIDECAR_VERSION}:pandas-{pd.__version__}:".encode("ascii"))
+        h.update(os.path.abspath(path).encode("utf-8"))
+        h.update(f"{st.st_size}:{st.st_mtime_ns}".encode("ascii"))
+        h.update(repr(sheet).encode("utf-8"))
+        return h.hexdigest()
+
+    def _path(self, key, ext):
+        return os.path.join(self.directory, key + ext)
+
+    # ---------- manifesto (nomes das abas) ----------
+    def sheet_names(self, path: str):
+        if not self.enabled:
+            return None
+        try:
+            with open(self._path(self._key(path), ".json"), encoding="utf-8") as f:
+                return json.load(f)["sheets"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save_sheet_names(self, path: str, sheets):
+        if self.enabled:
+            self._write(self._path(self._key(path), ".json"),
+                        lambda f: f.write(json.dumps({"sheets": list(sheets)}).encode("utf-8")))
+
+    # ---------- abas ----------
+    def load(self, path: str, sheet) -> pd.DataFrame:
+        """DataFrame do sidecar da aba, ou None se não existir para a versão atual do arquivo."""
+        if not self.enabled:
+            return None
+        key = self._key(path, sheet)
+        feather = self._path(key, ".feather")
+        try:
+            if _HAS_PYARROW and os.path.exists(feather):
+                df = pd.read_feather(feather, memory_map=True)
+                os.utime(feather)
+                return df
+            pkl = self._path(key, ".pkl")
+            with open(pkl, "rb") as f:
+                df = pickle.load(f)
+            os.utime(pkl)
+            return df
+        except (OSError, pickle.PickleError, EOFError, AttributeError, ImportError, ValueError):
+            return None
+
+    def save(self, path: str, sheet, df: pd.DataFrame):
+        if not self.enabled:
+            return
+        key = self._key(path, sheet)
+        if _HAS_PYARROW and isinstance(df.index, pd.RangeIndex) \
+                and all(isinstance(c, str) for c in df.columns):
+            if self._write(self._path(key, ".feather"), lambda f: df.to_feather(f)):
+                self._evict()
+                return
+        if self._write(self._path(key, ".pkl"),
+                       lambda f: pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)):
+            self._evict()
+
+    # ---------- disco ----------
+    def _write(self, target, dump) -> bool:
+        tmp = f"{target}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp, "wb") as f:
+                dump(f)
+            os.replace(tmp, target)
+            return True
+        except Exception:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return False
+
+    def _evict(self):
+        try:
+            entries = []
+            for name in os.listdir(self.directory):
+                if name.endswith((".feather", ".pkl", ".json")):
+                    st = os.stat(os.path.join(self.directory, name))
+                    entries.append((st.st_mtime, st.st_size, name))
+        except OSError:
+            return
+        total = sum(e[1] for e in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+                total -= size
+            except OSError:
+                pass
+
+
+_sidecars = SidecarStore()
+
+
+def get_sidecar_store() -> SidecarStore:
+    """Store de sidecars compartilhado pelo cache de planilhas."""
+    return _sidecars
@@ -0,0 +1,289 @@
+# graph_app/ingest/watch.py
+"""
+Monitoramento do arquivo aberto (modo watch).
+
+FileWatcher verifica (tamanho, mtime) do arquivo a cada interval segundos
+numa thread daemon. Mudanças seguidas (o instrumento gravando em rajadas)
+são agrupadas: a notificação só sai quando o arquivo fica debounce segundos
+sem mudar, uma vez por rajada.
+
+Para CSV, se o arquivo só cresceu, o cabeçalho é o mesmo e os últimos bytes
+antes do offset não mudaram (checksum), a mudança é um 'append' e apenas os bytes a partir do último offset lido são parseados
+(até a última quebra de linha; uma linha incompleta fica para a próxima
+vez). Qualquer outra mudança é um 'rewrite' e o arquivo deve ser relido.
+
+AppendBuffer junta as linhas novas ao DataFrame sem recopiar as antigas:
+colunas numéricas e 'category' ficam em arrays com folga (a capacidade dobra
+quando enche) e cada append devolve um DataFrame que é uma visão das
+primeiras n linhas. append_rows faz o mesmo com um pd.concat do quadro todo.
+
+Uso:
+    w = FileWatcher(path, callback, offset=tamanho_lido).start()
+    # callback(change) na thread do watcher; change.kind: 'append' | 'rewrite'
+    # change.rows: DataFrame com as linhas novas (append de CSV)
+    buf = AppendBuffer(df)
+    df = buf.append(change.rows)           # ou: df = append_rows(df, change.rows)
+    offset = w.offset                      # fim da última linha completa lida
+    w.stop()
+"""
+
+import io
+import os
+import threading
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from ingest.csv_reader import group_category
+
+DEFAULT_INTERVAL = 1.0
+DEFAULT_DEBOUNCE = 1.5
+# bytes antes do offset conferidos por checksum para distinguir append de rewrite
+TAIL_CHECK_BYTES = 4096
+
+
+class FileChange:
+    """Mudança detectada no arquivo monitorado."""
+
+    def __init__(self, path, kind, offset, size, rows=None):
+        self.path = path
+        self.kind = kind
+        self.offset = offset
+        self.size = size
+        self.rows = rows
+
+    def __repr__(self):
+        n = None if self.rows is None else len(self.rows)
+        return f"FileChange({self.kind!r}, offset={self.offset}, size={self.size}, rows={n})"
+
+
+def _header_line(path) -> bytes:
+    with open(path, "rb") as f:
+        return f.readline()
+
+
+def tail_checksum(path, offset: int, nbytes: int = TAIL_CHECK_BYTES) -> int:
+    """crc32 dos nbytes imediatamente antes de offset."""
+    start = max(0, offset - nbytes)
+    with open(path, "rb") as f:
+        f.seek(start)
+        return zlib.crc32(f.read(offset - start))
+
+
+def read_appended_csv(path: str, offset: int, columns=None, **read_kwargs):
+    """
+    Linhas completas do CSV a partir de offset (bytes). Retorna (DataFrame,
+    novo offset). columns: nomes das colunas (padrão: cabeçalho do arquivo).
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+    end = data.rfind(b"\n") + 1
+    if columns is None:
+        columns = list(pd.read_csv(path, nrows=0, **read_kwargs).columns)
+    if end == 0:
+        return pd.DataFrame(columns=columns), offset
+    rows = pd.read_csv(io.BytesIO(data[:end]), header=None, names=columns, **read_kwargs)
+    return rows, offset + end
+
+
+def append_rows(df: pd.DataFrame, rows: pd.DataFrame) -> pd.DataFrame:
+    """
+    df + rows, mantendo os tipos de df: colunas 'category' recebem a união
+    ordenada dos níveis (a mesma ordem de factorize_key), numéricas são convertidas com to_numeric(errors='coerce').
+    """
+    rows = rows.reindex(columns=df.columns)
+    parts_old, parts_new = {}, {}
+    for col in df.columns:
+        old, new = df[col], rows[col]
+        if isinstance(old.dtype, pd.CategoricalDtype):
+            new = group_category(new)
+            categories = old.cat.categories.union(new.cat.categories, sort=True)
+            old = old.cat.set_categories(categories)
+            new = new.cat.set_categories(categories)
+        elif pd.api.types.is_numeric_dtype(old) and not pd.api.types.is_bool_dtype(old):
+            new = pd.to_numeric(new, errors='coerce')
+        parts_old[col], parts_new[col] = old, new
+    return pd.concat([pd.DataFrame(parts_old), pd.DataFrame(parts_new)], ignore_index=True)
+
+
+def _codes_dtype(n_categories: int):
+    """Dtype dos códigos que o pandas usa para n categorias (assim from_codes não copia)."""
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def _buffered(s: pd.Series) -> bool:
+    """Colunas mantidas em array pré-alocado: 'category' e numéricas NumPy (exceto bool)."""
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        return True
+    return isinstance(s.dtype, np.dtype) and s.dtype.kind in "iuf"
+
+
+class AppendBuffer:
+    """
+    DataFrame que cresce por append com custo proporcional às linhas novas
+    (mesmos tipos de append_rows). Colunas numéricas e 'category' ficam em
+    arrays com capacidade de sobra; as demais (texto, datas, bool...) são
+    concatenadas coluna a coluna. Os quadros devolvidos antes continuam
+    válidos: só a região além das n linhas é escrita, e recodificar ou
+    promover o tipo de uma coluna cria um array novo.
+    """
+
+    def __init__(self, df: pd.DataFrame, capacity: int = None):
+        self.columns = list(df.columns)
+        self.n = len(df)
+        self.capacity = max(capacity or 0, 2 * self.n, 1024)
+        self._arrays = {}       # coluna -> array (códigos para 'category')
+        self._dtypes = {}       # coluna 'category' -> CategoricalDtype
+        self._other = {}        # coluna -> Series (concatenada a cada append)
+        for col in self.columns:
+            s = df[col]
+            if not _buffered(s):
+                self._other[col] = s.reset_index(drop=True)
+                continue
+            if isinstance(s.dtype, pd.CategoricalDtype):
+                self._dtypes[col] = s.dtype
+                values = s.cat.codes.to_numpy()
+                dtype = _codes_dtype(len(s.cat.categories))
+            else:
+                values = s.to_numpy()
+                dtype = values.dtype
+            buf = np.empty(self.capacity, dtype=dtype)
+            buf[:self.n] = values
+            self._arrays[col] = buf
+        self.frame = self._build()
+
+    def _build(self) -> pd.DataFrame:
+        data = {}
+        for col in self.columns:
+            if col in self._other:
+                data[col] = self._other[col]
+            elif col in self._dtypes:
+                data[col] = pd.Categorical.from_codes(self._arrays[col][:self.n], dtype=self._dtypes[col],
+                                                      validate=False)
+            else:
+                data[col] = self._arrays[col][:self.n]
+        return pd.DataFrame(data, index=pd.RangeIndex(self.n), copy=False)
+
+    def _grow(self, need):
+        self.capacity = max(2 * self.capacity, need)
+        for col, buf in self._arrays.items():
+            grown = np.empty(self.capacity, dtype=buf.dtype)
+            grown[:self.n] = buf[:self.n]
+            self._arrays[col] = grown
+
+    def _category_codes(self, col, new: pd.Series) -> np.ndarray:
+        new = group_category(new)
+        dtype = self._dtypes[col]
+        if not new.cat.categories.isin(dtype.categories).all():
+            # níveis novos: união ordenada (como factorize_key) e códigos antigos remapeados
+            categories = dtype.categories.union(new.cat.categories, sort=True)
+            remap = categories.get_indexer(dtype.categories)
+            buf = np.empty(self.capacity, dtype=_codes_dtype(len(categories)))
+            old = self._arrays[col][:self.n]
+            buf[:self.n] = np.where(old >= 0, remap[old], -1)
+            self._arrays[col] = buf
+            dtype = self._dtypes[col] = pd.CategoricalDtype(categories)
+        pos = dtype.categories.get_indexer(new.cat.categories)
+        codes = new.cat.codes.to_numpy()
+        return np.where(codes >= 0, pos[codes], -1)
+
+    def append(self, rows: pd.DataFrame) -> pd.DataFrame:
+        """DataFrame com as linhas antigas + rows (colunas reordenadas/completadas como em append_rows)."""
+        rows = rows.reindex(columns=self.columns)
+        need = self.n + len(rows)
+        if need > self.capacity:
+            self._grow(need)
+        for col in self._arrays:
+            if col in self._dtypes:
+                values = self._category_codes(col, rows[col])
+            else:
+                values = pd.to_numeric(rows[col], errors='coerce').to_numpy()
+                buf = self._arrays[col]
+                common = np.result_type(buf.dtype, values.dtype)
+                if common != buf.dtype:     # ex.: int com NaN novo vira float
+                    grown = np.empty(self.capacity, dtype=common)
+                    grown[:self.n] = buf[:self.n]
+                    self._arrays[col] = grown
+            self._arrays[col][self.n:need] = values
+        for col, s in self._other.items():
+            self._other[col] = pd.concat([s, rows[col].reset_index(drop=True)], ignore_index=True)
+        self.n = need
+        self.frame = self._build()
+        return self.frame
+
+
+class FileWatcher:
+    """Verifica o arquivo por polling de (tamanho, mtime) e notifica mudanças, com debounce."""
+
+    def __init__(self, path: str, callback, interval: float = DEFAULT_INTERVAL,
+                 debounce: float = DEFAULT_DEBOUNCE, offset: int = None):
+        self.path = path
+        self.callback = callback
+        self.interval = interval
+        self.debounce = debounce
+        self.is_csv = path.lower().endswith(".csv")
+        st = os.stat(path)
+        self.offset = st.st_size if offset is None else offset
+        self._signature = (st.st_size, st.st_mtime_ns)
+        self._header = _header_line(path) if self.is_csv else None
+        self._tail = tail_checksum(path, self.offset) if self.is_csv else None
+        self._columns = None
+        self._changed_at = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive() and not self._stop.is_set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                st = os.stat(self.path)
+            except OSError:
+                continue  # arquivo sendo substituído: tenta de novo no próximo ciclo
+            signature = (st.st_size, st.st_mtime_ns)
+            now = time.monotonic()
+            if signature != self._signature:
+                self._signature = signature
+                self._changed_at = now
+                continue
+            if self._changed_at is not None and now - self._changed_at >= self.debounce:
+                self._changed_at = None
+                try:
+                    change = self._describe(st.st_size)
+                except Exception:
+                    change = FileChange(self.path, 'rewrite', self.offset, st.st_size)
+                    self.offset = st.st_size
+                if not self._stop.is_set():
+                    self.callback(change)
+
+    def _describe(self, size) -> FileChange:
+        if (self.is_csv and size >= self.offset and _header_line(self.path) == self._header
+                and tail_checksum(self.path, self.offset) == self._tail):
+            if self._columns is None:
+                self._columns = list(pd.read_csv(self.path, nrows=0).columns)
+            offset = self.offset
+            rows, self.offset = read_appended_csv(self.path, offset, self._columns)
+            self._tail = tail_checksum(self.path, self.offset)
+            return FileChange(self.path, 'append', offset, size, rows)
+        self.offset = size
+        if self.is_csv:
+            self._header = _header_line(self.path)
+            self._tail = tail_checksum(self.path, self.offset)
+            self._columns = None
+        return FileChange(self.path, 'rewrite', self.offset, size)
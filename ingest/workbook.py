@@ -0,0 +1,155 @@
+# graph_app/ingest/workbook.py
+"""
+Cache de planilhas Excel abertas.
+
+Cada arquivo é aberto uma vez com pd.ExcelFile (handle somente leitura) e
+as abas são lidas sob demanda, no primeiro acesso, já com os tipos
+inferidos (colunas de grupo como 'category', ver ingest/csv_reader.py).
+As abas já lidas ficam num LRU limitado pelo uso de memória dos DataFrames.
+A assinatura do arquivo (tamanho, mtime) é conferida a cada acesso: se o
+arquivo mudou, o handle é reaberto e as abas antigas são descartadas.
+
+Trocar de aba ou recarregar um arquivo que não mudou não relê o .xlsx.
+Entre sessões, abas e nomes de abas vêm dos sidecars em disco
+(ingest/sidecar.py), e o handle do Excel só é aberto se algo faltar.
+
+Uso:
+    wb = get_workbook_cache()
+    sheets = wb.sheet_names("dados.xlsx")
+    df = wb.sheet("dados.xlsx", sheets[0])
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from ingest.csv_reader import categorize_columns
+from ingest.sidecar import get_sidecar_store
+
+DEFAULT_MAX_BYTES = 512 * 2**20
+DEFAULT_MAX_BOOKS = 4
+
+
+def file_signature(path: str):
+    """(tamanho, mtime em ns) do arquivo; muda quando o arquivo é regravado."""
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+class WorkbookCache:
+    """Handles abertos por arquivo + LRU das abas lidas, limitado em bytes, sobre os sidecars."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, max_books: int = DEFAULT_MAX_BOOKS,
+                 sidecars=None):
+        self.max_bytes = max_bytes
+        self.max_books = max_books
+        self.sidecars = sidecars if sidecars is not None else get_sidecar_store()
+        self.hits = 0
+        self.misses = 0
+        self.sidecar_hits = 0
+        self._signatures = {}           # path -> assinatura vista por último
+        self._books = OrderedDict()     # path -> ExcelFile
+        self._sheets = OrderedDict()    # (path, aba) -> (DataFrame, bytes)
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+    # ---------- handles ----------
+    def _check(self, path):
+        """Caminho absoluto; descarta handle e abas se o arquivo mudou desde o último acesso."""
+        path = os.path.abspath(path)
+        sig = file_signature(path)
+        if self._signatures.get(path) != sig:
+            self._drop(path)
+            self._signatures[path] = sig
+        return path
+
+    def _book(self, path):
+        book = self._books.get(path)
+        if book is not None:
+            self._books.move_to_end(path)
+            return book
+        book = pd.ExcelFile(path)
+        self._books[path] = book
+        while len(self._books) > self.max_books:
+            oldest = next(iter(self._books))
+            self._books.pop(oldest).close()
+        return book
+
+    def _drop(self, path):
+        """Fecha o handle e esquece as abas de path."""
+        book = self._books.pop(path, None)
+        if book is not None:
+            try:
+                book.close()
+            except Exception:
+                pass
+        for key in [k for k in self._sheets if k[0] == path]:
+            self._bytes -= self._sheets.pop(key)[1]
+
+    # ---------- API ----------
+    def sheet_names(self, path: str) -> list:
+        with self._lock:
+            path = self._check(path)
+            names = self.sidecars.sheet_names(path)
+            if names is None:
+                names = list(self._book(path).sheet_names)
+                self.sidecars.save_sheet_names(path, names)
+            return names
+
+    def sheet(self, path: str, sheet_name=0) -> pd.DataFrame:
+        """
+        DataFrame da aba (nome ou posição). Retorna uma cópia rasa: adicionar ou
+        remover colunas não altera o cache, mas os valores não devem ser modificados.
+        """
+        with self._lock:
+            path = self._check(path)
+            if not isinstance(sheet_name, str):
+                sheet_name = self.sheet_names(path)[sheet_name]
+            key = (path, sheet_name)
+            if key in self._sheets:
+                self._sheets.move_to_end(key)
+                self.hits += 1
+                return self._sheets[key][0].copy(deep=False)
+            self.misses += 1
+            df = self.sidecars.load(path, sheet_name)
+            if df is not None:
+                self.sidecar_hits += 1
+            else:
+                df = categorize_columns(self._book(path).parse(sheet_name))
+                self.sidecars.save(path, sheet_name, df)
+            size = int(df.memory_usage(index=True, deep=True).sum())
+            self._sheets[key] = (df, size)
+            self._bytes += size
+            # a aba recém-lida fica mesmo se sozinha passar do limite
+            while self._bytes > self.max_bytes and len(self._sheets) > 1:
+                self._bytes -= self._sheets.popitem(last=False)[1][1]
+            return df.copy(deep=False)
+
+    def invalidate(self, path: str = None):
+        """Esquece um arquivo (ou todos) e fecha os handles."""
+        with self._lock:
+            paths = [os.path.abspath(path)] if path else list(self._signatures)
+            for p in paths:
+                self._drop(p)
+                self._signatures.pop(p, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "sidecar_hits": self.sidecar_hits,
+                "books": len(self._books),
+                "sheets": len(self._sheets),
+                "bytes": self._bytes,
+            }
+
+
+_workbooks = WorkbookCache()
+
+
+def get_workbook_cache() -> WorkbookCache:
+    """Cache de planilhas compartilhado pela interface."""
+    return _workbooks
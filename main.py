@@ -6,54 +6,59 @@ import subprocess
 import platform
 import urllib.request
 
+def _notify(msg):
+    messagebox.showwarning("Grafitics-Message", msg)
+
 def check_r_installed():
     return shutil.which("R") is not None
 
-def install_r_linux():
+def install_r_linux(notify=_notify):
     try:
         subprocess.run(["sudo", "apt-get", "update"], check=True)
         subprocess.run(["sudo", "apt-get", "install", "-y", "r-base"], check=True)
-        messagebox.showwarning("Grafitics-Message","✅ R instalado com sucesso!")
+        notify("✅ R instalado com sucesso!")
     except subprocess.CalledProcessError as e:
-        messagebox.showwarning("Grafitics-Message","❌ Erro ao instalar o R:", e)
+        notify(f"❌ Erro ao instalar o R: {e}")
 
-def install_r_windows():
+def install_r_windows(notify=_notify):
     url = "https://cloud.r-project.org/bin/windows/base/R-4.5.1-win.exe"
     installer = "R-installer.exe"
-    
-    messagebox.showwarning("Grafitics-Message","⬇️ Baixando instalador do R...")
+
+    notify("⬇️ Baixando instalador do R...")
     urllib.request.urlretrieve(url, installer)
 
-    messagebox.showwarning("Grafitics-Message","🚀 Executando instalador...")
+    notify("🚀 Executando instalador...")
     subprocess.run([installer, "/VERYSILENT", "/SUPPRESSMSGBOXES", "/NORESTART"], check=True)
 
-    messagebox.showwarning("Grafitics-Message","✅ R instalado com sucesso!")
+    notify("✅ R instalado com sucesso!")
 
-def install_r_mac():
+def install_r_mac(notify=_notify):
     try:
         subprocess.run(["brew", "install", "r"], check=True)
-        messagebox.showwarning("Grafitics-Message","✅ R instalado com sucesso!")
+        notify("✅ R instalado com sucesso!")
     except subprocess.CalledProcessError as e:
-        messagebox.showwarning("Grafitics-Message","❌ Erro ao instalar o R:", e)
+        notify(f"❌ Erro ao instalar o R: {e}")
 
-def ensure_r_installed():
+def ensure_r_installed(notify=_notify):
+    """Instala o R se não houver. Chamado pela GUI sob demanda (em uma thread)."""
     if check_r_installed():
-        pass
+        return True
+    notify("⚠️ R não encontrado. Instalando...")
+    os_type = platform.system()
+    if os_type == "Linux":
+        install_r_linux(notify)
+    elif os_type == "Windows":
+        install_r_windows(notify)
+    elif os_type == "Darwin":  # macOS
+        install_r_mac(notify)
     else:
-        messagebox.showwarning("Grafitics-Message","⚠️ R não encontrado. Instalando...")
-        os_type = platform.system()
-        if os_type == "Linux":
-            install_r_linux()
-        elif os_type == "Windows":
-            install_r_windows()
-        elif os_type == "Darwin":  # macOS
-            install_r_mac()
-        else:
-            messagebox.showwarning("Grafitics-Message","❌ Sistema não suportado para instalação automática. Por favor, instale o R manualmente.")
+        notify("❌ Sistema não suportado para instalação automática. Por favor, instale o R manualmente.")
+    return check_r_installed()
 
 
 
 if __name__ == "__main__":
-    ensure_r_installed()
-    app = StatApp()
+    # o R é verificado em segundo plano pela GUI (stats/r_probe.py);
+    # a instalação só acontece se o usuário escolher o backend R
+    app = StatApp(r_installer=ensure_r_installed)
     app.mainloop()
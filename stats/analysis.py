@@ -0,0 +1,180 @@
+# graph_app/stats/analysis.py
+"""
+Visão de análise (grupo, valor) montada sem cópias intermediárias.
+
+Em vez de self.df[[grupo, valor]].dropna().copy() + astype(str) +
+to_numeric + dropna a cada clique, a visão guarda só:
+- codes: códigos int32 do grupo, ou da célula grupo x fator com fator_col
+  (níveis ordenados, como GroupedData);
+- values: os valores válidos como float64 (ou float32), uma única cópia
+  filtrada por máscara da coluna original. Só saem linhas com grupo, fator
+  ou valor ausente (NaN), como no dropna antigo; ±inf ficam.
+
+O DataFrame de análise (grupo como 'category' + valor) e o GroupedData são
+montados sobre esses arrays, sem refatorizar. analysis_view() devolve a visão
+anterior quando o DataFrame e as colunas não mudaram, de modo que resumo,
+testes (fingerprint do cache) e gráficos reaproveitam tudo.
+
+Linhas novas (arquivo monitorado, ingest/watch.py) entram com extend(): só
+as linhas novas são fatorizadas, e n/média/variância por grupo são
+combinados com os já calculados (Chan), sem reler os dados antigos.
+
+Uso:
+    view = analysis_view(df, "grupo", "valor", previous=view)
+    view.frame       # DataFrame para os testes/gráficos
+    view.grouped     # GroupedData correspondente
+    view = view.extend(df_com_linhas_novas, linhas_novas)
+"""
+
+import numpy as np
+import pandas as pd
+
+from stats.grouped import GroupedData, factorize_key, numeric_values
+from stats.streaming import combine_moments
+
+
+class AnalysisView:
+    """Códigos int32 da célula (grupo ou grupo x fator) + valores válidos de um DataFrame."""
+
+    def __init__(self, source: pd.DataFrame, group_col: str, value_col: str, value_dtype=np.float64,
+                 fator_col: str = None):
+        self.source = source
+        self.group_col = group_col
+        self.value_col = value_col
+        self.fator_col = fator_col
+        self.value_dtype = np.dtype(value_dtype)
+
+        values = numeric_values(source[value_col], self.value_dtype)
+        # só NaN sai (como no dropna antigo); ±inf continuam nos dados
+        mask = ~np.isnan(values)
+        key_codes, key_levels = [], []
+        for key in self.keys:
+            codes, levels = factorize_key(source[key])
+            mask &= codes >= 0
+            key_codes.append(codes)
+            key_levels.append(levels)
+        for i, codes in enumerate(key_codes):
+            codes = codes[mask]
+            # níveis que só tinham valores ausentes saem, como no dropna antigo
+            present = np.bincount(codes, minlength=len(key_levels[i])) > 0
+            if not present.all():
+                codes = (np.cumsum(present) - 1)[codes]
+                key_levels[i] = key_levels[i][present]
+            key_codes[i] = codes
+        self.key_levels = key_levels
+        self.codes = np.ravel_multi_index(key_codes, self.shape).astype(np.int32) \
+            if len(key_codes) > 1 else key_codes[0].astype(np.int32)
+        self.values = values[mask]
+        self._frame = None
+        self._grouped = None
+        self._moments = None
+
+    @property
+    def keys(self):
+        return [self.group_col] + ([self.fator_col] if self.fator_col else [])
+
+    @property
+    def levels(self):
+        """Níveis do grupo (primeira chave)."""
+        return self.key_levels[0]
+
+    @property
+    def shape(self):
+        return tuple(len(l) for l in self.key_levels)
+
+    def matches(self, df, group_col, value_col, value_dtype=np.float64, fator_col=None) -> bool:
+        return (self.source is df and self.group_col == group_col and self.value_col == value_col
+                and self.fator_col == fator_col and self.value_dtype == np.dtype(value_dtype))
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """DataFrame (grupo e fator 'category', valor) sobre os mesmos arrays."""
+        if self._frame is None:
+            key_codes = np.unravel_index(self.codes, self.shape) if self.fator_col else [self.codes]
+            data = {key: pd.Categorical.from_codes(codes, categories=pd.Index(levels, dtype=object))
+                    for key, codes, levels in zip(self.keys, key_codes, self.key_levels)}
+            data[self.value_col] = self.values
+            self._frame = pd.DataFrame(data, copy=False)
+        return self._frame
+
+    @property
+    def grouped(self) -> GroupedData:
+        """GroupedData do frame, a partir dos códigos já calculados."""
+        if self._grouped is None:
+            self._grouped = GroupedData.from_codes(self.frame, self.keys, self.value_col,
+                                                   self.codes, self.key_levels, self.values,
+                                                   moments=self._moments)
+        return self._grouped
+
+    def extend(self, source: pd.DataFrame, rows: pd.DataFrame) -> "AnalysisView":
+        """
+        Nova visão para source = (dados antigos + rows), fatorizando só rows.
+        Níveis novos são inseridos na ordem; n/média/variância por célula são
+        atualizados incrementalmente a partir do GroupedData desta visão.
+        """
+        values = numeric_values(rows[self.value_col], self.value_dtype)
+        mask = ~np.isnan(values)
+        row_codes, row_levels = [], []
+        for key in self.keys:
+            codes, levels = factorize_key(rows[key])
+            mask &= codes >= 0
+            row_codes.append(codes)
+            row_levels.append(levels)
+
+        # códigos remapeados por Index (não supõe níveis ordenados); a união
+        # ordenada mantém a ordem de factorize_key
+        all_levels, old_key_pos, chunk_key_codes = [], [], []
+        for old, codes, levels in zip(self.key_levels, row_codes, row_levels):
+            used = levels[np.unique(codes[mask])]
+            old_index = pd.Index(old, dtype=object)
+            index = old_index.union(pd.Index(used, dtype=object), sort=None) if len(used) else old_index
+            all_levels.append(np.asarray(index, dtype=object))
+            old_key_pos.append(index.get_indexer(old_index))
+            chunk_key_codes.append(index.get_indexer(pd.Index(levels, dtype=object))[codes[mask]])
+        shape = tuple(len(l) for l in all_levels)
+        # posição de cada célula antiga na nova grade
+        old_cells = np.unravel_index(np.arange(int(np.prod(self.shape))), self.shape)
+        old_pos = np.ravel_multi_index([pos[c] for pos, c in zip(old_key_pos, old_cells)], shape)
+        old_codes = self.codes if (old_pos == np.arange(len(old_pos))).all() else old_pos[self.codes]
+        chunk_codes = np.ravel_multi_index(chunk_key_codes, shape).astype(np.int32)
+        chunk_values = values[mask]
+
+        out = AnalysisView.__new__(AnalysisView)
+        out.source = source
+        out.group_col = self.group_col
+        out.value_col = self.value_col
+        out.fator_col = self.fator_col
+        out.value_dtype = self.value_dtype
+        out.key_levels = all_levels
+        out.codes = np.concatenate([old_codes, chunk_codes]).astype(np.int32)
+        out.values = np.concatenate([self.values, chunk_values])
+        out._frame = None
+        out._grouped = None
+
+        # momentos: os antigos (já calculados) combinados com os das linhas novas
+        k = int(np.prod(shape))
+        gd = self.grouped
+        na, ma, m2a = np.zeros(k), np.zeros(k), np.zeros(k)
+        na[old_pos] = gd.n
+        ma[old_pos] = np.nan_to_num(gd.mean)
+        m2a[old_pos] = np.where(gd.n > 1, gd.var * (gd.n - 1), 0.0)
+        nb = np.bincount(chunk_codes, minlength=k).astype(float)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mb = np.nan_to_num(np.bincount(chunk_codes, weights=chunk_values, minlength=k) / nb)
+        dev = chunk_values - mb[chunk_codes]
+        m2b = np.bincount(chunk_codes, weights=dev * dev, minlength=k)
+        n, mean, m2 = combine_moments(na, ma, m2a, nb, mb, m2b)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out._moments = (np.where(n > 0, mean, np.nan), np.where(n > 1, m2 / (n - 1), np.nan))
+        return out
+
+
+def analysis_view(df: pd.DataFrame, group_col: str, value_col: str, value_dtype=np.float64,
+                  previous: AnalysisView = None, fator_col: str = None) -> AnalysisView:
+    """Reaproveita previous se df e as colunas forem os mesmos; senão monta uma nova visão."""
+    if previous is not None and previous.matches(df, group_col, value_col, value_dtype, fator_col):
+        return previous
+    return AnalysisView(df, group_col, value_col, value_dtype, fator_col)
@@ -0,0 +1,148 @@
+# graph_app/stats/bootstrap.py
+"""
+Intervalos de confiança bootstrap (percentil) para todos os grupos de uma vez.
+
+Os valores de cada grupo ficam em segmentos contíguos e ordenados
+(GroupedData.sorted_values / offsets). Uma réplica bootstrap é uma linha de
+índices: para cada posição do segmento do grupo g sorteia-se
+offsets[g] + floor(U * n[g]). Um bloco de réplicas é portanto uma matriz
+(réplicas x N) de índices, gerada e reduzida sem laços em Python:
+- mean: np.add.reduceat ao longo dos segmentos;
+- median: ordenar os índices de cada linha já ordena os valores dentro de
+  cada segmento (os segmentos são disjuntos e crescentes), e a mediana sai
+  das posições centrais de cada segmento.
+
+O número de réplicas por bloco é limitado por max_bytes, e cada bloco tem a
+sua própria semente derivada de seed (SeedSequence.spawn), de modo que o
+resultado é o mesmo em série ou com n_jobs > 1. No pool de processos os
+valores vão uma vez só para shared memory e cada processo recebe uma única
+tarefa com a sua lista de blocos (tamanho, semente).
+
+Uso:
+    lwr, upr = bootstrap_ci(gd, stat="mean", n_boot=2000, ci=0.95, seed=0)
+    gd.ci("mean", seed=0)        # o mesmo, em cache no GroupedData
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from stats.jobs import check_cancelled, set_stage
+
+BOOTSTRAP_STATS = ("mean", "median")
+DEFAULT_N_BOOT = 2000
+DEFAULT_SEED = 12345
+# memória de um bloco de réplicas (matriz de índices + valores)
+DEFAULT_MAX_BYTES = 64 * 1024 ** 2
+# maior segmento sorteado com U float32 (desvio de uniformidade < 0.4%)
+_FLOAT32_MAX_SEGMENT = 2 ** 16
+
+
+def _replicates(sorted_values, offsets, stat, n_rep, seed):
+    """Estatística de n_rep réplicas bootstrap: array (n_rep, n_células)."""
+    n = np.diff(offsets)
+    has = n > 0
+    starts = offsets[:-1][has]
+    sizes = n[has]
+    total = int(sizes.sum())
+    out = np.full((n_rep, len(n)), np.nan)
+    if total == 0 or n_rep == 0:
+        return out
+
+    rng = np.random.default_rng(seed)
+    # U float32 só com segmentos pequenos: floor(U * n) com 24 bits de mantissa
+    # deixa de ser uniforme quando n se aproxima de 2**24 (~6% de desvio em n=1e6)
+    ftype = np.float32 if sizes.max() <= _FLOAT32_MAX_SEGMENT else np.float64
+    itype = np.int32 if offsets[-1] < 2 ** 31 else np.int64
+    seg_start = np.repeat(starts, sizes).astype(itype)
+    seg_size = np.repeat(sizes, sizes).astype(ftype)
+    idx = (rng.random((n_rep, total), dtype=ftype) * seg_size).astype(itype)
+    # arredondamento de U*n pode dar n: fica no último elemento do segmento
+    np.minimum(idx, (seg_size - 1).astype(itype), out=idx)
+    idx += seg_start
+
+    if stat == "mean":
+        sums = np.add.reduceat(sorted_values[idx], starts, axis=1)
+        out[:, has] = sums / sizes
+    else:
+        idx.sort(axis=1)
+        lo = sorted_values[idx[:, starts + (sizes - 1) // 2]]
+        hi = sorted_values[idx[:, starts + sizes // 2]]
+        out[:, has] = (lo + hi) / 2.0
+    return out
+
+
+def _blocks(n_boot, n_rows, max_bytes):
+    # índices + valores float64 + números aleatórios por posição (limite superior)
+    per_rep = max(n_rows, 1) * 24
+    size = int(max(1, min(n_boot, max_bytes // per_rep)))
+    return [min(size, n_boot - s) for s in range(0, n_boot, size)]
+
+
+def _replicates_shared(shm_name, n_values, dtype, offsets, stat, blocks):
+    """Blocos (tamanho, semente) de um processo do pool, lendo os valores da shared memory."""
+    block = shared_memory.SharedMemory(name=shm_name)
+    try:
+        values = np.ndarray((n_values,), dtype=np.dtype(dtype), buffer=block.buf)
+        parts = [_replicates(values, offsets, stat, size, seed) for size, seed in blocks]
+        del values
+    finally:
+        block.close()
+    return np.concatenate(parts, axis=0)
+
+
+def bootstrap_replicates(grouped, stat="mean", n_boot=DEFAULT_N_BOOT, seed=DEFAULT_SEED,
+                         max_bytes=DEFAULT_MAX_BYTES, n_jobs=1) -> np.ndarray:
+    """
+    Matriz (n_boot, n_células) com a estatística de cada réplica bootstrap.
+    n_jobs > 1 (ou None = todos os núcleos) distribui os blocos num pool de
+    processos; o resultado não depende de n_jobs.
+    """
+    if stat not in BOOTSTRAP_STATS:
+        raise ValueError(f"Unsupported bootstrap statistic: {stat}")
+    values, offsets = grouped.sorted_values, grouped.offsets
+    sizes = _blocks(n_boot, len(values), max_bytes)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    n_jobs = n_jobs or os.cpu_count() or 1
+
+    set_stage("bootstrap")
+    if n_jobs > 1 and len(sizes) > 1:
+        from stats.parallel import _mp_context
+        n_workers = min(n_jobs, len(sizes))
+        blocks = list(zip(sizes, seeds))
+        # blocos contíguos por processo: a ordem das réplicas é a mesma da série
+        chunks = [c for c in np.array_split(np.arange(len(blocks)), n_workers) if len(c)]
+        shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 8))
+        try:
+            np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)[:] = values
+            with ProcessPoolExecutor(max_workers=len(chunks), mp_context=_mp_context()) as ex:
+                futures = [ex.submit(_replicates_shared, shm.name, len(values), values.dtype.str, offsets, stat,
+                                     [blocks[i] for i in c]) for c in chunks]
+                parts = []
+                for fut in futures:
+                    check_cancelled()
+                    parts.append(fut.result())
+        finally:
+            shm.close()
+            shm.unlink()
+    else:
+        parts = []
+        for size, s in zip(sizes, seeds):
+            check_cancelled()
+            parts.append(_replicates(values, offsets, stat, size, s))
+    return np.concatenate(parts, axis=0)
+
+
+def bootstrap_ci(grouped, stat="mean", n_boot=DEFAULT_N_BOOT, ci=0.95, seed=DEFAULT_SEED,
+                 max_bytes=DEFAULT_MAX_BYTES, n_jobs=1):
+    """
+    IC bootstrap percentil de stat para cada célula do GroupedData.
+    Retorna (lwr, upr); células vazias ficam com NaN.
+    """
+    reps = bootstrap_replicates(grouped, stat, n_boot, seed, max_bytes, n_jobs)
+    tail = (1.0 - ci) / 2.0
+    with np.errstate(invalid='ignore'):
+        lwr, upr = np.quantile(reps, [tail, 1.0 - tail], axis=0)
+    return lwr, upr
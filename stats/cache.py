@@ -0,0 +1,256 @@
+# graph_app/stats/cache.py
+"""
+Cache de resultados dos testes estatísticos.
+
+A chave é um fingerprint rápido das colunas usadas (group/value/fator) mais
+o nome do teste e os parâmetros (alpha, controle, método de ajuste, backend...).
+Com summary= (tabela count/mean/std por grupo) o fingerprint é o da tabela.
+Os resultados ficam num LRU em memória e, opcionalmente, em disco no diretório
+de cache do usuário, com remoção dos arquivos mais antigos acima de um limite
+de tamanho.
+
+Uso:
+    @cached_test("tukey")
+    def tukey_test(df, group_col, value_col, alpha=0.05, ...): ...
+
+    get_cache().stats()  # {'hits': ..., 'misses': ..., 'disk_hits': ..., 'entries': ...}
+"""
+
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from stats.grouped import SUMMARY_COLUMNS
+
+# parâmetros que não alteram o resultado (summary entra pelo fingerprint)
+_IGNORED_PARAMS = ("timeout", "grouped", "summary")
+_DATA_COLUMNS = ("group_col", "value_col", "fator_col")
+
+
+def user_cache_dir(app: str = "grafitics") -> str:
+    """Diretório de cache do usuário para a aplicação (não é criado aqui)."""
+    if sys.platform.startswith("win"):
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser(r"~\AppData\Local")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, app)
+
+
+def fingerprint_frame(df: pd.DataFrame, columns) -> str:
+    """Hash (blake2b) vetorizado do conteúdo das colunas, sem depender do índice."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(str(len(df)).encode())
+    for c in columns:
+        h.update(repr(c).encode("utf-8"))
+        h.update(pd.util.hash_pandas_object(df[c], index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def make_key(name: str, data_fp: str, params: dict) -> str:
+    h = hashlib.blake2b(digest_size=20)
+    h.update(name.encode("utf-8"))
+    h.update(data_fp.encode("ascii"))
+    h.update(repr(sorted((k, repr(v)) for k, v in params.items())).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _copy(value):
+    return value.copy() if hasattr(value, "copy") else value
+
+
+class ResultCache:
+    """LRU em memória + store opcional em disco (pickle por chave)."""
+
+    def __init__(self, max_items: int = 64, disk_dir: str = None, max_disk_bytes: int = 256 * 2**20):
+        self.max_items = max_items
+        self.disk_dir = None
+        self.max_disk_bytes = max_disk_bytes
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._mem = OrderedDict()
+        self._lock = threading.Lock()
+        if disk_dir:
+            self.enable_disk(disk_dir, max_disk_bytes)
+
+    # ---------- disco ----------
+    def enable_disk(self, directory: str = None, max_bytes: int = None) -> bool:
+        """Ativa o store em disco (padrão: <user cache>/results). Retorna False se não for possível."""
+        directory = directory or os.path.join(user_cache_dir(), "results")
+        try:
+            os.makedirs(directory, exist_ok=True)
+        except OSError:
+            self.disk_dir = None
+            return False
+        self.disk_dir = directory
+        if max_bytes is not None:
+            self.max_disk_bytes = max_bytes
+        return True
+
+    def disable_disk(self):
+        self.disk_dir = None
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key + ".pkl")
+
+    def _disk_get(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+            os.utime(path)  # marca como usado recentemente para a remoção LRU
+            return value
+        except (OSError, pickle.PickleError, EOFError, AttributeError, ImportError):
+            return None
+
+    def _disk_put(self, key, value):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except (OSError, pickle.PickleError):
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return
+        self._evict_disk()
+
+    def _evict_disk(self):
+        try:
+            entries = []
+            for name in os.listdir(self.disk_dir):
+                if name.endswith(".pkl"):
+                    st = os.stat(os.path.join(self.disk_dir, name))
+                    entries.append((st.st_mtime, st.st_size, name))
+        except OSError:
+            return
+        total = sum(e[1] for e in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.disk_dir, name))
+                total -= size
+            except OSError:
+                pass
+
+    # ---------- API ----------
+    def get(self, key):
+        """Retorna uma cópia do valor em cache ou None (contabiliza hit/miss)."""
+        with self._lock:
+            if key in self._mem:
+                self._mem.move_to_end(key)
+                self.hits += 1
+                return _copy(self._mem[key])
+        value = self._disk_get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._put_mem(key, value)
+        return _copy(value)
+
+    def put(self, key, value):
+        value = _copy(value)
+        with self._lock:
+            self._put_mem(key, value)
+        self._disk_put(key, value)
+
+    def _put_mem(self, key, value):
+        self._mem[key] = value
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_items:
+            self._mem.popitem(last=False)
+
+    def clear(self, disk: bool = False):
+        with self._lock:
+            self._mem.clear()
+            self.hits = self.misses = self.disk_hits = 0
+        if disk and self.disk_dir:
+            for name in os.listdir(self.disk_dir):
+                if name.endswith(".pkl"):
+                    try:
+                        os.remove(os.path.join(self.disk_dir, name))
+                    except OSError:
+                        pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "entries": len(self._mem),
+            }
+
+
+_cache = ResultCache()
+
+
+def get_cache() -> ResultCache:
+    """Cache compartilhado usado pelos testes de stats/tests.py."""
+    return _cache
+
+
+def cached_test(name: str):
+    """
+    Decorator para funções de teste com assinatura (df, group_col, value_col, ...).
+    A chave combina o fingerprint das colunas de dados com os demais parâmetros.
+    """
+    def decorator(func):
+        sig = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache = get_cache()
+            if not cache.enabled:
+                return func(*args, **kwargs)
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            params = dict(bound.arguments)
+            params.update(params.pop("kwargs", {}) or {})
+            df = params.pop("df")
+            cols = [params[c] for c in _DATA_COLUMNS if params.get(c)]
+            grouped = params.get("grouped")
+            summary = params.get("summary")
+            if summary is not None:
+                # value_col não é usado com summary=: fica fora da chave
+                params.pop("value_col", None)
+                data_fp = fingerprint_frame(summary, [params["group_col"], *SUMMARY_COLUMNS])
+            elif grouped is not None and grouped.source is df:
+                # GroupedData da análise guarda o fingerprint: os dados são lidos uma vez só
+                data_fp = grouped.fingerprint(cols)
+            else:
+                data_fp = fingerprint_frame(df, cols)
+            key = make_key(name, data_fp,
+                           {k: v for k, v in params.items() if k not in _IGNORED_PARAMS})
+
+            hit = cache.get(key)
+            if hit is not None:
+                return hit
+            result = func(*args, **kwargs)
+            cache.put(key, result)
+            return result
+
+        return wrapper
+
+    return decorator
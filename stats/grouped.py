@@ -0,0 +1,325 @@
+# graph_app/stats/grouped.py
+"""
+Dados de uma análise já particionados por grupo.
+
+GroupedData é construído uma vez por análise: fatoriza as chaves (níveis
+ordenados, como groupby(sort=True) e as.factor no R), ordena os valores por
+grupo (offsets de cada grupo no array ordenado) e guarda em cache os momentos
+n, mean, var, std, sem e median. Resumo, engines nativos, gráficos e export
+recebem o mesmo objeto em vez de refazer groupby/máscaras cada um.
+
+Com duas chaves (ex.: [categoria, grupo] do gráfico agrupado) cada célula
+é uma combinação dos níveis, e grid(nome) devolve a estatística em forma
+(níveis da 1ª chave x níveis da 2ª).
+
+Uso:
+    gd = GroupedData(df, "genotipo", "valor")
+    gd.summary()                       # mesmas colunas de summary_by_group
+    labels, n, mean, var = gd.moments()
+    gd.values_of("WT")                 # valores do grupo (ordenados)
+    gd = GroupedData.from_summary(resumo, "genotipo")   # só count/mean/std por grupo
+"""
+
+import numpy as np
+import pandas as pd
+
+# colunas de estatísticas suficientes de uma tabela de resumo (saída de summary_by_group)
+SUMMARY_COLUMNS = ("count", "mean", "std")
+
+
+def is_text_key(s: pd.Series) -> bool:
+    """True se a coluna de grupo já é texto (ou 'category' com rótulos texto)."""
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        return pd.api.types.is_string_dtype(s.cat.categories)
+    return pd.api.types.is_string_dtype(s.dtype)
+
+
+def factorize_key(s: pd.Series):
+    """
+    (códigos, níveis ordenados como texto) de uma coluna de grupo; NaN -> -1.
+    Colunas 'category' com rótulos texto (ingest/csv_reader.py) são fatorizadas
+    pelos códigos, sem converter as linhas.
+    """
+    if not is_text_key(s):
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            s = s.astype(object)
+        s = s.where(s.isna(), s.astype(str))
+    codes, uniques = pd.factorize(s, sort=True)
+    return codes, np.asarray(uniques, dtype=object)
+
+
+def numeric_values(s: pd.Series, dtype=np.float64) -> np.ndarray:
+    """Valores como float (texto não numérico vira NaN); sem cópia se a coluna já for desse dtype."""
+    if not pd.api.types.is_numeric_dtype(s):
+        s = pd.to_numeric(s, errors='coerce')
+    return s.to_numpy(dtype=dtype, na_value=np.nan)
+
+
+class GroupedData:
+    """Códigos ordenados, offsets e momentos em cache por grupo (ou célula)."""
+
+    def __init__(self, df: pd.DataFrame, keys, value_col: str):
+        keys = [keys] if isinstance(keys, str) else list(keys)
+        values = numeric_values(df[value_col])
+        key_codes, levels = [], []
+        for key in keys:
+            codes, uniques = factorize_key(df[key])
+            key_codes.append(codes)
+            levels.append(uniques)
+        shape = tuple(len(l) for l in levels)
+
+        # só NaN sai (como o dropna de antes); ±inf ficam nos dados
+        mask = ~np.isnan(values)
+        for codes in key_codes:
+            mask &= codes >= 0
+        codes = np.zeros(mask.sum(), dtype=np.int64)
+        for c, size in zip(key_codes, shape):
+            codes = codes * size + c[mask]
+        self._setup(df, keys, value_col, codes.astype(np.int32), levels, values[mask], mask)
+
+    @classmethod
+    def from_codes(cls, source, keys, value_col, codes, levels, values, row_mask=None, moments=None):
+        """
+        Constrói a partir de códigos de célula já calculados (ex.: stats/analysis.py),
+        sem refatorizar: levels é uma lista de níveis por chave, codes int32 em
+        [0, prod(len(levels))) e values sem NaN. moments=(mean, var) por célula,
+        se já conhecidos (atualização incremental), evita recalculá-los.
+        """
+        gd = cls.__new__(cls)
+        keys = [keys] if isinstance(keys, str) else list(keys)
+        levels = [np.asarray(l, dtype=object) for l in levels]
+        gd._setup(source, keys, value_col, np.asarray(codes, dtype=np.int32), levels,
+                  np.asarray(values), row_mask)
+        if moments is not None:
+            gd._cache['mean'], gd._cache['var'] = (np.asarray(m, dtype=np.float64) for m in moments)
+        return gd
+
+    @classmethod
+    def from_summary(cls, table: pd.DataFrame, group_col: str):
+        """
+        Constrói só com as estatísticas suficientes de cada grupo: uma linha por
+        grupo com count, mean e std (ddof=1), como a saída de summary_by_group.
+        n/mean/var/std/sem e moments() são os da tabela; sem valores brutos,
+        sorted_values, median e ci() levantam ValueError. A ordem das linhas
+        faz o papel da ordem de aparição (first_seen).
+        """
+        missing = [c for c in (group_col,) + SUMMARY_COLUMNS if c not in table.columns]
+        if missing:
+            raise ValueError(f"Summary table is missing columns: {missing}")
+        pos, levels = factorize_key(table[group_col])
+        if (pos < 0).any() or len(levels) != len(pos):
+            raise ValueError(f"Summary table needs exactly one row per {group_col!r} level.")
+        count = numeric_values(table['count'])
+        if not (np.isfinite(count) & (count >= 0)).all():
+            raise ValueError("Summary table has invalid counts.")
+        std = numeric_values(table['std'])
+
+        k = len(levels)
+        gd = cls.__new__(cls)
+        gd._setup(table, [group_col], 'mean', np.empty(0, dtype=np.int32), [levels], None, None)
+        gd.n = np.zeros(k)
+        gd.n[pos] = count
+        gd.offsets = None
+        mean, var, first = np.full(k, np.nan), np.full(k, np.nan), np.zeros(k, dtype=np.int64)
+        mean[pos] = numeric_values(table['mean'])
+        var[pos] = np.where(count > 1, std * std, np.nan)
+        first[pos] = np.arange(k)
+        gd._cache.update(mean=np.where(gd.n > 0, mean, np.nan), var=var, first_seen=first)
+        return gd
+
+    def _setup(self, source, keys, value_col, codes, levels, values, row_mask):
+        self.keys = keys
+        self.value_col = value_col
+        self.source = source
+        self.levels = levels
+        self.shape = tuple(len(l) for l in levels)
+        self.codes = codes
+        self.values = values
+        self.row_mask = row_mask
+
+        n_cells = int(np.prod(self.shape)) if self.shape else 0
+        self.n = np.bincount(self.codes, minlength=n_cells).astype(float)
+        # início de cada célula em sorted_values
+        self.offsets = np.r_[0, np.cumsum(self.n)].astype(np.int64)
+        self._cache = {}
+
+    # ---------- rótulos ----------
+    @property
+    def labels(self):
+        """Níveis da (primeira) chave."""
+        return self.levels[0]
+
+    @property
+    def n_cells(self):
+        return len(self.n)
+
+    def matches(self, df, group_col, value_col, fator_col=None) -> bool:
+        """True se foi construído a partir de df e dessas colunas (consumidores checam antes de reutilizar)."""
+        keys = [group_col] + ([fator_col] if fator_col else [])
+        return self.source is df and self.keys == keys and self.value_col == value_col
+
+    def cell_index(self, *labels) -> int:
+        idx = 0
+        for lab, levels, size in zip(labels, self.levels, self.shape):
+            hits = np.flatnonzero(levels == str(lab))
+            if len(hits) == 0:
+                raise KeyError(lab)
+            idx = idx * size + int(hits[0])
+        return idx
+
+    def values_of(self, *labels) -> np.ndarray:
+        i = self.cell_index(*labels)
+        return self.sorted_values[self.offsets[i]:self.offsets[i + 1]]
+
+    def fingerprint(self, columns) -> str:
+        """Fingerprint das colunas de origem, calculado uma vez (o mesmo de stats/cache.py)."""
+        key = ('fingerprint', tuple(columns))
+        if key not in self._cache:
+            from stats.cache import fingerprint_frame
+            self._cache[key] = fingerprint_frame(self.source, columns)
+        return self._cache[key]
+
+    # ---------- momentos (calculados uma vez) ----------
+    def _cached(self, name, compute):
+        if name not in self._cache:
+            self._cache[name] = compute()
+        return self._cache[name]
+
+    @property
+    def sorted_values(self):
+        """Valores em segmentos contíguos por célula (offsets), crescentes dentro de cada uma."""
+        def compute():
+            if self.values is None:
+                raise ValueError("Raw values are not available: built from a summary table.")
+            # argsort estável dos códigos int32 + sort de cada segmento (bem mais rápido que lexsort)
+            out = self.values[np.argsort(self.codes, kind='stable')]
+            for start, end in zip(self.offsets[:-1], self.offsets[1:]):
+                if end - start > 1:
+                    out[start:end].sort()
+            return out
+        return self._cached('sorted_values', compute)
+
+    @property
+    def first_seen(self):
+        """Posição da primeira linha de cada célula (ordem de aparição, como unique())."""
+        def compute():
+            first = np.full(self.n_cells, len(self.codes), dtype=np.int64)
+            np.minimum.at(first, self.codes, np.arange(len(self.codes)))
+            return first
+        return self._cached('first_seen', compute)
+
+    @property
+    def mean(self):
+        def compute():
+            with np.errstate(invalid='ignore', divide='ignore'):
+                return np.bincount(self.codes, weights=self.values, minlength=self.n_cells) / self.n
+        return self._cached('mean', compute)
+
+    @property
+    def var(self):
+        """Variância amostral (ddof=1); NaN com menos de 2 observações."""
+        def compute():
+            dev = self.values - self.mean[self.codes]
+            ss = np.bincount(self.codes, weights=dev * dev, minlength=self.n_cells)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                return np.where(self.n > 1, ss / (self.n - 1), np.nan)
+        return self._cached('var', compute)
+
+    @property
+    def std(self):
+        return self._cached('std', lambda: np.sqrt(self.var))
+
+    @property
+    def sem(self):
+        def compute():
+            with np.errstate(invalid='ignore', divide='ignore'):
+                return self.std / np.sqrt(self.n)
+        return self._cached('sem', compute)
+
+    @property
+    def median(self):
+        def compute():
+            values = self.sorted_values
+            out = np.full(self.n_cells, np.nan)
+            has = self.n > 0
+            start = self.offsets[:-1][has]
+            n = self.n[has].astype(np.int64)
+            lo = values[start + (n - 1) // 2]
+            hi = values[start + n // 2]
+            out[has] = (lo + hi) / 2.0
+            return out
+        return self._cached('median', compute)
+
+    def ci(self, stat="mean", n_boot=None, ci=0.95, seed=None, n_jobs=1):
+        """IC bootstrap (lwr, upr) por célula (stats/bootstrap.py), calculado uma vez por configuração."""
+        from stats import bootstrap
+        n_boot = n_boot or bootstrap.DEFAULT_N_BOOT
+        seed = bootstrap.DEFAULT_SEED if seed is None else seed
+        return self._cached(('ci', stat, n_boot, ci, seed), lambda: bootstrap.bootstrap_ci(
+            self, stat=stat, n_boot=n_boot, ci=ci, seed=seed, n_jobs=n_jobs))
+
+    def grid(self, name: str) -> np.ndarray:
+        """Estatística por célula no formato dos níveis das chaves."""
+        return np.asarray(getattr(self, name)).reshape(self.shape)
+
+    # ---------- saídas ----------
+    def moments(self):
+        """(labels, n, mean, var) dos grupos não vazios, como native.group_moments()."""
+        keep = self.n > 0
+        return self.labels[keep], self.n[keep], self.mean[keep], self.var[keep]
+
+    @property
+    def label_values(self):
+        """
+        Níveis da primeira chave com o tipo da coluna de origem (ex.: 1, 2, 10
+        inteiros em vez de '1', '10', '2'); para chaves texto, os próprios labels.
+        """
+        def compute():
+            s = self.source[self.keys[0]] if self.keys[0] in getattr(self.source, "columns", ()) else None
+            if s is None or is_text_key(s):
+                return pd.Index(self.labels, dtype=object)
+            _, raw = pd.factorize(s)
+            raw = pd.Index(raw)
+            text = raw.astype(str)
+            first = ~text.duplicated()
+            pos = text[first].get_indexer(pd.Index(self.labels, dtype=object))
+            if (pos < 0).any():
+                return pd.Index(self.labels, dtype=object)
+            return raw[first].take(pos)
+        return self._cached('label_values', compute)
+
+    def summary(self, ci=None, **ci_kwargs) -> pd.DataFrame:
+        """
+        Tabela por grupo com as colunas de summary_by_group (count, mean, std, median, sem).
+        Com ci (ex.: 0.95) acrescenta ci_lwr/ci_upr, o IC bootstrap da média (ci_kwargs vão para self.ci).
+        Chaves não texto mantêm o tipo e a ordem de groupby (numérica, por exemplo).
+        """
+        if len(self.keys) != 1:
+            raise ValueError("summary() is only defined for a single grouping key.")
+        keep = self.n > 0
+        out = pd.DataFrame({
+            self.keys[0]: self.label_values[keep],
+            'count': self.n[keep].astype(np.int64),
+            'mean': self.mean[keep],
+            'std': self.std[keep],
+            'median': self.median[keep],
+            'sem': self.sem[keep],
+        })
+        if ci:
+            lwr, upr = self.ci("mean", ci=ci, **ci_kwargs)
+            out['ci_lwr'] = lwr[keep]
+            out['ci_upr'] = upr[keep]
+        if not is_text_key(out[self.keys[0]]):
+            try:
+                out = out.sort_values(self.keys[0], kind='stable', ignore_index=True)
+            except TypeError:
+                pass  # tipos misturados: fica a ordem dos rótulos texto
+        return out
+
+
+def grouped_for(df, group_col, value_col, grouped=None, fator_col=None) -> GroupedData:
+    """Reaproveita grouped se ele corresponder às colunas; senão constrói um novo."""
+    if grouped is not None and grouped.matches(df, group_col, value_col, fator_col):
+        return grouped
+    keys = [group_col] + ([fator_col] if fator_col else [])
+    return GroupedData(df, keys, value_col)
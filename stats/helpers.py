@@ -1,12 +1,8 @@
 import numpy as np
 import re
+import string
 
-# networkx is optional; if available we use clique-based assignment for Tukey letters
-try:
-    import networkx as nx
-    _HAS_NETWORKX = True
-except Exception:
-    _HAS_NETWORKX = False
+from stats.pairwise import PairwiseMatrix
 
 def find_pvalue_column(df):
     """Procura colunas com 'p' ou 'padj' no nome. Retorna primeira candidata ou None."""
@@ -25,7 +21,11 @@ def find_pvalue_column(df):
     return candidates[0] if candidates else None
 
 def parse_pair_name_for_group(comp_str, control_label=None):
-    """Tenta extrair (g1,g2) de strings comuns: 'A-B', 'A vs B', 'A vs. B', 'A - B'."""
+    """
+    Tenta extrair (g1,g2) de strings comuns: 'A-B', 'A vs B', 'A vs. B', 'A - B'.
+    Para tabelas inteiras prefira stats.pairwise.split_comparisons (vetorizado,
+    resolve rótulos com '-' contra os grupos conhecidos).
+    """
     s = str(comp_str)
 
     m = re.match(r"^(.*-\d+)-(.*)$", s)
@@ -63,83 +63,192 @@ def stars_from_p(p, alpha=0.05, all_pvalue=False):
         if pval <= alpha: return "*"
     return ''
 
+_LETTER_ALPHABET = string.ascii_lowercase + string.ascii_uppercase
+
+
+def letter_name(i):
+    """Nome da i-ésima letra (0-based): a..z, A..Z, aa, ab, ... (numeração bijetiva base 52)."""
+    base = len(_LETTER_ALPHABET)
+    out = ''
+    i += 1
+    while i > 0:
+        i, r = divmod(i - 1, base)
+        out = _LETTER_ALPHABET[r] + out
+    return out
+
+
+def _absorb_mask(L, new):
+    """Máscara das colunas de L que ficam: sai cada coluna new contida em outra coluna."""
+    idx = np.flatnonzero(new)
+    keep = np.ones(L.shape[1], dtype=bool)
+    if idx.size == 0:
+        return keep
+    Li = L.astype(np.float32)   # contagens exatas; float usa BLAS no produto
+    sub = (Li[:, idx].T @ (1 - Li)) == 0      # sub[c, d]: nova c contida em d
+    sup = ((1 - Li[:, idx]).T @ Li) == 0      # sup[c, d]: d contida na nova c
+    sub[np.arange(idx.size), idx] = False
+    equal = sub & sup
+    # contida estritamente em outra, ou duplicata de uma coluna anterior
+    drop = (sub & ~equal).any(axis=1) | (equal & (np.arange(L.shape[1]) < idx[:, None])).any(axis=1)
+    keep[idx[drop]] = False
+    return keep
+
+
+def _absorb(L, new):
+    """Remove, dentre as colunas new de L, as que estão contidas em outra coluna."""
+    return L[:, _absorb_mask(L, new)]
+
+
+# limite de colunas do insert-and-absorb (por grupo); acima dele o número de
+# colunas pode crescer exponencialmente e as letras vêm da cobertura gulosa
+MAX_LETTERS_PER_GROUP = 4
+
+
+def _shared_counts(L):
+    """shared[g, h]: número de colunas de L com g e h (float32: contagens exatas e BLAS)."""
+    Li = L.astype(np.float32)
+    return Li @ Li.T
+
+
+def _drop_redundant_columns(L, shared, candidates):
+    """
+    Remove, dentre as colunas candidates, as que têm todos os pares (e grupos)
+    cobertos por outra coluna. shared (_shared_counts(L)) é atualizado no
+    lugar, subtraindo cada coluna removida.
+    """
+    keep = np.ones(L.shape[1], dtype=bool)
+    cand = np.flatnonzero(candidates)
+    if cand.size == 0:
+        return L
+    # filtro vetorizado: coluna com algum par coberto só por ela nunca sai
+    # (remover outras colunas só diminui shared)
+    Lc = L[:, cand].T.astype(np.float32)
+    once = ((Lc @ (shared == 1).astype(np.float32)) * Lc).sum(axis=1)
+    for c in cand[once == 0]:
+        m = np.flatnonzero(L[:, c])
+        block = np.ix_(m, m)
+        if np.all(shared[block] > 1):
+            keep[c] = False
+            shared[block] -= 1
+    return L[:, keep]
+
+
+def _greedy_cover(nd):
+    """
+    Letras por cobertura gulosa: para cada par que não difere ainda sem letra
+    comum, uma coluna começando pelo par e estendida com os grupos que não
+    diferem de nenhum membro, preferindo os que cobrem mais pares novos.
+    """
+    k = nd.shape[0]
+    nd = nd.copy()
+    np.fill_diagonal(nd, True)
+    covered = np.zeros((k, k), dtype=bool)
+    cols = []
+    for i, j in zip(*np.triu_indices(k, 1)):
+        if not nd[i, j] or covered[i, j]:
+            continue
+        members = np.zeros(k, dtype=bool)
+        members[[i, j]] = True
+        cand = nd[i] & nd[j] & ~members
+        while cand.any():
+            gain = (nd & ~covered)[:, members].sum(axis=1)
+            g = np.flatnonzero(cand)[np.argmax(gain[cand])]
+            members[g] = True
+            cand &= nd[g]
+            cand[g] = False
+        covered |= members[:, None] & members[None, :]
+        cols.append(members)
+    for g in np.flatnonzero(~covered.any(axis=1)):
+        members = np.zeros(k, dtype=bool)
+        members[g] = True
+        cols.append(members)
+    return np.column_stack(cols) if cols else np.ones((k, 1), dtype=bool)
+
+
+def compact_letter_display(not_diff):
+    """
+    Matriz de letras (grupos x letras) pelo algoritmo insert-and-absorb de
+    Piepho (2004), seguido da etapa de varredura que remove letras redundantes.
+    Colunas redundantes saem após cada inserção; se mesmo assim passarem de
+    MAX_LETTERS_PER_GROUP * k, as letras vêm de uma cobertura gulosa
+    (válida, mas não necessariamente com o menor número de letras).
+
+    not_diff: matriz booleana simétrica (k x k), True quando o par NÃO difere.
+    Retorna uma matriz booleana L em que grupos que não diferem compartilham
+    ao menos uma coluna e grupos que diferem nunca compartilham. As colunas
+    vêm ordenadas pelo primeiro grupo que contêm (letra 'a' no primeiro grupo).
+    """
+    nd = np.asarray(not_diff, dtype=bool)
+    k = nd.shape[0]
+    diff = ~nd
+    np.fill_diagonal(diff, False)
+    L = np.ones((k, 1), dtype=bool)
+    shared = _shared_counts(L)    # mantido junto com L: soma/subtrai colunas
+    # inserir os pares (i, j1), (i, j2), ... um a um numa coluna C que contém i
+    # equivale a trocar C por C - {i} e C - D, com D = membros de C que diferem de i
+    for i in range(k):
+        d = diff[i].copy()
+        d[:i] = False   # pares (j, i) com j < i já foram inseridos
+        hit = L[i] & (L & d[:, None]).any(axis=0)
+        if not hit.any():
+            continue
+        split = L[:, hit]
+        shared -= _shared_counts(split)
+        a = split.copy()
+        a[i] = False
+        b = split & ~d[:, None]
+        L = np.concatenate([L[:, ~hit], a, b], axis=1)
+        new = np.zeros(L.shape[1], dtype=bool)
+        new[-2 * split.shape[1]:] = True
+        keep = _absorb_mask(L, new)
+        L, new = L[:, keep], new[keep]
+        added = L[:, new]
+        shared += _shared_counts(added)
+        # só fica redundante uma coluna com algum par (ou, se unitária, o
+        # grupo) coberto de novo por uma coluna nova
+        overlap = L.T.astype(np.float32) @ added.astype(np.float32)
+        size = L.sum(axis=0)
+        overlap[new.nonzero()[0], np.arange(added.shape[1])] = 0
+        candidates = new | (overlap >= np.minimum(size, 2)[:, None]).any(axis=1)
+        L = _drop_redundant_columns(L, shared, candidates)
+        if L.shape[1] > MAX_LETTERS_PER_GROUP * max(k, 1):
+            L = _greedy_cover(nd)
+            break
+
+    # varredura: tira o grupo g da coluna c se todos os pares (g, h) da coluna
+    # também estão cobertos por outra coluna (e g continua com alguma letra)
+    shared = _shared_counts(L)
+    for c in range(L.shape[1]):
+        for g in np.flatnonzero(L[:, c]):
+            members = L[:, c].copy()
+            members[g] = False
+            if shared[g, g] > 1 and np.all(shared[g, members] > 1):
+                L[g, c] = False
+                shared[g, members] -= 1
+                shared[members, g] -= 1
+                shared[g, g] -= 1
+    L = L[:, L.any(axis=0)]
+    L = _absorb(L, np.ones(L.shape[1], dtype=bool))
+
+    # ordem determinística: primeiro grupo da coluna, depois os seguintes
+    order = sorted(range(L.shape[1]), key=lambda c: tuple(np.flatnonzero(L[:, c])))
+    return L[:, order]
+
+
 def assign_letters_from_pairwise(groups, pairwise_p, alpha):
     """
-    Greedy algorithm to assign letters (a,b,c...) so that groups that *do not*
-    differ significantly (p >= alpha) share a letter.
-    pairwise_p: dict keyed by frozenset({g1,g2}) -> p-value
+    Letras (a, b, c, ...) de forma que grupos que *não* diferem
+    significativamente (p >= alpha) compartilhem uma letra.
+    pairwise_p: PairwiseMatrix (stats/pairwise.py) ou o dict antigo
+    keyed by frozenset({g1,g2}) -> p-value.
+    Pares ausentes ou com p NaN são tratados como não significativos.
     """
     # normalize groups to strings to ensure consistent key lookup
     groups = [str(g) for g in groups]
+    if not isinstance(pairwise_p, PairwiseMatrix):
+        pairwise_p = PairwiseMatrix.from_dict(pairwise_p or {}, labels=groups)
+    not_diff = pairwise_p.reindex(groups).not_different(alpha)
 
-    # If networkx is available we build a graph where an edge means
-    # 'no significant difference' (p >= alpha). Then we find maximal
-    # cliques and assign a letter to each clique (groups may belong to
-    # multiple cliques, producing labels like 'ab'). This follows the
-    # example you provided.
-    if _HAS_NETWORKX:
-        G = nx.Graph()
-        G.add_nodes_from(groups)
-        # iterate pairs
-        n = len(groups)
-        for i in range(n):
-            for j in range(i + 1, n):
-                g1, g2 = groups[i], groups[j]
-                key = frozenset({str(g1), str(g2)})
-                p = pairwise_p.get(key, 1.0)
-                try:
-                    if np.isnan(p):
-                        p = 1.0
-                except Exception:
-                    pass
-                # add edge when NOT significantly different
-                if p >= alpha:
-                    G.add_edge(g1, g2)
-
-        # find maximal cliques (each clique can share a letter)
-        cliques = list(nx.find_cliques(G))
-
-        out = {g: '' for g in groups}
-        letra_ord = (chr(ord('a') + i) for i in range(26))
-        for clique in cliques:
-            try:
-                letra = next(letra_ord)
-            except StopIteration:
-                # Ran out of single letters; continue with double letters aa, ab... (simple fallback)
-                # This is unlikely for typical experiments.
-                letra = 'z'
-            for g in clique:
-                out[str(g)] = out.get(str(g), '') + letra
-        return out
-
-    # Fallback: greedy overlapping algorithm (no networkx available)
-    letters = []  # list of sets (containing string group names)
-
-    for g in groups:
-        added_to_any = False
-        for s in letters:
-            ok = True
-            for m in s:
-                key = frozenset({str(g), str(m)})
-                p = pairwise_p.get(key, 1.0)
-                try:
-                    if np.isnan(p):
-                        p = 1.0
-                except Exception:
-                    pass
-                if p < alpha:
-                    ok = False
-                    break
-            if ok:
-                s.add(g)
-                added_to_any = True
-        if not added_to_any:
-            letters.append(set([g]))
-
-    out = {}
-    for i, s in enumerate(letters):
-        lab = chr(ord('a') + i)
-        for g in s:
-            out[str(g)] = out.get(str(g), '') + lab
-
-    return out
+    L = compact_letter_display(not_diff)
+    names = [letter_name(c) for c in range(L.shape[1])]
+    return {g: ''.join(names[c] for c in np.flatnonzero(L[i])) for i, g in enumerate(groups)}
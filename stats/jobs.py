@@ -0,0 +1,181 @@
+# graph_app/stats/jobs.py
+"""
+Execução cancelável de testes com etapa e tempo decorrido.
+
+Um Job roda a função alvo numa thread própria. O código dos testes informa
+a etapa atual com set_stage('serialize' | 'compute' | 'parse' ...) e pode
+chamar check_cancelled() entre etapas. Processos filhos (worker R) são
+registrados com register_process() e, no cancelamento, a árvore inteira do
+processo é encerrada. Threads auxiliares entram no job com run_as().
+
+Uso (GUI):
+    job = Job(self.compute_stats, name="Tukey").start()
+    ...
+    job.cancel()
+    job.stage, job.elapsed, job.done
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+
+class JobCancelled(RuntimeError):
+    """O job foi cancelado pelo usuário."""
+
+
+_local = threading.local()
+
+
+def current_job():
+    """Job em execução na thread atual (ou None)."""
+    return getattr(_local, "job", None)
+
+
+def run_as(job, func, *args, **kwargs):
+    """
+    Roda func(*args, **kwargs) na thread atual como parte de job (ex.: threads
+    auxiliares de stats/parallel.py): set_stage, check_cancelled e
+    register_process passam a valer para ele.
+    """
+    previous = current_job()
+    _local.job = job
+    try:
+        return func(*args, **kwargs)
+    finally:
+        _local.job = previous
+
+
+def set_stage(stage: str):
+    """Registra a etapa atual do job desta thread e verifica cancelamento."""
+    job = current_job()
+    if job is not None:
+        job.stage = stage
+        job.check_cancelled()
+
+
+def check_cancelled():
+    job = current_job()
+    if job is not None:
+        job.check_cancelled()
+
+
+def cancel_requested() -> bool:
+    job = current_job()
+    return job is not None and job.cancel_event.is_set()
+
+
+def register_process(proc):
+    """Associa um processo filho ao job atual (é morto se o job for cancelado)."""
+    job = current_job()
+    if job is not None:
+        job.add_process(proc)
+
+
+def unregister_process(proc):
+    job = current_job()
+    if job is not None:
+        job.remove_process(proc)
+
+
+def popen_group_kwargs() -> dict:
+    """kwargs do Popen para que o filho fique em um grupo próprio (permite matar a árvore)."""
+    if sys.platform.startswith("win"):
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+def kill_process_tree(proc):
+    """Mata proc e seus descendentes (processo criado com popen_group_kwargs())."""
+    if proc is None or proc.poll() is not None:
+        return
+    try:
+        if sys.platform.startswith("win"):
+            subprocess.run(["taskkill", "/PID", str(proc.pid), "/T", "/F"],
+                           capture_output=True, timeout=10)
+        else:
+            os.killpg(os.getpgid(proc.pid), signal.SIGKILL)
+    except (OSError, subprocess.SubprocessError):
+        pass
+    try:
+        proc.kill()
+    except OSError:
+        pass
+
+
+class Job:
+    """Executa target() numa thread daemon, com cancelamento e etapa atual."""
+
+    def __init__(self, target, name: str = "job", on_done=None):
+        self.target = target
+        self.name = name
+        self.on_done = on_done
+        self.stage = "queued"
+        self.started = None
+        self.finished = None
+        self.result = None
+        self.error = None
+        self.cancel_event = threading.Event()
+        self._procs = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        self.started = time.monotonic()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        _local.job = self
+        try:
+            self.result = self.target()
+        except BaseException as e:
+            self.error = e
+        finally:
+            _local.job = None
+            self.finished = time.monotonic()
+            self.stage = "cancelled" if self.cancelled else "done"
+            if self.on_done is not None:
+                self.on_done(self)
+
+    # ---------- estado ----------
+    @property
+    def done(self):
+        return self.finished is not None
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    def check_cancelled(self):
+        if self.cancel_event.is_set():
+            raise JobCancelled(f"{self.name} cancelled")
+
+    # ---------- processos ----------
+    def add_process(self, proc):
+        with self._lock:
+            self._procs.add(proc)
+        if self.cancelled:
+            kill_process_tree(proc)
+
+    def remove_process(self, proc):
+        with self._lock:
+            self._procs.discard(proc)
+
+    def cancel(self):
+        """Pede o cancelamento e mata imediatamente os processos filhos registrados."""
+        self.cancel_event.set()
+        with self._lock:
+            procs = list(self._procs)
+        for proc in procs:
+            kill_process_tree(proc)
@@ -0,0 +1,418 @@
+# graph_app/stats/native.py
+"""
+Engines estatísticos nativos (NumPy/SciPy), sem depender do R.
+
+Funcionalidade:
+- group_moments(df, group_col, value_col) -> (labels, n, mean, var)
+- tukey_hsd(df, group_col, value_col, alpha=0.05)
+- dunnett_many_to_one(df, group_col, value_col, control_label, alpha=0.05)
+- p_adjust(p, method='holm')
+- welch_ttests(df, group_col, value_col, control_label=None, fator_col=None, alpha=0.05, p_adjust_method='holm')
+
+Os testes trabalham só com as estatísticas suficientes de cada grupo
+(n, média, variância), então todas as k·(k−1)/2 comparações são calculadas
+de uma vez como operações de array. Todos aceitam grouped=GroupedData
+(stats/grouped.py) para reaproveitar os momentos já calculados na análise.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from scipy import special
+from scipy.interpolate import CubicSpline
+from scipy.optimize import brentq
+from scipy.stats import chi2
+from scipy.stats import t as t_dist
+
+from stats.grouped import grouped_for
+from stats.jobs import check_cancelled
+from stats.pairwise import PairwiseMatrix
+
+
+def group_moments(df: pd.DataFrame, group_col: str, value_col: str, grouped=None):
+    """
+    Calcula (labels, n, mean, var) por grupo em uma única passada.
+    labels vêm ordenados (como os níveis de as.factor no R); var usa ddof=1
+    e é NaN para grupos com uma única observação. Com grouped
+    (stats/grouped.py) os momentos já calculados na análise são reutilizados.
+    """
+    return grouped_for(df, group_col, value_col, grouped).moments()
+
+
+# ---------- distribuição do studentized range ----------
+# scipy.stats.studentized_range integra numericamente ponto a ponto (~10 ms
+# por valor), o que inviabiliza milhares de comparações. Aqui a cauda do range
+# de k normais é tabelada uma vez por k em escala log e a integral sobre o
+# fator de escala s = sqrt(chi2/df) é feita por quadratura vetorizada.
+
+_W_MAX = 40.0
+_W_GRID = np.linspace(0.0, _W_MAX, 2049)
+_GL_X, _GL_W = np.polynomial.legendre.leggauss(16)
+
+
+def _gauss_legendre(edges, rule=(_GL_X, _GL_W)):
+    """Nós e pesos de Gauss-Legendre compostos nos intervalos de edges."""
+    gl_x, gl_w = rule
+    a, b = np.asarray(edges[:-1]), np.asarray(edges[1:])
+    half = (b - a)[:, None] / 2.0
+    nodes = (a[:, None] + half * (gl_x[None, :] + 1.0)).ravel()
+    weights = (half * gl_w[None, :]).ravel()
+    return nodes, weights
+
+
+_Z_NODES, _Z_WEIGHTS = _gauss_legendre(np.arange(-9.0, _W_MAX / 2 + 10.0, 1.0))
+
+# intervalos em u = F_chi2(s²·df) refinados geometricamente nas duas pontas
+_U_TAIL = 10.0 ** -np.arange(1, 15)
+_U_EDGES = np.unique(np.concatenate(([0.0, 0.25, 0.5, 0.75, 1.0], _U_TAIL, 1.0 - _U_TAIL)))
+_U_NODES, _U_WEIGHTS = _gauss_legendre(_U_EDGES)
+
+
+@lru_cache(maxsize=64)
+def _log_range_sf(k: int):
+    """Spline de log P(range de k normais padrão > w) sobre o grid _W_GRID."""
+    m = k - 1
+    z = _Z_NODES[None, :]
+    w = _W_GRID[:, None]
+    log_phi_z = special.log_ndtr(z)
+    # Φ(z)^m - (Φ(z) - Φ(z-w))^m calculado em log para não perder a cauda
+    x = np.exp(special.log_ndtr(z - w) - log_phi_z)
+    with np.errstate(divide='ignore'):
+        log_diff = m * log_phi_z + np.log(-np.expm1(m * np.log1p(-np.minimum(x, 1.0))))
+    log_pdf = -0.5 * z * z - 0.5 * np.log(2 * np.pi)
+    integrand = np.exp(log_pdf + log_diff) * _Z_WEIGHTS[None, :]
+    sf = np.clip(k * integrand.sum(axis=1), 1e-300, 1.0)
+    return CubicSpline(_W_GRID, np.log(sf))
+
+
+def studentized_range_sf(q, k: int, df: float):
+    """P(Q > q) para o studentized range com k grupos e df graus de liberdade."""
+    q = np.atleast_1d(np.asarray(q, dtype=float))
+    log_sf = _log_range_sf(int(k))
+    s = np.sqrt(np.minimum(chi2.ppf(_U_NODES, df), 1e300) / df)
+    w = np.abs(q)[:, None] * s[None, :]
+    vals = np.where(w > _W_MAX, 0.0, np.exp(log_sf(np.minimum(w, _W_MAX))))
+    out = np.nan_to_num(vals) @ _U_WEIGHTS
+    out = np.where(np.isnan(q), np.nan, np.clip(out, 0.0, 1.0))
+    return out
+
+
+def studentized_range_ppf(p: float, k: int, df: float):
+    """Quantil q tal que P(Q <= q) = p."""
+    target = 1.0 - p
+    f = lambda q: studentized_range_sf(q, k, df)[0] - target
+    hi = 10.0
+    while f(hi) > 0 and hi < 1e4:
+        hi *= 2
+    return brentq(f, 0.0, hi, xtol=1e-10)
+
+
+def tukey_hsd(df: pd.DataFrame, group_col: str, value_col: str, alpha: float = 0.05, grouped=None) -> pd.DataFrame:
+    """
+    Tukey HSD nativo (equivalente a aov + TukeyHSD do R).
+    Retorna DataFrame com colunas group1, group2, diff, lwr, upr, p.adj, comparison,
+    na mesma ordem de linhas do TukeyHSD ("B-A", "C-A", "C-B", ...).
+    """
+    labels, n, mean, var = group_moments(df, group_col, value_col, grouped)
+    k = len(labels)
+    if k < 2:
+        raise RuntimeError("Tukey requires at least 2 groups.")
+    df_resid = n.sum() - k
+    if df_resid <= 0:
+        raise RuntimeError("Tukey requires more observations than groups.")
+    mse = np.nansum((n - 1) * var) / df_resid
+
+    # mesma ordem do lower.tri do TukeyHSD: para cada coluna i, linhas j > i
+    i, j = np.triu_indices(k, 1)
+    diff = mean[j] - mean[i]
+    se = np.sqrt(mse / 2.0 * (1.0 / n[i] + 1.0 / n[j]))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        q = np.abs(diff) / se
+    p_adj = studentized_range_sf(q, k, df_resid)
+    width = studentized_range_ppf(1 - alpha, k, df_resid) * se
+
+    g1, g2 = labels[j], labels[i]
+    res = pd.DataFrame({
+        'group1': g1,
+        'group2': g2,
+        'diff': diff,
+        'lwr': diff - width,
+        'upr': diff + width,
+        'p.adj': p_adj,
+        'comparison': [f"{a}-{b}" for a, b in zip(g1, g2)],
+    })
+    res.attrs['pairwise'] = PairwiseMatrix.from_indices(
+        labels, j, i, p_adj, diff, diff - width, diff + width)
+    return res
+
+
+# ---------- distribuição de Dunnett ----------
+# Com correlação rho_ij = lam_i·lam_j (todas as comparações dividem o controle)
+# T_j = (lam_j·Z0 + sqrt(1 - lam_j²)·Z_j) / S e, condicionando em Z0 = z e
+# S = s, os |T_j| são independentes (Dunnett, 1955): a probabilidade vira uma
+# integral dupla em (z, s), feita pela mesma quadratura do studentized range.
+# Determinística e com a cauda em escala log, ao contrário da cdf por
+# quasi-Monte Carlo da t multivariada (erro ~1e-3, inclusive em scipy.stats.dunnett).
+
+# regra de 8 pontos: o integrando é suave o bastante e o custo cresce com
+# (nós em s) x (nós em z) x (tamanhos de grupo distintos) x (comparações)
+_DUNNETT_RULE = np.polynomial.legendre.leggauss(8)
+_DUNNETT_U_NODES, _DUNNETT_U_WEIGHTS = _gauss_legendre(_U_EDGES, _DUNNETT_RULE)
+
+
+def _dunnett_z_nodes(lam):
+    """
+    Nós/pesos em z ~ N(0, 1), com intervalos menores que a largura sqrt(1 - lam²)
+    das condicionais. Os nós são simétricos: nodes[::-1] == -nodes.
+    """
+    width = np.sqrt(1.0 - np.max(lam) ** 2)
+    n_int = int(np.ceil(18.0 / min(1.0, 2.0 * width)))
+    nodes, weights = _gauss_legendre(np.linspace(-9.0, 9.0, n_int + 1), _DUNNETT_RULE)
+    weights = weights * np.exp(-0.5 * nodes * nodes) / np.sqrt(2 * np.pi)
+    return nodes, weights
+
+
+def _dunnett_sf(t, lam, df):
+    """P(max_j |T_j| > t), com corr(T_i, T_j) = lam_i·lam_j e df graus de liberdade (cancelável)."""
+    t = np.abs(np.atleast_1d(np.asarray(t, dtype=float)))
+    lam, mult = np.unique(np.asarray(lam, dtype=float), return_counts=True)
+    z, wz = _dunnett_z_nodes(lam)
+    s = np.sqrt(np.minimum(chi2.ppf(_DUNNETT_U_NODES, df), 1e300) / df)
+    out = np.full(len(t), np.nan)
+    for i, ti in enumerate(t):
+        if np.isnan(ti):
+            continue
+        check_cancelled()
+        c = (ti * s)[:, None]
+        # log P(todos |Z_j| <= c | z): cada termo é a soma das duas caudas (sem cancelamento)
+        log_inside = np.zeros((len(s), len(z)))
+        for l, m in zip(lam, mult):
+            a = np.sqrt(1.0 - l * l)
+            lower = special.ndtr((-c - l * z) / a)
+            tails = lower + lower[:, ::-1]   # a outra cauda é a mesma função em -z
+            with np.errstate(divide='ignore'):
+                log_inside += m * np.log1p(-np.minimum(tails, 1.0))
+        out[i] = _DUNNETT_U_WEIGHTS @ -np.expm1(log_inside) @ wz
+    return np.clip(out, 0.0, 1.0)
+
+
+def _dunnett_critical(lam, df, alpha):
+    """
+    Valor crítico bilateral de Dunnett. Fica entre o t não ajustado e o limite
+    de Šidák (conservador para correlação positiva), que servem de intervalo
+    inicial para o brentq.
+    """
+    m = len(lam)
+    lo = t_dist.ppf(1 - alpha / 2, df)
+    if m == 1:
+        return lo
+    hi = t_dist.ppf(1 - (1 - (1 - alpha) ** (1.0 / m)) / 2, df)
+    f = lambda t: _dunnett_sf(t, lam, df)[0] - alpha
+    if f(hi) > 0:
+        hi *= 1.01  # erro de quadratura junto ao limite
+    return brentq(f, lo, hi, xtol=1e-8)
+
+
+def dunnett_many_to_one(df: pd.DataFrame, group_col: str, value_col: str, control_label: str, alpha: float = 0.05, grouped=None) -> pd.DataFrame:
+    """
+    Dunnett (cada grupo vs controle, bilateral) pela t multivariada com
+    correlação do controle comum, integrada por quadratura, sem DescTools.
+    Retorna uma linha por grupo tratado com colunas
+    group, control, diff, lwr.ci, upr.ci, statistic, pval, comparison.
+    """
+    labels, n, mean, var = group_moments(df, group_col, value_col, grouped)
+    control_label = str(control_label)
+    hits = np.flatnonzero(labels == control_label)
+    if len(hits) == 0:
+        raise RuntimeError(f"Control group {control_label!r} not found in {group_col!r}.")
+    c = hits[0]
+    k = len(labels)
+    if k < 2:
+        raise RuntimeError("Dunnett requires at least 2 groups.")
+    df_resid = n.sum() - k
+    if df_resid <= 0:
+        raise RuntimeError("Dunnett requires more observations than groups.")
+    mse = np.nansum((n - 1) * var) / df_resid
+
+    others = np.array([i for i in range(k) if i != c])
+    diff = mean[others] - mean[c]
+    se = np.sqrt(mse * (1.0 / n[others] + 1.0 / n[c]))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        stat = diff / se
+
+    # correlação entre as comparações (todas compartilham o controle): lam_i·lam_j
+    lam = np.sqrt(n[others] / (n[others] + n[c]))
+
+    pval = _dunnett_sf(stat, lam, df_resid)
+    width = _dunnett_critical(lam, df_resid, alpha) * se
+
+    groups = labels[others]
+    res = pd.DataFrame({
+        'group': groups,
+        'control': control_label,
+        'diff': diff,
+        'lwr.ci': diff - width,
+        'upr.ci': diff + width,
+        'statistic': stat,
+        'pval': pval,
+        'comparison': [f"{g}-{control_label}" for g in groups],
+    })
+    res.attrs['pairwise'] = PairwiseMatrix.from_indices(
+        labels, others, np.full(len(others), c), pval, diff, diff - width, diff + width,
+        control=control_label)
+    return res
+
+
+# ---------- Welch t-test + p.adjust ----------
+P_ADJUST_METHODS = ("holm", "hochberg", "bonferroni", "BH", "BY", "fdr", "none")
+
+
+def p_adjust(p, method: str = "holm"):
+    """
+    Equivalente ao p.adjust do R (holm, hochberg, bonferroni, BH/fdr, BY, none).
+    NaNs são ignorados e preservados, como no R.
+    """
+    key = str(method).lower()
+    p = np.asarray(p, dtype=float)
+    out = np.full(p.shape, np.nan)
+    ok = ~np.isnan(p)
+    pv = p[ok]
+    n = len(pv)
+    if n == 0:
+        return out
+
+    if key == "none":
+        adj = pv
+    elif key == "bonferroni":
+        adj = np.minimum(1.0, n * pv)
+    elif key == "holm":
+        o = np.argsort(pv, kind='stable')
+        adj = np.empty(n)
+        adj[o] = np.minimum(1.0, np.maximum.accumulate((n - np.arange(n)) * pv[o]))
+    elif key in ("hochberg", "bh", "fdr", "by"):
+        o = np.argsort(pv, kind='stable')[::-1]
+        i = np.arange(n, 0, -1)
+        if key == "hochberg":
+            scale = n - i + 1.0
+        elif key == "by":
+            scale = np.sum(1.0 / np.arange(1, n + 1)) * n / i
+        else:
+            scale = n / i
+        adj = np.empty(n)
+        adj[o] = np.minimum(1.0, np.minimum.accumulate(scale * pv[o]))
+    else:
+        raise ValueError(f"Unsupported p_adjust method {method!r}. Use one of {P_ADJUST_METHODS}.")
+    out[ok] = adj
+    return out
+
+
+def welch_t(n1, m1, v1, n2, m2, v2):
+    """
+    Welch t-test a partir dos momentos (arrays com broadcasting).
+    Retorna (statistic, df, p_value) bilaterais, iguais ao t.test(var.equal=FALSE).
+    """
+    n1, m1, v1, n2, m2, v2 = (np.asarray(a, dtype=float) for a in (n1, m1, v1, n2, m2, v2))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        a = v1 / n1
+        b = v2 / n2
+        se2 = a + b
+        stat = (m1 - m2) / np.sqrt(se2)
+        dof = se2 ** 2 / (a ** 2 / (n1 - 1) + b ** 2 / (n2 - 1))
+        pval = 2.0 * special.stdtr(dof, -np.abs(stat))
+    bad = (n1 < 2) | (n2 < 2)
+    stat, dof, pval = (np.where(bad, np.nan, x) for x in (stat, dof, pval))
+    return stat, dof, pval
+
+
+def _cell_moments(df: pd.DataFrame, keys: list, value_col: str) -> pd.DataFrame:
+    """count/mean/var (ddof=1) por combinação de keys em um único groupby."""
+    values = pd.to_numeric(df[value_col], errors='coerce')
+    frame = pd.DataFrame({k: df[k].astype(str) for k in keys})
+    frame['_v'] = values
+    frame = frame.dropna(subset=['_v'])
+    return frame.groupby(keys, sort=False)['_v'].agg(['count', 'mean', 'var'])
+
+
+def welch_ttests(
+    df: pd.DataFrame,
+    group_col: str,
+    value_col: str,
+    control_label: str = None,
+    fator_col: str = None,
+    alpha: float = 0.05,
+    p_adjust_method: str = "holm",
+    grouped=None,
+) -> pd.DataFrame:
+    """
+    Welch t-tests vetorizados, cobrindo os modos da GUI:
+    - control/classic (fator_col=None): control_label vs cada outro grupo,
+      comparação "control vs g", estatística = média(control) - média(g);
+    - two-by-two (fator_col): dentro de cada nível de group_col compara os
+      dois níveis de fator_col, comparação "nível : lv1 vs lv2".
+    p-values ajustados com p_adjust(p_adjust_method) sobre todas as linhas.
+    Retorna colunas comparison, group1, group2, statistic, df, p_raw, p_adj, reject
+    (mais group_col no modo two-by-two).
+    """
+    if fator_col:
+        cells = _cell_moments(df, [group_col, fator_col], value_col).reset_index()
+        # ordem de aparição dos níveis de fator_col dentro de cada grupo (como unique() no R)
+        cells['_pos'] = cells.groupby(group_col, sort=False).cumcount()
+        size = cells.groupby(group_col, sort=False)[fator_col].transform('size')
+        pairs = cells[size == 2]
+        levels = sorted(cells[group_col].unique())
+        first = pairs[pairs['_pos'] == 0].set_index(group_col).reindex(levels)
+        second = pairs[pairs['_pos'] == 1].set_index(group_col).reindex(levels)
+        table = pd.DataFrame({
+            group_col: levels,
+            'group1': first[fator_col].to_numpy(), 'group2': second[fator_col].to_numpy(),
+            'n1': first['count'].to_numpy(), 'm1': first['mean'].to_numpy(), 'v1': first['var'].to_numpy(),
+            'n2': second['count'].to_numpy(), 'm2': second['mean'].to_numpy(), 'v2': second['var'].to_numpy(),
+        })
+        comparison = [
+            f"{lv} : {a} vs {b}" if isinstance(a, str) else None
+            for lv, a, b in zip(table[group_col], table['group1'], table['group2'])
+        ]
+    else:
+        if control_label is None:
+            raise ValueError("control_label is required when fator_col is not given.")
+        if grouped is not None and grouped.matches(df, group_col, value_col):
+            # mesma tabela de _cell_moments, na ordem de aparição dos grupos
+            keep = np.flatnonzero(grouped.n > 0)
+            keep = keep[np.argsort(grouped.first_seen[keep], kind='stable')]
+            cells = pd.DataFrame({'count': grouped.n[keep], 'mean': grouped.mean[keep],
+                                  'var': grouped.var[keep]}, index=grouped.labels[keep])
+        else:
+            cells = _cell_moments(df, [group_col], value_col)
+        control_label = str(control_label)
+        if control_label not in cells.index:
+            raise RuntimeError(f"Control group {control_label!r} not found in {group_col!r}.")
+        ctrl = cells.loc[control_label]
+        other = cells.drop(index=control_label)
+        table = pd.DataFrame({
+            'group1': control_label,
+            'group2': other.index.astype(str),
+            'n1': ctrl['count'], 'm1': ctrl['mean'], 'v1': ctrl['var'],
+            'n2': other['count'].to_numpy(), 'm2': other['mean'].to_numpy(), 'v2': other['var'].to_numpy(),
+        })
+        comparison = [f"{control_label} vs {g}" for g in table['group2']]
+
+    stat, dof, p_raw = welch_t(table['n1'], table['m1'], table['v1'], table['n2'], table['m2'], table['v2'])
+    p_adj = p_adjust(p_raw, p_adjust_method)
+
+    out = pd.DataFrame({'comparison': comparison, 'group1': table['group1'], 'group2': table['group2']})
+    if fator_col:
+        out.insert(0, group_col, table[group_col])
+    out['statistic'] = stat
+    out['df'] = dof
+    out['p_raw'] = p_raw
+    out['p_adj'] = p_adj
+    out['reject'] = ~np.isnan(p_adj) & (p_adj < alpha)
+    out = out.reset_index(drop=True)
+    if not fator_col:
+        # grupo1 é sempre o controle: diff = média(controle) - média(g)
+        labels = [control_label] + list(table['group2'])
+        out.attrs['pairwise'] = PairwiseMatrix.from_indices(
+            labels, np.zeros(len(out), dtype=int), np.arange(1, len(out) + 1), p_adj,
+            diff=(table['m1'] - table['m2']).to_numpy(), control=control_label)
+    return out
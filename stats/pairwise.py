@@ -0,0 +1,273 @@
+# graph_app/stats/pairwise.py
+"""
+Matriz de comparações par a par indexada pelos grupos.
+
+PairwiseMatrix guarda, para k grupos em ordem fixa, arrays densos k x k de
+p-value, diferença de médias e intervalo de confiança. Pares não testados
+ficam com NaN. Os engines de stats/native.py preenchem a matriz direto a
+partir dos índices dos grupos (res.attrs['pairwise']), sem parsing de nomes
+de comparação, e anotações/letras/export usam máscaras vetorizadas.
+
+Convenções:
+- p é simétrica;
+- diff[i, j] = média(i) - média(j) (antissimétrica);
+- lwr/upr[i, j] é o IC de diff[i, j] (e lwr[j, i] = -upr[i, j]);
+- control: rótulo do controle em testes many-to-one (Dunnett, t vs controle).
+
+Uso:
+    pm = PairwiseMatrix.from_result(res, control="C")
+    sig = pm.significant(0.05)              # bool k x k
+    pm.reindex(labels_do_grafico).p
+    pm.to_dict(); PairwiseMatrix.from_dict(pmap, labels)   # formato antigo
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+# colunas reconhecidas em tabelas de resultado (ordem de preferência)
+_P_COLUMNS = ("p_adj", "p.adj", "pval", "p_raw", "p")
+_LWR_COLUMNS = ("lwr", "lwr.ci")
+_UPR_COLUMNS = ("upr", "upr.ci")
+
+
+# separadores aceitos em nomes de comparação ('B-A', 'C vs B', 'L : a vs b', ...).
+# Os separadores com palavra exigem os espaços (senão o 'x' de "Box" separa);
+# o '-' sem espaços só separa sozinho quando é o único hífen do nome, ou
+# ancorado nos rótulos conhecidos.
+_SEPARATORS = (" vs. ", " vs ", " VS ", " Vs ", " - ", " x ")
+_SEP_PATTERN = "|".join(re.escape(s) for s in sorted(_SEPARATORS, key=len, reverse=True)) + r"|\s*/\s*"
+_LEVEL = r"^(?:(?P<level>.+?) : )?"
+_GENERIC = rf"{_LEVEL}(?P<group1>.+?)(?:{_SEP_PATTERN})(?P<group2>.+)$"
+_HYPHEN = rf"{_LEVEL}(?P<group1>[^-]+)-(?P<group2>[^-]+)$"
+
+
+def split_comparisons(comparisons, labels=None) -> pd.DataFrame:
+    """
+    Separa nomes de comparação em (level, group1, group2) de uma vez só, com
+    str.extract. Sem labels, separa pelo primeiro separador com espaços
+    (' vs ', ' - ', ' x ', ...) ou pelo único '-' do nome; nomes com vários
+    hífens sem espaços ficam NaN. Com labels, os dois lados precisam ser
+    rótulos conhecidos (o mais longo primeiro), o que resolve rótulos que
+    contêm '-'.
+    level é o prefixo 'L : ' do modo two-by-two (NaN se ausente).
+    """
+    s = pd.Series(comparisons, dtype=object).astype(str).reset_index(drop=True)
+    out = s.str.extract(_GENERIC)
+    todo = out['group1'].isna()
+    if todo.any():
+        hyphen = s[todo].str.extract(_HYPHEN)
+        out.loc[hyphen.index] = hyphen
+    if labels is None:
+        return out
+    # só as linhas cujo split genérico não deu dois rótulos conhecidos passam
+    # pelo padrão ancorado nos rótulos (o mais longo primeiro)
+    known = pd.Index({str(l) for l in labels})
+    bad = ~(out['group1'].isin(known) & out['group2'].isin(known))
+    if bad.any():
+        alt = "|".join(re.escape(l) for l in sorted(known, key=len, reverse=True))
+        pattern = rf"{_LEVEL}(?P<group1>{alt})(?:{_SEP_PATTERN}|\s*-\s*)(?P<group2>{alt})$"
+        fixed = s[bad].str.extract(pattern)
+        ok = fixed['group1'].notna()
+        out.loc[fixed.index[ok]] = fixed[ok]
+    return out
+
+
+def ensure_group_columns(df: pd.DataFrame, labels=None) -> pd.DataFrame:
+    """Adiciona group1/group2 a partir de 'comparison' se a tabela ainda não os tiver."""
+    if {'group1', 'group2'} <= set(df.columns) or 'comparison' not in df.columns:
+        return df
+    parts = split_comparisons(df['comparison'], labels)
+    out = df.copy()
+    out['group1'] = parts['group1'].to_numpy()
+    out['group2'] = parts['group2'].to_numpy()
+    return out
+
+
+def _first_column(df, names):
+    for c in names:
+        if c in df.columns:
+            return c
+    return None
+
+
+class PairwiseMatrix:
+    """p-values, diferenças e ICs de todas as comparações entre k grupos."""
+
+    def __init__(self, labels, p=None, diff=None, lwr=None, upr=None, control=None):
+        self.labels = [str(l) for l in labels]
+        self.index = {l: i for i, l in enumerate(self.labels)}
+        k = len(self.labels)
+        self.p = self._matrix(p, k)
+        self.diff = self._matrix(diff, k)
+        self.lwr = self._matrix(lwr, k)
+        self.upr = self._matrix(upr, k)
+        self.control = str(control) if control is not None else None
+
+    @staticmethod
+    def _matrix(a, k):
+        if a is None:
+            return np.full((k, k), np.nan)
+        return np.asarray(a, dtype=np.float64).reshape(k, k)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __repr__(self):
+        return f"PairwiseMatrix(k={len(self)}, tested={len(self.pairs()[0])}, control={self.control!r})"
+
+    # ---------- construção ----------
+    @classmethod
+    def from_indices(cls, labels, i, j, p, diff=None, lwr=None, upr=None, control=None):
+        """
+        Preenche a matriz a partir das posições (i, j) dos grupos em labels,
+        um elemento por comparação; diff/lwr/upr referem-se a labels[i] - labels[j].
+        """
+        pm = cls(labels, control=control)
+        i, j = np.asarray(i, dtype=np.intp), np.asarray(j, dtype=np.intp)
+        p = np.asarray(p, dtype=np.float64)
+        pm.p[i, j] = pm.p[j, i] = p
+        if diff is not None:
+            diff = np.asarray(diff, dtype=np.float64)
+            pm.diff[i, j], pm.diff[j, i] = diff, -diff
+        if lwr is not None and upr is not None:
+            lwr, upr = np.asarray(lwr, dtype=np.float64), np.asarray(upr, dtype=np.float64)
+            pm.lwr[i, j], pm.upr[i, j] = lwr, upr
+            pm.lwr[j, i], pm.upr[j, i] = -upr, -lwr
+        return pm
+
+    @classmethod
+    def from_pairs(cls, labels, group1, group2, p, diff=None, lwr=None, upr=None, control=None):
+        """Como from_indices, mas com os rótulos dos grupos; grupos fora de labels são ignorados."""
+        idx = pd.Index([str(l) for l in labels])
+        i = idx.get_indexer(pd.Index(np.asarray(group1, dtype=object).astype(str)))
+        j = idx.get_indexer(pd.Index(np.asarray(group2, dtype=object).astype(str)))
+        ok = (i >= 0) & (j >= 0)
+
+        def take(a):
+            return None if a is None else np.asarray(a, dtype=np.float64)[ok]
+
+        return cls.from_indices(labels, i[ok], j[ok], take(p), take(diff), take(lwr), take(upr),
+                                control=control)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, control=None, labels=None):
+        """
+        Monta a matriz a partir de uma tabela de resultado com colunas
+        group1/group2 (Tukey, t-test), group/control (Dunnett) ou só
+        'comparison' (separada com split_comparisons contra labels).
+        Retorna None se não houver como identificar os grupos.
+        """
+        if df is None or df.empty:
+            return None
+        if 'group' not in df.columns:
+            df = ensure_group_columns(df, labels)
+        if {'group1', 'group2'} <= set(df.columns):
+            g1, g2 = df['group1'], df['group2']
+        elif 'group' in df.columns and (control is not None or 'control' in df.columns):
+            g1 = df['group']
+            g2 = df['control'] if 'control' in df.columns else pd.Series(str(control), index=df.index)
+            control = control if control is not None else str(g2.iloc[0])
+        else:
+            return None
+        pcol = _first_column(df, _P_COLUMNS)
+        lcol, ucol = _first_column(df, _LWR_COLUMNS), _first_column(df, _UPR_COLUMNS)
+        if labels is None:
+            labels = pd.unique(pd.concat([g1, g2], ignore_index=True).astype(str))
+        return cls.from_pairs(
+            labels, g1, g2,
+            p=df[pcol] if pcol else np.full(len(df), np.nan),
+            diff=df['diff'] if 'diff' in df.columns else None,
+            lwr=df[lcol] if lcol else None,
+            upr=df[ucol] if ucol else None,
+            control=control,
+        )
+
+    @classmethod
+    def from_result(cls, df: pd.DataFrame, control=None, labels=None):
+        """Matriz guardada pelo engine em df.attrs['pairwise'] ou, na falta dela, from_frame."""
+        if df is None:
+            return None
+        pm = df.attrs.get('pairwise')
+        if isinstance(pm, cls):
+            return pm
+        return cls.from_frame(df, control=control, labels=labels)
+
+    @classmethod
+    def from_dict(cls, pmap: dict, labels=None, control=None):
+        """Converte o formato antigo {frozenset({g1, g2}): p}."""
+        pairs = [tuple(str(g) for g in key) for key in pmap if len(key) == 2]
+        if labels is None:
+            labels = pd.unique(np.array([g for pair in pairs for g in pair], dtype=object))
+        p = [pmap[frozenset(pair)] for pair in pairs]
+        p = pd.to_numeric(pd.Series(p, dtype=object), errors='coerce').to_numpy(dtype=float)
+        return cls.from_pairs(labels, [a for a, _ in pairs], [b for _, b in pairs], p, control=control)
+
+    # ---------- consulta ----------
+    def reindex(self, labels):
+        """Nova matriz na ordem de labels (grupos ausentes ficam com NaN)."""
+        labels = [str(l) for l in labels]
+        pos = pd.Index(self.labels).get_indexer(pd.Index(labels))
+        ok = pos >= 0
+        out = PairwiseMatrix(labels, control=self.control)
+        sel = np.ix_(np.flatnonzero(ok), np.flatnonzero(ok))
+        src = np.ix_(pos[ok], pos[ok])
+        for name in ("p", "diff", "lwr", "upr"):
+            getattr(out, name)[sel] = getattr(self, name)[src]
+        return out
+
+    def tested(self):
+        """Máscara dos pares com p-value."""
+        return ~np.isnan(self.p)
+
+    def significant(self, alpha=0.05):
+        """Máscara p < alpha (pares não testados são False)."""
+        with np.errstate(invalid='ignore'):
+            return self.p < alpha
+
+    def not_different(self, alpha=0.05):
+        """Complemento de significant(), com a diagonal True."""
+        return ~self.significant(alpha)
+
+    def pairs(self, alpha=None):
+        """(i, j, p) dos pares testados do triângulo superior; só os significativos se alpha for dado."""
+        mask = self.significant(alpha) if alpha is not None else self.tested()
+        i, j = np.nonzero(np.triu(mask, 1))
+        return i, j, self.p[i, j]
+
+    def p_value(self, g1, g2):
+        i, j = self.index.get(str(g1)), self.index.get(str(g2))
+        if i is None or j is None or np.isnan(self.p[i, j]):
+            return None
+        return float(self.p[i, j])
+
+    def vs_control(self):
+        """{grupo: p} das comparações com o controle (vazio sem controle)."""
+        c = self.index.get(self.control) if self.control is not None else None
+        if c is None:
+            return {}
+        row = self.p[c]
+        return {self.labels[j]: float(row[j]) for j in np.flatnonzero(~np.isnan(row)) if j != c}
+
+    # ---------- conversões ----------
+    def to_dict(self) -> dict:
+        """Formato antigo {frozenset({g1, g2}): p} com os pares testados."""
+        i, j, p = self.pairs()
+        return {frozenset({self.labels[a], self.labels[b]}): float(v) for a, b, v in zip(i, j, p)}
+
+    def to_frame(self) -> pd.DataFrame:
+        """Tabela longa (triângulo superior dos pares testados)."""
+        i, j, p = self.pairs()
+        return pd.DataFrame({
+            'group1': [self.labels[a] for a in i],
+            'group2': [self.labels[b] for b in j],
+            'diff': self.diff[i, j],
+            'lwr': self.lwr[i, j],
+            'upr': self.upr[i, j],
+            'p': p,
+        })
+
+    def p_frame(self) -> pd.DataFrame:
+        """Matriz k x k de p-values rotulada (para exportação)."""
+        return pd.DataFrame(self.p, index=self.labels, columns=self.labels)
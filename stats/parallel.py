@@ -0,0 +1,121 @@
+# graph_app/stats/parallel.py
+"""
+Execução de vários testes ao mesmo tempo ("run all").
+
+Os engines nativos rodam em threads do próprio processo: o DataFrame e o
+GroupedData da análise são compartilhados sem cópia nem serialização, e não
+há custo de iniciar interpretadores e reimportar pandas/SciPy a cada clique
+(o trabalho pesado fica em NumPy/SciPy, que liberam o GIL). Os testes com
+backend='r' vão todos, em sequência, para o worker R persistente
+(stats/r_worker.py), numa única thread.
+
+As threads rodam como parte do job atual (stats/jobs.py): set_stage,
+check_cancelled e register_process valem para ele. No cancelamento, os
+testes ainda não iniciados são descartados (shutdown(cancel_futures=True)),
+job.cancel() mata os processos registrados (worker R) e os engines nativos
+param no próximo check_cancelled().
+
+Uso:
+    specs = [("Tukey", "tukey_test", {"alpha": 0.05}),
+             ("Dunnett", "dunnett_test", {"control_label": "C", "alpha": 0.05})]
+    results = run_tests_parallel(df, "grupo", "valor", specs, grouped=grouped)
+    # {'Tukey': DataFrame, 'Dunnett': DataFrame | Exception}
+    merged = merge_results(results)   # coluna 'method' + colunas de cada teste
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import pandas as pd
+
+from stats.jobs import JobCancelled, cancel_requested, current_job, run_as, set_stage
+
+# testes que podem ser rodados em paralelo (nome -> função de stats/tests.py)
+PARALLEL_TESTS = ("tukey_test", "dunnett_test", "pairwise_ttests_vs_control")
+
+
+def _mp_context():
+    # nunca fork: o processo principal é a GUI Tk com várias threads
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def _run_batch(job, df, group_col, value_col, batch):
+    """Roda [(método, função, kwargs), ...] em sequência; {método: DataFrame | Exception}."""
+    from stats import tests
+    out = {}
+    for method, func_name, kwargs in batch:
+        try:
+            out[method] = run_as(job, getattr(tests, func_name), df, group_col, value_col, **kwargs)
+        except JobCancelled:
+            raise
+        except Exception as e:
+            out[method] = e
+    return out
+
+
+def run_tests_parallel(df: pd.DataFrame, group_col: str, value_col: str, specs,
+                       fator_col: str = None, max_workers: int = None, grouped=None) -> dict:
+    """
+    Roda os testes de specs [(método, função, kwargs), ...] ao mesmo tempo:
+    cada teste nativo numa thread e os de backend='r' juntos numa só.
+    grouped (stats/grouped.py) é repassado aos testes que não o recebem em kwargs.
+    Retorna {método: DataFrame}; testes que falharem retornam a exceção no lugar
+    do DataFrame. Respeita o cancelamento do job atual (stats/jobs.py).
+    """
+    native, r_specs = [], []
+    for method, func_name, kwargs in specs:
+        if func_name not in PARALLEL_TESTS:
+            raise ValueError(f"Unsupported test for parallel run: {func_name}")
+        kwargs = dict(kwargs)
+        if fator_col:
+            kwargs.setdefault("fator_col", fator_col)
+        if grouped is not None:
+            kwargs.setdefault("grouped", grouped)
+        spec = (method, func_name, kwargs)
+        (r_specs if kwargs.get("backend") == "r" else native).append(spec)
+    batches = [[spec] for spec in native] + ([r_specs] if r_specs else [])
+    if not batches:
+        return {}
+    max_workers = max_workers or min(len(batches), max(os.cpu_count() or 1, 2))
+
+    set_stage("compute")
+    job = current_job()
+    results = {}
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stats-test")
+    try:
+        pending = {executor.submit(_run_batch, job, df, group_col, value_col, batch) for batch in batches}
+        while pending:
+            done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+            for fut in done:
+                try:
+                    results.update(fut.result())
+                except JobCancelled:
+                    pass  # tratado abaixo, com o job
+            if cancel_requested():
+                raise JobCancelled("parallel run cancelled")
+    finally:
+        # sem esperar: threads já em andamento param no próximo check_cancelled()
+        executor.shutdown(wait=not cancel_requested(), cancel_futures=True)
+
+    # mantém a ordem pedida em specs
+    return {method: results[method] for method, _, _ in specs if method in results}
+
+
+def merge_results(results: dict) -> pd.DataFrame:
+    """
+    Junta os DataFrames de cada método numa tabela só, com a coluna 'method'
+    na frente. Tabelas many-to-one (group/control, Dunnett) entram com
+    group1/group2 como as demais.
+    """
+    frames = []
+    for method, res in results.items():
+        if not isinstance(res, pd.DataFrame):
+            continue
+        if 'group1' not in res.columns and {'group', 'control'} <= set(res.columns):
+            res = res.rename(columns={'group': 'group1', 'control': 'group2'})
+        frames.append(res.assign(method=method)[["method"] + list(res.columns)])
+    if not frames:
+        return None
+    return pd.concat(frames, ignore_index=True, sort=False)
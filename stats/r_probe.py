@@ -0,0 +1,111 @@
+# graph_app/stats/r_probe.py
+"""
+Verificação do ambiente R em segundo plano.
+
+Descobre uma vez (na abertura da GUI) se há Rscript, qual a versão e quais
+pacotes exigidos pelos wrappers *_r estão instalados. O resultado é gravado
+em <user cache>/r_probe.json e reaproveitado enquanto estiver dentro do TTL.
+
+Uso:
+    start_probe(callback)          # callback(probe) chamado na thread do probe
+    probe = probe_r(force=False)   # versão síncrona (usa o cache se válido)
+"""
+
+import json
+import os
+import re
+import subprocess
+import threading
+import time
+
+from stats.cache import user_cache_dir
+from stats.r_worker import find_rscript
+
+PROBE_TTL = 24 * 3600
+REQUIRED_PACKAGES = ("DescTools",)
+# pacotes necessários por teste no backend R (Tukey e t-test só usam o R base)
+TEST_PACKAGES = {"Dunnett": ("DescTools",)}
+
+
+def _probe_path():
+    return os.path.join(user_cache_dir(), "r_probe.json")
+
+
+def run_probe(timeout: int = 30) -> dict:
+    """Executa a verificação agora (bloqueante)."""
+    probe = {"rscript": find_rscript(), "version": None, "packages": {}, "checked_at": time.time()}
+    if not probe["rscript"]:
+        return probe
+    try:
+        # Rscript --version escreve em stderr
+        out = subprocess.run([probe["rscript"], "--version"], capture_output=True, text=True, timeout=timeout)
+        m = re.search(r"version\s+([0-9][0-9.]*)", out.stderr + out.stdout)
+        probe["version"] = m.group(1) if m else None
+
+        pkgs = ", ".join(f'"{p}"' for p in REQUIRED_PACKAGES)
+        expr = f"x <- c({pkgs}); cat(paste(x, sapply(x, requireNamespace, quietly=TRUE), sep='='), sep='\\n')"
+        out = subprocess.run([probe["rscript"], "-e", expr], capture_output=True, text=True, timeout=timeout)
+        for line in out.stdout.splitlines():
+            if "=" in line:
+                name, ok = line.strip().split("=", 1)
+                probe["packages"][name] = ok == "TRUE"
+    except (OSError, subprocess.SubprocessError):
+        pass
+    return probe
+
+
+def load_cached_probe(ttl: float = PROBE_TTL):
+    """Retorna o probe gravado em disco se ainda for válido, senão None."""
+    try:
+        with open(_probe_path(), encoding="utf-8") as f:
+            probe = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if time.time() - probe.get("checked_at", 0) > ttl:
+        return None
+    # Rscript removido/movido desde a última verificação
+    if probe.get("rscript") and not os.path.exists(probe["rscript"]):
+        return None
+    if not probe.get("rscript") and find_rscript():
+        return None
+    return probe
+
+
+def save_probe(probe: dict):
+    try:
+        os.makedirs(os.path.dirname(_probe_path()), exist_ok=True)
+        with open(_probe_path(), "w", encoding="utf-8") as f:
+            json.dump(probe, f)
+    except OSError:
+        pass
+
+
+def probe_r(force: bool = False, ttl: float = PROBE_TTL) -> dict:
+    """Probe do cache (se válido) ou executa e grava um novo."""
+    if not force:
+        cached = load_cached_probe(ttl)
+        if cached is not None:
+            return cached
+    probe = run_probe()
+    save_probe(probe)
+    return probe
+
+
+def start_probe(callback=None, force: bool = False) -> threading.Thread:
+    """Roda probe_r() numa thread daemon e entrega o resultado a callback(probe)."""
+    def target():
+        probe = probe_r(force=force)
+        if callback is not None:
+            callback(probe)
+
+    t = threading.Thread(target=target, daemon=True)
+    t.start()
+    return t
+
+
+def r_ready_for(probe: dict, test: str) -> bool:
+    """True se o probe indica que o teste pode rodar no backend R."""
+    if not probe or not probe.get("rscript"):
+        return False
+    packages = probe.get("packages", {})
+    return all(packages.get(p, False) for p in TEST_PACKAGES.get(test, ()))
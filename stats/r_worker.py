@@ -0,0 +1,303 @@
+# graph_app/stats/r_worker.py
+"""
+Processo R persistente usado pelos wrappers de stats/tests.py.
+
+Em vez de abrir um Rscript novo a cada teste (e recarregar DescTools),
+um único processo R fica vivo lendo pedidos pelo stdin e respondendo pelo
+stdout. Protocolo (uma linha por campo):
+
+    RUN <id> <n_linhas_codigo> <n_args>
+    <linhas do código R>
+    <args, um por linha>
+
+O worker avalia o código num ambiente novo onde ``commandArgs()`` devolve os
+args enviados, de modo que os scripts existentes rodam sem alteração. Ao
+terminar responde ``__GRAFITICS_DONE__ <id> OK`` ou ``... ERR <mensagem>``.
+
+Se o processo morrer ele é reiniciado no próximo pedido; se um pedido passar
+do ``timeout`` o processo é encerrado e um RuntimeError é levantado. Pedidos
+feitos dentro de um stats.jobs.Job podem ser cancelados: a árvore do processo
+R é morta e jobs.JobCancelled é levantado.
+"""
+
+import atexit
+import itertools
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+
+from stats import jobs
+
+# pacotes carregados uma única vez na inicialização (se instalados)
+PRELOAD_PACKAGES = ("DescTools",)
+
+_READY_MARK = "__GRAFITICS_READY__"
+_DONE_MARK = "__GRAFITICS_DONE__"
+
+_WORKER_R = r"""
+con <- file("stdin")
+open(con, blocking = TRUE)
+preload <- strsplit(Sys.getenv("GRAFITICS_R_PRELOAD"), ",", fixed = TRUE)[[1]]
+for (p in preload) {
+  if (nzchar(p) && requireNamespace(p, quietly = TRUE)) {
+    suppressPackageStartupMessages(library(p, character.only = TRUE))
+  }
+}
+cat("__GRAFITICS_READY__\n")
+flush(stdout())
+repeat {
+  header <- readLines(con, n = 1)
+  if (length(header) == 0) break
+  parts <- strsplit(header, " ", fixed = TRUE)[[1]]
+  if (parts[1] != "RUN") break
+  id <- parts[2]
+  n_code <- as.integer(parts[3])
+  n_args <- as.integer(parts[4])
+  code <- if (n_code > 0) readLines(con, n = n_code) else character(0)
+  args <- if (n_args > 0) readLines(con, n = n_args) else character(0)
+  env <- new.env(parent = globalenv())
+  env$commandArgs <- local({
+    a <- args
+    function(trailingOnly = FALSE) a
+  })
+  status <- "OK"
+  out <- capture.output(status <- tryCatch({
+    eval(parse(text = code), envir = env)
+    "OK"
+  }, error = function(e) paste("ERR", gsub("[\r\n]+", " ", conditionMessage(e)))))
+  for (l in out) cat("OUT ", l, "\n", sep = "")
+  cat("__GRAFITICS_DONE__ ", id, " ", status, "\n", sep = "")
+  flush(stdout())
+  rm(env)
+  invisible(gc(verbose = FALSE))
+}
+"""
+
+
+def find_rscript():
+    """Retorna path para Rscript se disponível, senão None."""
+    return shutil.which("Rscript")
+
+
+class _WorkerDied(Exception):
+    """O processo R terminou no meio de um pedido."""
+
+
+class RWorker:
+    """
+    Mantém um processo Rscript vivo e serializa os pedidos enviados a ele.
+
+    Uso:
+        worker = RWorker()
+        stdout, stderr = worker.run(r_code, args, timeout=60)
+    """
+
+    def __init__(self, rscript=None, preload=PRELOAD_PACKAGES, startup_timeout=120):
+        self.rscript = rscript
+        self.preload = tuple(preload)
+        self.startup_timeout = startup_timeout
+        self.restarts = 0
+        self._proc = None
+        self._lines = None
+        self._stderr = []
+        self._script_dir = None
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    # ---------- ciclo de vida ----------
+    @property
+    def alive(self):
+        return self._proc is not None and self._proc.poll() is None
+
+    def _start(self):
+        rscript = self.rscript or find_rscript()
+        if not rscript:
+            raise RuntimeError("Rscript not found in PATH. Install R and add Rscript to PATH.")
+
+        self._script_dir = tempfile.mkdtemp(prefix="grafitics_r_")
+        script_path = os.path.join(self._script_dir, "worker.R")
+        with open(script_path, "w", encoding="utf-8") as f:
+            f.write(_WORKER_R)
+
+        env = dict(os.environ, GRAFITICS_R_PRELOAD=",".join(self.preload))
+        self._proc = subprocess.Popen(
+            [rscript, script_path],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+            env=env,
+            **jobs.popen_group_kwargs(),
+        )
+        self._lines = queue.Queue()
+        self._stderr = []
+        threading.Thread(target=self._pump_stdout, args=(self._proc, self._lines), daemon=True).start()
+        threading.Thread(target=self._pump_stderr, args=(self._proc, self._stderr), daemon=True).start()
+
+        line = None
+        deadline = time.monotonic() + self.startup_timeout
+        # referência local: _stop() zera self._proc antes do finally
+        proc = self._proc
+        jobs.register_process(proc)
+        try:
+            while time.monotonic() < deadline:
+                if jobs.cancel_requested():
+                    self._stop()
+                    jobs.check_cancelled()
+                try:
+                    line = self._lines.get(timeout=0.2)
+                    break
+                except queue.Empty:
+                    continue
+        finally:
+            jobs.unregister_process(proc)
+        if line is None or line.strip() != _READY_MARK:
+            err = "".join(self._stderr)
+            self._stop()
+            raise RuntimeError(f"R worker failed to start. stderr:\n{err}")
+
+    @staticmethod
+    def _pump_stdout(proc, lines):
+        for line in proc.stdout:
+            lines.put(line.rstrip("\n"))
+        lines.put(None)  # EOF: processo terminou
+
+    @staticmethod
+    def _pump_stderr(proc, buf):
+        for line in proc.stderr:
+            buf.append(line)
+
+    def _stop(self):
+        proc, self._proc = self._proc, None
+        if proc is not None:
+            try:
+                jobs.kill_process_tree(proc)
+                proc.wait(timeout=5)
+            except Exception:
+                pass
+        if self._script_dir:
+            shutil.rmtree(self._script_dir, ignore_errors=True)
+            self._script_dir = None
+
+    def close(self):
+        """Encerra o processo R (o próximo run() inicia outro)."""
+        with self._lock:
+            if self.alive:
+                try:
+                    self._proc.stdin.write("QUIT\n")
+                    self._proc.stdin.flush()
+                    self._proc.wait(timeout=5)
+                except Exception:
+                    pass
+            self._stop()
+
+    # ---------- pedidos ----------
+    def run(self, r_code: str, args: list, timeout: int = 60):
+        """
+        Executa r_code no worker com commandArgs() == args.
+        Retorna (stdout, stderr) do pedido. Lança RuntimeError em caso de falha.
+        """
+        args = [str(a) for a in args]
+        if any("\n" in a or "\r" in a for a in args):
+            raise ValueError("R worker args cannot contain line breaks.")
+
+        with self._lock:
+            for attempt in (0, 1):
+                if not self.alive:
+                    if self._proc is not None:
+                        self.restarts += 1
+                    self._stop()
+                    self._start()
+                jobs.check_cancelled()
+                try:
+                    return self._request(r_code, args, timeout)
+                except _WorkerDied as e:
+                    # o processo caiu: reinicia e tenta uma única vez mais
+                    self._stop()
+                    self.restarts += 1
+                    if attempt:
+                        raise RuntimeError(f"R worker crashed twice while running the script.\n{e}")
+
+    def _request(self, r_code, args, timeout):
+        proc = self._proc
+        jobs.register_process(proc)
+        try:
+            return self._wait_reply(proc, r_code, args, timeout)
+        finally:
+            jobs.unregister_process(proc)
+
+    def _wait_reply(self, proc, r_code, args, timeout):
+        req_id = str(next(self._ids))
+        code_lines = r_code.splitlines()
+        del self._stderr[:]
+
+        payload = [f"RUN {req_id} {len(code_lines)} {len(args)}"] + code_lines + args
+        try:
+            proc.stdin.write("\n".join(payload) + "\n")
+            proc.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            jobs.check_cancelled()
+            raise _WorkerDied(str(e))
+
+        out = []
+        deadline = time.monotonic() + timeout
+        while True:
+            if jobs.cancel_requested():
+                self._stop()
+                jobs.check_cancelled()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                stdout, stderr = "\n".join(out), "".join(self._stderr)
+                self._stop()
+                raise RuntimeError(f"Rscript timeout after {timeout}s. stdout: {stdout} stderr: {stderr}")
+            try:
+                # fatias curtas para enxergar o cancelamento sem esperar o timeout
+                line = self._lines.get(timeout=min(remaining, 0.2))
+            except queue.Empty:
+                continue
+
+            if line is None:
+                jobs.check_cancelled()
+                raise _WorkerDied("STDOUT:\n" + "\n".join(out) + "\n\nSTDERR:\n" + "".join(self._stderr))
+            if line.startswith("OUT "):
+                out.append(line[4:])
+                continue
+            if line.startswith(_DONE_MARK):
+                _, rid, status = line.split(" ", 2)
+                if rid != req_id:
+                    continue  # resposta atrasada de um pedido anterior
+                stdout, stderr = "\n".join(out), "".join(self._stderr)
+                if status.startswith("ERR"):
+                    msg = status[3:].strip()
+                    raise RuntimeError(f"R worker returned error: {msg}\nSTDOUT:\n{stdout}\n\nSTDERR:\n{stderr}")
+                return stdout, stderr
+            out.append(line)
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_worker() -> RWorker:
+    """Retorna o worker R compartilhado do processo (criado sob demanda)."""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = RWorker()
+        return _worker
+
+
+@atexit.register
+def shutdown_worker():
+    """Encerra o worker compartilhado, se existir."""
+    global _worker
+    with _worker_lock:
+        if _worker is not None:
+            _worker.close()
+            _worker = None
@@ -0,0 +1,216 @@
+# graph_app/stats/streaming.py
+"""
+Resumo por grupo fora da memória (arquivos CSV muito grandes).
+
+O CSV é lido em blocos (pd.read_csv(chunksize=...)) só com as colunas de
+grupo e valor. Para cada bloco calculam-se n, média e M2 por grupo, que são
+combinados com os acumulados pela fórmula de Chan et al. (Welford em
+paralelo). A mediana vem de um sketch de quantis mergeável no estilo
+t-digest: cada grupo guarda no máximo ~compression centróides, e o sketch
+de todos os grupos é mantido em três arrays (grupo, média, peso), comprimidos
+de forma vetorizada a cada bloco.
+
+A memória fica limitada por chunksize + n_grupos * compression, e o resultado
+tem as mesmas colunas de summary_by_group (grupo, count, mean, std, median, sem).
+
+Uso:
+    summ = streaming_summary_csv("grande.csv", "genotipo", "valor", chunksize=1_000_000)
+
+    acc = StreamingSummary("genotipo", "valor")
+    for chunk in chunks:
+        acc.update(chunk)
+    summ = acc.result()
+"""
+
+import numpy as np
+import pandas as pd
+
+from stats.jobs import check_cancelled, set_stage
+
+DEFAULT_COMPRESSION = 200
+DEFAULT_CHUNKSIZE = 1_000_000
+
+
+def combine_moments(na, ma, m2a, nb, mb, m2b):
+    """
+    Junta (n, média, M2) de duas partes dos mesmos grupos (Chan et al.).
+    Arrays alinhados por grupo; grupos vazios numa das partes ficam com a outra.
+    """
+    n = na + nb
+    with np.errstate(invalid='ignore', divide='ignore'):
+        delta = mb - ma
+        frac = np.where(n > 0, nb / n, 0.0)
+        mean = ma + delta * frac
+        m2 = m2a + m2b + delta * delta * na * frac
+    return n, mean, m2
+
+
+class QuantileSketch:
+    """
+    Sketch de quantis mergeável (t-digest simplificado) para vários grupos.
+    Centróides de cada grupo são agrupados por faixas da função de escala
+    k(q) = compression/(2π)·asin(2q−1), mais finas perto das caudas.
+    """
+
+    def __init__(self, compression: int = DEFAULT_COMPRESSION):
+        self.compression = compression
+        self.gid = np.empty(0, dtype=np.int64)
+        self.mean = np.empty(0, dtype=np.float64)
+        self.weight = np.empty(0, dtype=np.float64)
+
+    def update(self, gid, values, weights=None):
+        """Acrescenta observações (ou centróides, com weights) e comprime."""
+        gid = np.asarray(gid, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        weights = np.ones(len(values)) if weights is None else np.asarray(weights, dtype=np.float64)
+        self.gid = np.concatenate([self.gid, gid])
+        self.mean = np.concatenate([self.mean, values])
+        self.weight = np.concatenate([self.weight, weights])
+        self._compress()
+
+    def merge(self, other: "QuantileSketch", gid_map=None):
+        """Incorpora outro sketch (gid_map traduz os ids de grupo do outro)."""
+        gid = other.gid if gid_map is None else np.asarray(gid_map, dtype=np.int64)[other.gid]
+        self.update(gid, other.mean, other.weight)
+
+    def _compress(self):
+        if len(self.mean) == 0:
+            return
+        order = np.lexsort((self.mean, self.gid))
+        gid, mean, w = self.gid[order], self.mean[order], self.weight[order]
+
+        # peso acumulado dentro de cada grupo -> quantil no meio de cada centróide
+        starts = np.flatnonzero(np.r_[True, gid[1:] != gid[:-1]])
+        sizes = np.diff(np.r_[starts, len(gid)])
+        cum = np.cumsum(w)
+        base = np.repeat(cum[starts] - w[starts], sizes)
+        total = np.repeat(np.add.reduceat(w, starts), sizes)
+        q = (cum - base - w / 2.0) / total
+        k = np.floor(self.compression / (2 * np.pi) * np.arcsin(np.clip(2 * q - 1, -1, 1)))
+
+        # centróides consecutivos do mesmo grupo e mesma faixa de k viram um só
+        new = np.r_[True, (gid[1:] != gid[:-1]) | (k[1:] != k[:-1])]
+        idx = np.flatnonzero(new)
+        wsum = np.add.reduceat(w, idx)
+        self.mean = np.add.reduceat(mean * w, idx) / wsum
+        self.weight = wsum
+        self.gid = gid[idx]
+
+    def quantile(self, q: float, n_groups: int = None) -> np.ndarray:
+        """Quantil q de cada grupo (interpolação linear entre centróides)."""
+        n_groups = n_groups if n_groups is not None else (int(self.gid.max()) + 1 if len(self.gid) else 0)
+        out = np.full(n_groups, np.nan)
+        if len(self.mean) == 0:
+            return out
+        # arrays já ficam ordenados por (grupo, média) após _compress
+        starts = np.flatnonzero(np.r_[True, self.gid[1:] != self.gid[:-1]])
+        ends = np.r_[starts[1:], len(self.gid)]
+        for s, e in zip(starts, ends):
+            m, w = self.mean[s:e], self.weight[s:e]
+            pos = np.cumsum(w) - w / 2.0
+            out[self.gid[s]] = np.interp(q * w.sum(), pos, m)
+        return out
+
+
+class StreamingSummary:
+    """Acumula count/mean/M2 (Chan) e o sketch de mediana por grupo, bloco a bloco."""
+
+    def __init__(self, group_col: str, value_col: str, compression: int = DEFAULT_COMPRESSION):
+        self.group_col = group_col
+        self.value_col = value_col
+        self.labels = []
+        self._ids = {}
+        self.n = np.zeros(0)
+        self.mean = np.zeros(0)
+        self.m2 = np.zeros(0)
+        self.sketch = QuantileSketch(compression)
+        self.rows = 0
+
+    def _global_ids(self, uniques) -> np.ndarray:
+        ids = np.empty(len(uniques), dtype=np.int64)
+        for i, lab in enumerate(uniques):
+            gid = self._ids.get(lab)
+            if gid is None:
+                gid = self._ids[lab] = len(self.labels)
+                self.labels.append(lab)
+            ids[i] = gid
+        grow = len(self.labels) - len(self.n)
+        if grow > 0:
+            self.n = np.r_[self.n, np.zeros(grow)]
+            self.mean = np.r_[self.mean, np.zeros(grow)]
+            self.m2 = np.r_[self.m2, np.zeros(grow)]
+        return ids
+
+    def update(self, chunk: pd.DataFrame):
+        """Incorpora um bloco (DataFrame com group_col e value_col)."""
+        values = pd.to_numeric(chunk[self.value_col], errors='coerce').to_numpy(dtype=np.float64)
+        groups = chunk[self.group_col]
+        ok = groups.notna().to_numpy() & np.isfinite(values)
+        self.update_arrays(groups[ok].astype(str), values[ok])
+
+    def update_arrays(self, groups, values):
+        values = np.asarray(values, dtype=np.float64)
+        self.rows += len(values)
+        if len(values) == 0:
+            return
+        codes, uniques = pd.factorize(np.asarray(groups, dtype=object))
+        gid = self._global_ids(uniques)[codes]
+        k = len(self.labels)
+
+        nb = np.bincount(gid, minlength=k).astype(float)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mb = np.bincount(gid, weights=values, minlength=k) / nb
+            dev = values - mb[gid]
+        m2b = np.bincount(gid, weights=dev * dev, minlength=k)
+        self._combine(nb, np.nan_to_num(mb), m2b)
+        self.sketch.update(gid, values)
+
+    def _combine(self, nb, mb, m2b):
+        self.n, self.mean, self.m2 = combine_moments(self.n, self.mean, self.m2, nb, mb, m2b)
+
+    def merge(self, other: "StreamingSummary"):
+        """Combina com outro acumulador (por exemplo, de outro arquivo ou processo)."""
+        gid = self._global_ids(other.labels)
+        k = len(self.labels)
+        nb, mb, m2b = np.zeros(k), np.zeros(k), np.zeros(k)
+        nb[gid], mb[gid], m2b[gid] = other.n, other.mean, other.m2
+        self._combine(nb, mb, m2b)
+        self.sketch.merge(other.sketch, gid_map=gid)
+        self.rows += other.rows
+
+    def result(self) -> pd.DataFrame:
+        """Tabela com as colunas de summary_by_group, ordenada pelo grupo."""
+        n = self.n
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.sqrt(np.where(n > 1, self.m2 / (n - 1), np.nan))
+        out = pd.DataFrame({
+            self.group_col: self.labels,
+            'count': n.astype(np.int64),
+            'mean': self.mean,
+            'std': std,
+            'median': self.sketch.quantile(0.5, len(self.labels)),
+        })
+        out['sem'] = out['std'] / np.sqrt(out['count'])
+        return out.sort_values(self.group_col, kind='mergesort').reset_index(drop=True)
+
+
+def streaming_summary_csv(path: str, group_col: str, value_col: str,
+                          chunksize: int = DEFAULT_CHUNKSIZE,
+                          compression: int = DEFAULT_COMPRESSION,
+                          progress=None, **read_kwargs) -> pd.DataFrame:
+    """
+    Resumo por grupo de um CSV lido em blocos de chunksize linhas.
+    progress(rows_lidas) é chamado após cada bloco. Respeita o cancelamento
+    do job atual (stats/jobs.py).
+    """
+    acc = StreamingSummary(group_col, value_col, compression=compression)
+    set_stage("stream")
+    reader = pd.read_csv(path, usecols=[group_col, value_col], chunksize=chunksize,
+                         dtype={group_col: str}, **read_kwargs)
+    with reader:
+        for chunk in reader:
+            check_cancelled()
+            acc.update(chunk)
+            if progress is not None:
+                progress(acc.rows)
+    return acc.result()
@@ -1,6 +1,10 @@
-import numpy as np
+from stats.grouped import grouped_for
 
-def summary_by_group(df, group_col, value_col):
-    agg = df.groupby(group_col)[value_col].agg(['count','mean','std','median']).reset_index()
-    agg['sem'] = agg['std'] / np.sqrt(agg['count'])
-    return agg
+def summary_by_group(df, group_col, value_col, grouped=None, ci=None, **ci_kwargs):
+    """
+    count/mean/std/median/sem por grupo. Se grouped (stats/grouped.py) for
+    passado e corresponder às colunas, usa os momentos já calculados.
+    ci (ex.: 0.95) acrescenta as colunas ci_lwr/ci_upr com o IC bootstrap da
+    média (stats/bootstrap.py); ci_kwargs: n_boot, seed, n_jobs.
+    """
+    return grouped_for(df, group_col, value_col, grouped).summary(ci=ci, **ci_kwargs)
@@ -1,184 +1,359 @@
 # graph_app/stats/tests.py
 """
-R-backed statistical tests wrappers.
+Statistical tests wrappers (engines nativos e R).
 
 Funcionalidade:
+- tukey_test(df, group_col, value_col, alpha=0.05, backend='native', timeout=60)
 - tukey_test_r(df, group_col, value_col, alpha=0.05, timeout=60)
+- dunnett_test(df, group_col, value_col, control_label, alpha=0.05, backend='native', timeout=60)
 - dunnett_test_r(df, group_col, value_col, control_label, alpha=0.05, timeout=60)
+- pairwise_ttests_vs_control(df, group_col, value_col, control_label, alpha=0.05, p_adjust_method='holm', backend='native', timeout=60, fator_col=None)
 - pairwise_ttests_vs_control_r(df, group_col, value_col, control_label, alpha=0.05, p_adjust_method='holm', timeout=60)
 
-Cada função tenta usar Rscript (escreve um R temporário e o executa).
+Os resultados de tukey_test/dunnett_test/pairwise_ttests_vs_control passam pelo
+cache de stats/cache.py (mesmos dados + parâmetros -> resultado imediato).
+Eles aceitam grouped=GroupedData (stats/grouped.py): o engine nativo usa os
+momentos já calculados e o cache usa o fingerprint guardado no objeto.
+Aceitam também summary=tabela com (grupo, count, mean, std) por grupo, como a
+saída de summary_by_group, no lugar dos dados brutos (df e value_col são
+ignorados): Tukey, Dunnett e Welch só dependem dessas estatísticas, então o
+custo não depende do número de linhas. Só o engine nativo aceita summary=.
+
+    tukey_test(None, "grupo", None, summary=resumo)
+
+Os wrappers *_r enviam seu script ao worker R persistente (stats/r_worker.py),
+que mantém um único processo Rscript com os pacotes já carregados. Dados e
+resultados trafegam em colunas binárias (float64/int32 little-endian + níveis
+dos grupos em texto), sem CSV nem parsing de nomes de comparação.
 Se Rscript não for encontrado, as funções levantam RuntimeError (ou podem
 ser estendidas para rodar versões em Python).
 """
 
 import os
-import re
-import shutil
-import subprocess
 import tempfile
-import pandas as pd
 import textwrap
 
+import numpy as np
+import pandas as pd
+
+from stats.cache import cached_test
+from stats.grouped import GroupedData
+from stats.jobs import set_stage
+from stats.native import tukey_hsd, dunnett_many_to_one, welch_ttests
+from stats.pairwise import PairwiseMatrix
+from stats.r_worker import find_rscript, get_worker
+
+BACKENDS = ("native", "r")
+
 def _find_rscript():
     """Retorna path para Rscript se disponível, senão None."""
-    return shutil.which("Rscript")
+    return find_rscript()
 
 def _run_r_script(r_code: str, args: list, timeout: int = 60):
     """
-    Escreve r_code em um arquivo temporário e executa com Rscript, passando args.
-    Retorna path para out CSVs que o script gerou (ou pandas DataFrame read) conforme convenção.
-    Lança RuntimeError em caso de falha, com stderr incluído.
+    Executa r_code no worker R persistente (stats/r_worker.py), passando args
+    como commandArgs(). O worker é iniciado na primeira chamada, mantém os
+    pacotes carregados e é reiniciado se cair.
+    Retorna (stdout, stderr). Lança RuntimeError em caso de falha ou timeout.
     """
-    rscript = _find_rscript()
-    if not rscript:
+    if not _find_rscript():
         raise RuntimeError("Rscript not found in PATH. Install R and add Rscript to PATH.")
-
+    return get_worker().run(r_code, args, timeout=timeout)
+
+
+# ---------- troca de dados binária com o R ----------
+# Entrada (em tmpdir): value.f64, group.i32 + group.txt e, opcionalmente,
+# fator.i32 + fator.txt. Códigos são 0-based; níveis vêm ordenados.
+# Saída: out_columns.tsv (nome<TAB>tipo) + out_<nome>.<tipo> por coluna.
+_R_IO = textwrap.dedent("""
+    .gf_read_codes <- function(dir, name, n) {
+      codes <- readBin(file.path(dir, paste0(name, ".i32")), what = "integer", n = n, size = 4, endian = "little")
+      levels <- readLines(file.path(dir, paste0(name, ".txt")), encoding = "UTF-8")
+      factor(codes + 1L, levels = seq_along(levels), labels = levels)
+    }
+    .gf_read_input <- function(dir) {
+      n <- file.size(file.path(dir, "value.f64")) / 8
+      d <- data.frame(value = readBin(file.path(dir, "value.f64"), what = "double", n = n, size = 8, endian = "little"))
+      d$group <- .gf_read_codes(dir, "group", n)
+      if (file.exists(file.path(dir, "fator.i32"))) d$fator <- .gf_read_codes(dir, "fator", n)
+      d
+    }
+    .gf_write_result <- function(dir, cols) {
+      types <- character(0)
+      for (nm in names(cols)) {
+        x <- cols[[nm]]
+        if (is.logical(x)) x <- as.integer(x)
+        if (is.integer(x)) {
+          writeBin(x, file.path(dir, paste0("out_", nm, ".i32")), size = 4, endian = "little")
+          types <- c(types, "i32")
+        } else {
+          writeBin(as.double(x), file.path(dir, paste0("out_", nm, ".f64")), size = 8, endian = "little")
+          types <- c(types, "f64")
+        }
+      }
+      writeLines(paste(names(cols), types, sep = "\\t"), file.path(dir, "out_columns.tsv"))
+    }
+""").strip()
+
+_R_NA_INT = np.iinfo(np.int32).min
+
+
+def _write_r_input(tmpdir: str, df: pd.DataFrame, group_col: str, value_col: str, fator_col: str = None, grouped=None):
+    """
+    Grava os dados de entrada em colunas binárias para o R.
+    Linhas sem grupo/fator ou com valor não numérico são descartadas.
+    Com grouped (stats/grouped.py) os códigos já calculados são gravados direto.
+    Retorna (níveis do grupo, níveis do fator ou None).
+    """
+    if (not fator_col and grouped is not None and grouped.matches(df, group_col, value_col)
+            and (grouped.n > 0).all()):
+        grouped.values.astype('<f8').tofile(os.path.join(tmpdir, "value.f64"))
+        grouped.codes.astype('<i4').tofile(os.path.join(tmpdir, "group.i32"))
+        with open(os.path.join(tmpdir, "group.txt"), "w", encoding="utf-8") as f:
+            f.write("\n".join(grouped.labels) + "\n")
+        return grouped.labels, None
+
+    values = pd.to_numeric(df[value_col], errors='coerce').to_numpy(dtype='<f8')
+    mask = df[group_col].notna().to_numpy() & ~np.isnan(values)
+    if fator_col:
+        mask &= df[fator_col].notna().to_numpy()
+
+    # fatoriza só as linhas válidas para que todo nível tenha observações
+    group_codes, group_levels = pd.factorize(df[group_col][mask].astype(str), sort=True)
+    values[mask].tofile(os.path.join(tmpdir, "value.f64"))
+    group_codes.astype('<i4').tofile(os.path.join(tmpdir, "group.i32"))
+    with open(os.path.join(tmpdir, "group.txt"), "w", encoding="utf-8") as f:
+        f.write("\n".join(group_levels) + "\n")
+    if not fator_col:
+        return np.asarray(group_levels, dtype=object), None
+
+    fator_codes, fator_levels = pd.factorize(df[fator_col][mask].astype(str), sort=True)
+    fator_codes.astype('<i4').tofile(os.path.join(tmpdir, "fator.i32"))
+    with open(os.path.join(tmpdir, "fator.txt"), "w", encoding="utf-8") as f:
+        f.write("\n".join(fator_levels) + "\n")
+    return np.asarray(group_levels, dtype=object), np.asarray(fator_levels, dtype=object)
+
+
+def _read_r_result(tmpdir: str) -> dict:
+    """Lê as colunas binárias gravadas por .gf_write_result(). int32 NA do R vira -1."""
+    spec = os.path.join(tmpdir, "out_columns.tsv")
+    if not os.path.exists(spec):
+        return None
+    cols = {}
+    with open(spec, encoding="utf-8") as f:
+        for line in f:
+            name, typ = line.rstrip("\n").split("\t")
+            arr = np.fromfile(os.path.join(tmpdir, f"out_{name}.{typ}"), dtype='<f8' if typ == "f64" else '<i4')
+            if typ == "i32":
+                arr = np.where(arr == _R_NA_INT, -1, arr)
+            cols[name] = arr
+    return cols
+
+
+def _labels(levels, codes):
+    """Converte códigos 0-based em rótulos (None para -1)."""
+    out = np.empty(len(codes), dtype=object)
+    ok = codes >= 0
+    out[ok] = levels[codes[ok]]
+    out[~ok] = None
+    return out
+
+
+def _control_code(levels, control_label):
+    hits = np.flatnonzero(levels == str(control_label))
+    if len(hits) == 0:
+        raise RuntimeError(f"Control group {control_label!r} not found.")
+    return int(hits[0])
+
+
+def _run_r_test(r_body: str, df, group_col, value_col, extra_args, timeout, fator_col=None, control_label=None, name="R test", grouped=None):
+    """
+    Roda r_body sobre os dados em formato binário. O script recebe
+    args[1] = tmpdir, depois o código 0-based do controle (se control_label)
+    e então extra_args. Retorna (colunas do resultado, níveis do grupo, níveis do fator).
+    """
     with tempfile.TemporaryDirectory() as tmpdir:
-        script_path = os.path.join(tmpdir, "run_r_script.R")
-        with open(script_path, "w", encoding="utf-8") as f:
-            f.write(r_code)
-
-        cmd = [rscript, script_path] + args
-        try:
-            completed = subprocess.run(cmd, check=True, capture_output=True, timeout=timeout, text=True)
-            # sucesso: stdout/stderr disponíveis se precisar
-            return completed.stdout, completed.stderr, tmpdir
-        except subprocess.CalledProcessError as e:
-            msg = f"Rscript returned error code {e.returncode}.\nSTDOUT:\n{e.stdout}\n\nSTDERR:\n{e.stderr}"
-            raise RuntimeError(msg)
-        except subprocess.TimeoutExpired as e:
-            raise RuntimeError(f"Rscript timeout after {timeout}s. stdout: {e.stdout} stderr: {e.stderr}")
-
-
-def tukey_test_r(df: pd.DataFrame, group_col: str, value_col: str, alpha: float =0.05, timeout: int = 60) -> pd.DataFrame:
+        set_stage("serialize")
+        levels, fator_levels = _write_r_input(tmpdir, df, group_col, value_col, fator_col=fator_col, grouped=grouped)
+        args = [tmpdir]
+        if control_label is not None:
+            args.append(_control_code(levels, control_label))
+        args += list(extra_args)
+        r_code = _R_IO + "\n" + textwrap.dedent(r_body).strip()
+        set_stage("compute")
+        stdout, stderr = _run_r_script(r_code, [str(a) for a in args], timeout=timeout)
+        set_stage("parse")
+        cols = _read_r_result(tmpdir)
+        if cols is None:
+            raise RuntimeError(f"{name}: R did not generate expected output. stdout: {stdout}\nstderr: {stderr}")
+    return cols, levels, fator_levels
+
+
+def _check_backend(backend: str) -> str:
+    backend = (backend or "native").lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}. Use one of {BACKENDS}.")
+    return backend
+
+
+def _summary_input(summary: pd.DataFrame, group_col: str, backend: str, fator_col: str = None):
+    """(df, value_col, grouped) para rodar o engine nativo sobre uma tabela de resumo."""
+    if _check_backend(backend) == "r":
+        raise ValueError("summary= needs backend='native': the R backend works on the raw data.")
+    if fator_col:
+        raise ValueError("summary= does not support fator_col (two-by-two needs per-cell statistics).")
+    return summary, "mean", GroupedData.from_summary(summary, group_col)
+
+
+@cached_test("tukey")
+def tukey_test(df: pd.DataFrame, group_col: str, value_col: str, alpha: float = 0.05, backend: str = "native", timeout: int = 60, grouped=None, summary=None) -> pd.DataFrame:
+    """
+    Tukey HSD. backend='native' (padrão) roda em NumPy/SciPy sem R;
+    backend='r' usa tukey_test_r(). Ambos retornam group1, group2, diff, lwr, upr, p.adj.
+    summary: tabela (grupo, count, mean, std) no lugar de df.
+    """
+    if summary is not None:
+        df, value_col, grouped = _summary_input(summary, group_col, backend)
+    elif _check_backend(backend) == "r":
+        return tukey_test_r(df, group_col, value_col, alpha=alpha, timeout=timeout, grouped=grouped)
+    set_stage("compute")
+    return tukey_hsd(df, group_col, value_col, alpha=alpha, grouped=grouped)
+
+
+def tukey_test_r(df: pd.DataFrame, group_col: str, value_col: str, alpha: float =0.05, timeout: int = 60, grouped=None) -> pd.DataFrame:
     """
     Executa Tukey HSD usando R (aov + TukeyHSD).
-    Retorna um DataFrame com as colunas padrão (group1, group2, meandiff, p adj, lower, upper).
+    Retorna DataFrame com as mesmas colunas do engine nativo
+    (group1, group2, diff, lwr, upr, p.adj, comparison).
     """
     rscript = _find_rscript()
     if not rscript:
         raise RuntimeError("Rscript not found. Install R to use tukey_test_r().")
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        in_csv = os.path.join(tmpdir, "input.csv")
-        out_csv = os.path.join(tmpdir, "tukey_out.csv")
-        df[[group_col, value_col]].to_csv(in_csv, index=False)
-
-        r_code = textwrap.dedent(f"""
+    r_body = """
         args <- commandArgs(trailingOnly=TRUE)
-        in_csv <- args[1]
-        group_col <- args[2]
-        value_col <- args[3]
-        out_csv <- args[4]
-        alpha <- as.numeric(args[5])
-
-        d <- read.csv(in_csv, stringsAsFactors=FALSE)
-        # garantir tipos
-        d[[group_col]] <- as.factor(d[[group_col]])
-        d[[value_col]] <- as.numeric(d[[value_col]])
-
-        # aov + TukeyHSD
-        formula <- as.formula(paste(value_col, "~", group_col))
-        fit <- aov(formula, data=d)
-        tuk <- TukeyHSD(fit, conf.level = 1 - alpha)
-        # TukeyHSD retorna uma lista por term; pegamos o primeiro
-        termname <- names(tuk)[1]
-        dfres <- as.data.frame(tuk[[termname]])
-        # dfres tem rownames como "A-B", convertemos em duas colunas
-        dfres$comparison <- rownames(dfres)
-        # organizar colunas: comparison, diff, lwr, upr, p adj (padj)
-        # nomes variam dependendo da versão R; padj chama-se 'p adj'
-        names(dfres) <- make.names(names(dfres))
-        # salvar em csv
-        write.csv(dfres, out_csv, row.names=FALSE)
-        """).strip()
-
-        args = [in_csv, group_col, value_col, out_csv, str(alpha)]
-        stdout, stderr, _ = _run_r_script(r_code, args, timeout=timeout)
-
-        if not os.path.exists(out_csv):
-            raise RuntimeError(f"R did not generate expected output. stdout:{stdout}\\nstderr: {stderr}")
-
-        res = pd.read_csv(out_csv)
-        # tentar extrair group1/group2 se comparison tem ' - ' or ' - ' or ' vs ' or '-'
-        if 'comparison' in res.columns:
-            comps = res['comparison'].astype(str).str.replace(r'\\.', ' ', regex=True)
-            g1, g2 = [], []
-            for c in comps:
-                m = re.match(r"^(.*-\d+)-(.*)$", c)
-                if m:
-                    g1.append(m.group(1).strip())
-                    g2.append(m.group(2).strip())
-                else:
-                    sep = None
-                    for s in [' - ', '-', ' vs ', ' vs. ', ' ']:
-                        if s in c:
-                            sep=s; break
-                    if sep:
-                        parts = [p.strip() for p in c.split(sep) if p.strip()]
-                        if len(parts)>=2:
-                            g1.append(parts[0]); g2.append(parts[1])
-                        else:
-                            g1.append(parts[0]); g2.append('')
-                    else:
-                        g1.append(c); g2.append('')
-            res.insert(0, 'group1', g1)
-            res.insert(1, 'group2', g2)
-        return res
-
-
-def dunnett_test_r(df: pd.DataFrame, group_col: str, value_col: str, control_label: str, alpha: float = 0.05, timeout: int = 120) -> pd.DataFrame:
+        io_dir <- args[1]
+        alpha <- as.numeric(args[2])
+
+        d <- .gf_read_input(io_dir)
+        fit <- aov(value ~ group, data=d)
+        tuk <- TukeyHSD(fit, "group", conf.level = 1 - alpha)$group
+        # linhas do TukeyHSD seguem combn(): coluna (a, b) com a < b vira "b-a"
+        pairs <- combn(nlevels(d$group), 2)
+        .gf_write_result(io_dir, list(
+          group1 = pairs[2, ] - 1L, group2 = pairs[1, ] - 1L,
+          diff = tuk[, "diff"], lwr = tuk[, "lwr"], upr = tuk[, "upr"], p_adj = tuk[, "p adj"]))
+    """
+    cols, levels, _ = _run_r_test(r_body, df, group_col, value_col, [alpha], timeout, name="tukey_test_r",
+                                  grouped=grouped)
+    g1, g2 = _labels(levels, cols['group1']), _labels(levels, cols['group2'])
+    res = pd.DataFrame({
+        'group1': g1,
+        'group2': g2,
+        'diff': cols['diff'],
+        'lwr': cols['lwr'],
+        'upr': cols['upr'],
+        'p.adj': cols['p_adj'],
+        'comparison': [f"{a}-{b}" for a, b in zip(g1, g2)],
+    })
+    res.attrs['pairwise'] = PairwiseMatrix.from_indices(
+        levels, cols['group1'], cols['group2'], cols['p_adj'], cols['diff'], cols['lwr'], cols['upr'])
+    return res
+
+
+@cached_test("dunnett")
+def dunnett_test(df: pd.DataFrame, group_col: str, value_col: str, control_label: str, alpha: float = 0.05, backend: str = "native", timeout: int = 120, grouped=None, summary=None) -> pd.DataFrame:
+    """
+    Dunnett (todos vs controle). backend='native' (padrão) usa a t multivariada
+    via SciPy e retorna uma linha por grupo (group, control, diff, lwr.ci, upr.ci, pval);
+    backend='r' usa dunnett_test_r() (DescTools). summary: tabela (grupo, count, mean, std) no lugar de df.
+    """
+    if summary is not None:
+        df, value_col, grouped = _summary_input(summary, group_col, backend)
+    elif _check_backend(backend) == "r":
+        return dunnett_test_r(df, group_col, value_col, control_label, alpha=alpha, timeout=timeout, grouped=grouped)
+    set_stage("compute")
+    return dunnett_many_to_one(df, group_col, value_col, control_label, alpha=alpha, grouped=grouped)
+
+
+def dunnett_test_r(df: pd.DataFrame, group_col: str, value_col: str, control_label: str, alpha: float = 0.05, timeout: int = 120, grouped=None) -> pd.DataFrame:
     """
     Executa Dunnett test exato via DescTools::DunnettTest em R.
-    Retorna DataFrame com resultados (colunas dependem da DescTools, geralmente includes 'p-value').
+    Retorna uma linha por grupo tratado (group, control, diff, lwr.ci, upr.ci, pval, comparison).
     """
     rscript = _find_rscript()
     if not rscript:
         raise RuntimeError("Rscript not found. Install R to use dunnett_test_r().")
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        in_csv = os.path.join(tmpdir, "input.csv")
-        out_csv = os.path.join(tmpdir, "dunnett_out.csv")
-        df[[group_col, value_col]].to_csv(in_csv, index=False)
-
-        # R script: instala DescTools se não tiver, roda DunnettTest e salva CSV com 'comparison' col
-        r_code = textwrap.dedent(f"""
+    # R script: instala DescTools se não tiver, roda DunnettTest e devolve códigos dos grupos
+    r_body = """
         args <- commandArgs(trailingOnly=TRUE)
-        in_csv <- args[1]
-        group_col <- args[2]
-        value_col <- args[3]
-        control <- args[4]
-        out_csv <- args[5]
+        io_dir <- args[1]
+        ctrl <- as.integer(args[2]) + 1L
+        alpha <- as.numeric(args[3])
 
-        if (!requireNamespace("DescTools", quietly=TRUE)) {{
+        if (!requireNamespace("DescTools", quietly=TRUE)) {
           install.packages("DescTools", repos="https://cloud.r-project.org")
-        }}
+        }
         library(DescTools)
-        d <- read.csv(in_csv, stringsAsFactors=FALSE)
-        d[[group_col]] <- as.factor(d[[group_col]])
-        res <- DunnettTest(d[[value_col]], d[[group_col]], control = control)
-        # res pode ser a matriz direta; vamos transformar em data.frame
-        if (is.list(res)) {{
-          tmp <- res[[1]]
-        }} else {{
-          tmp <- res
-        }}
-        dfres <- as.data.frame(tmp)
-        dfres$comparison <- rownames(dfres)
-        # reorganizar: comparison first
-        dfres <- dfres[, c("comparison", setdiff(names(dfres), "comparison"))]
-        write.csv(dfres, out_csv, row.names=FALSE)
-        """).strip()
-
-        args = [in_csv, group_col, value_col, str(control_label), out_csv]
-        stdout, stderr, _ = _run_r_script(r_code, args, timeout=timeout)
-
-        if not os.path.exists(out_csv):
-            raise RuntimeError(f"R did not generate expected output. stdout: {stdout}\\nstderr: {stderr}")
-
-        res = pd.read_csv(out_csv)
-        return res
+        d <- .gf_read_input(io_dir)
+        res <- DunnettTest(d$value, d$group, control = levels(d$group)[ctrl], conf.level = 1 - alpha)
+        tmp <- res[[1]]
+        # linhas seguem a ordem dos níveis, sem o controle
+        others <- setdiff(seq_len(nlevels(d$group)), ctrl)
+        .gf_write_result(io_dir, list(
+          group = others - 1L, diff = tmp[, "diff"], lwr_ci = tmp[, "lwr.ci"],
+          upr_ci = tmp[, "upr.ci"], pval = tmp[, "pval"]))
+    """
+    cols, levels, _ = _run_r_test(r_body, df, group_col, value_col, [alpha], timeout,
+                                  control_label=control_label, name="dunnett_test_r", grouped=grouped)
+    groups = _labels(levels, cols['group'])
+    control_label = str(control_label)
+    res = pd.DataFrame({
+        'group': groups,
+        'control': control_label,
+        'diff': cols['diff'],
+        'lwr.ci': cols['lwr_ci'],
+        'upr.ci': cols['upr_ci'],
+        'pval': cols['pval'],
+        'comparison': [f"{g}-{control_label}" for g in groups],
+    })
+    res.attrs['pairwise'] = PairwiseMatrix.from_indices(
+        levels, cols['group'], np.full(len(groups), _control_code(levels, control_label)), cols['pval'],
+        cols['diff'], cols['lwr_ci'], cols['upr_ci'], control=control_label)
+    return res
+
+
+@cached_test("ttest")
+def pairwise_ttests_vs_control(
+    df: pd.DataFrame,
+    group_col: str,
+    value_col: str,
+    control_label: str,
+    alpha: float = 0.05,
+    p_adjust_method: str = "holm",
+    backend: str = "native",
+    timeout: int = 60,
+    grouped=None,
+    summary=None,
+    **kwargs
+) -> pd.DataFrame:
+    """
+    Welch t-tests (control vs others, classic ou two-by-two com fator_col=...).
+    backend='native' (padrão) calcula tudo a partir dos momentos dos grupos,
+    sem abrir processo; backend='r' usa pairwise_ttests_vs_control_r().
+    summary: tabela (grupo, count, mean, std) no lugar de df (sem fator_col).
+    Retorna DataFrame com columns: comparison, group1, group2, statistic, df, p_raw, p_adj, reject.
+    """
+    if summary is not None:
+        df, value_col, grouped = _summary_input(summary, group_col, backend, kwargs.get('fator_col'))
+    elif _check_backend(backend) == "r":
+        return pairwise_ttests_vs_control_r(df, group_col, value_col, control_label, alpha=alpha,
+                                            p_adjust_method=p_adjust_method, timeout=timeout,
+                                            grouped=grouped, **kwargs)
+    set_stage("compute")
+    return welch_ttests(df, group_col, value_col, control_label=control_label, fator_col=kwargs.get('fator_col'),
+                        alpha=alpha, p_adjust_method=p_adjust_method, grouped=grouped)
 
 
 def pairwise_ttests_vs_control_r(
@@ -189,137 +364,107 @@ def pairwise_ttests_vs_control_r(
     alpha: float = 0.05,
     p_adjust_method: str = "holm",
     timeout: int = 60,
-    **kwargs 
+    grouped=None,
+    **kwargs
 ) -> pd.DataFrame:
     """
     Para cada grupo != control, executa t.test(control, group) em R (Welch),
     calcula p-values e aplica p.adjust(method = p_adjust_method).
-    Retorna DataFrame com columns: comparison, statistic, p_raw, p_adj, reject (logical).
+    Com fator_col=..., compara os dois níveis de fator_col dentro de cada grupo (two-by-two).
+    Retorna DataFrame com columns: comparison, group1, group2, statistic, df, p_raw, p_adj, reject (logical).
     """
     rscript = _find_rscript()
     if not rscript:
         raise RuntimeError("Rscript not found. Install R to use pairwise_ttests_vs_control_r().")
-    
-    with tempfile.TemporaryDirectory() as tmpdir:
-        in_csv = os.path.join(tmpdir, "input.csv")
-        out_csv = os.path.join(tmpdir, "ttest_out.csv")
-        
-        try:
-            r_code = textwrap.dedent(f"""
-                args <- commandArgs(trailingOnly = TRUE)
-
-                in_csv     <- args[1]
-                group_col   <- args[2]
-                fator_col   <- args[3]
-                value_col  <- args[4]
-                padj_method <- args[5]
-                out_csv    <- args[6]
-                alpha <- as.numeric(args[7])
-
-                # instalar pacotes ausentes automaticamente (opcional)
-                needed <- c("dplyr", "rlang")
-                for (p in needed) {{
-                    if (!requireNamespace(p, quietly = TRUE)) {{
-                        install.packages(p, repos = "https://cloud.r-project.org")
-                    }}
-                }}
-                library(dplyr)
-                library(rlang)
-
-
-                names <- c()
-                stats <- c()
-
-                # Ler os dados
-                data <- read.csv(in_csv, stringsAsFactors=FALSE)
-
-                # t-test por grupo (group_col) — agora também captura a estatística t e a string de comparação
-                t_test_results <- data %>%
-                group_by(!!sym(group_col)) %>%
-                group_modify(~{{
-                    df <- .
-                    lv <- unique(df[[fator_col]])
-                    if (length(lv) == 2) {{
-                    g1 <- df[[value_col]][df[[fator_col]] == lv[1]]
-                    g2 <- df[[value_col]][df[[fator_col]] == lv[2]]
-                    res <- tryCatch(t.test(g1, g2, var.equal = FALSE), error = function(e) NULL)
-                    pval <- if (is.null(res)) NA_real_ else res$p.value
-                    stat <- if (is.null(res)) NA_real_ else as.numeric(res$statistic)
-                    comp <- paste0(unique(df[[group_col]]), " : ", lv[1], " vs ", lv[2])
-                    tibble(p_value = pval, statistic = stat, comparison = comp)
-                    }} else {{
-                    tibble(p_value = NA_real_, statistic = NA_real_, comparison = NA_character_)
-                    }}
-                }}) %>% ungroup()
-
-                # extrai vetores para gerar a saída no mesmo formato do teste-t.r
-                pvals <- t_test_results$p_value
-                stats <- t_test_results$statistic
-                first_col <- names(t_test_results)[1]
-                last_col  <- names(t_test_results)[ncol(t_test_results)]
-                names <- paste0(as.character(t_test_results[[first_col]]), as.character(t_test_results[[last_col]]))
-
-                p_adj <- p.adjust(pvals, method = padj_method)
-                reject <- ifelse(!is.na(p_adj) & p_adj < alpha, TRUE, FALSE)
-
-
-                out_df <- data.frame(comparison = names, statistic = stats, p_raw = pvals, p_adj = p_adj, reject = reject, stringsAsFactors=FALSE)
-                # Salvar em CSV
-                write.csv(out_df, out_csv, row.names = FALSE)
-            """).strip()
-            
-            fator_col = kwargs.get('fator_col')
-            df[[fator_col, group_col, value_col]].to_csv(in_csv, index=False)
-            if not fator_col:
-                raise ValueError
-
-            args = [in_csv, group_col, fator_col, value_col, p_adjust_method, out_csv, str(alpha)]
-        
-        except:
-            df[[group_col, value_col]].to_csv(in_csv, index=False)
-            r_code = textwrap.dedent(f"""
-                args <- commandArgs(trailingOnly=TRUE)
-                in_csv <- args[1]
-                group_col <- args[2]
-                value_col <- args[3]
-                control <- args[4]
-                out_csv <- args[5]
-                padj_method <- args[6]
-                alpha <- as.numeric(args[7])
-
-                d <- read.csv(in_csv, stringsAsFactors=FALSE)
-                d[[group_col]] <- as.character(d[[group_col]])
-                groups <- unique(d[[group_col]])
-                others <- setdiff(groups, control)
-                pvals <- c()
-                stats <- c()
-                names <- c()
-                for (g in others) {{
-                a <- d[d[[group_col]] == control, value_col]
-                b <- d[d[[group_col]] == g, value_col]
-                # usar t.test Welch (var not assumed equal)
-                res <- try(t.test(as.numeric(a), as.numeric(b), var.equal=FALSE), silent=TRUE)
-                if (inherits(res, "try-error")) {{
-                    pvals <- c(pvals, NA)
-                    stats <- c(stats, NA)
-                }} else {{
-                    pvals <- c(pvals, res$p.value)
-                    stats <- c(stats, res$statistic)
-                }}
-                names <- c(names, paste(control, "vs", g))
-                }}
-                p_adj <- p.adjust(pvals, method = padj_method)
-                reject <- ifelse(!is.na(p_adj) & p_adj < alpha, TRUE, FALSE)
-                out_df <- data.frame(comparison = names, statistic = stats, p_raw = pvals, p_adj = p_adj, reject = reject, stringsAsFactors=FALSE)
-                write.csv(out_df, out_csv, row.names=FALSE)
-            """).strip()
-            
-            args = [in_csv, group_col, value_col, str(control_label), out_csv, p_adjust_method, str(alpha)]
-
-        stdout, stderr, _ = _run_r_script(r_code, args, timeout=timeout)
-
-        if not os.path.exists(out_csv):
-            raise RuntimeError(f"R did not generate expected output. stdout: {stdout}\\nstderr: {stderr}")
-
-        res = pd.read_csv(out_csv)
-        return res
+
+    fator_col = kwargs.get('fator_col')
+    if fator_col:
+        r_body = """
+            args <- commandArgs(trailingOnly = TRUE)
+            io_dir      <- args[1]
+            padj_method <- args[2]
+            alpha       <- as.numeric(args[3])
+
+            d <- .gf_read_input(io_dir)
+            g <- as.integer(d$group)
+            f <- as.integer(d$fator)
+            k <- nlevels(d$group)
+            lv1 <- lv2 <- rep(NA_integer_, k)
+            stats <- dfs <- pvals <- rep(NA_real_, k)
+            # t-test por grupo entre os dois níveis do fator (ordem de aparição)
+            for (i in seq_len(k)) {
+              lv <- unique(f[g == i])
+              if (length(lv) == 2) {
+                res <- tryCatch(t.test(d$value[g == i & f == lv[1]], d$value[g == i & f == lv[2]], var.equal = FALSE),
+                                error = function(e) NULL)
+                lv1[i] <- lv[1] - 1L
+                lv2[i] <- lv[2] - 1L
+                if (!is.null(res)) {
+                  stats[i] <- res$statistic
+                  dfs[i] <- res$parameter
+                  pvals[i] <- res$p.value
+                }
+              }
+            }
+            p_adj <- p.adjust(pvals, method = padj_method)
+            reject <- !is.na(p_adj) & p_adj < alpha
+            .gf_write_result(io_dir, list(
+              level = seq_len(k) - 1L, group1 = lv1, group2 = lv2,
+              statistic = stats, df = dfs, p_raw = pvals, p_adj = p_adj, reject = reject))
+        """
+        cols, levels, fator_levels = _run_r_test(r_body, df, group_col, value_col, [p_adjust_method, alpha], timeout,
+                                                 fator_col=fator_col, name="pairwise_ttests_vs_control_r")
+        lv = _labels(levels, cols['level'])
+        g1, g2 = _labels(fator_levels, cols['group1']), _labels(fator_levels, cols['group2'])
+        out = pd.DataFrame({
+            group_col: lv,
+            'comparison': [f"{l} : {a} vs {b}" if a is not None else None for l, a, b in zip(lv, g1, g2)],
+            'group1': g1,
+            'group2': g2,
+        })
+    else:
+        r_body = """
+            args <- commandArgs(trailingOnly=TRUE)
+            io_dir <- args[1]
+            ctrl <- as.integer(args[2]) + 1L
+            padj_method <- args[3]
+            alpha <- as.numeric(args[4])
+
+            d <- .gf_read_input(io_dir)
+            g <- as.integer(d$group)
+            # demais grupos na ordem de aparição, como unique() sobre os dados
+            others <- setdiff(unique(g), ctrl)
+            stats <- dfs <- pvals <- rep(NA_real_, length(others))
+            for (i in seq_along(others)) {
+              # usar t.test Welch (var not assumed equal)
+              res <- try(t.test(d$value[g == ctrl], d$value[g == others[i]], var.equal=FALSE), silent=TRUE)
+              if (!inherits(res, "try-error")) {
+                stats[i] <- res$statistic
+                dfs[i] <- res$parameter
+                pvals[i] <- res$p.value
+              }
+            }
+            p_adj <- p.adjust(pvals, method = padj_method)
+            reject <- !is.na(p_adj) & p_adj < alpha
+            .gf_write_result(io_dir, list(
+              group1 = rep(ctrl - 1L, length(others)), group2 = others - 1L,
+              statistic = stats, df = dfs, p_raw = pvals, p_adj = p_adj, reject = reject))
+        """
+        cols, levels, _ = _run_r_test(r_body, df, group_col, value_col, [p_adjust_method, alpha], timeout,
+                                      control_label=control_label, name="pairwise_ttests_vs_control_r",
+                                      grouped=grouped)
+        g1, g2 = _labels(levels, cols['group1']), _labels(levels, cols['group2'])
+        out = pd.DataFrame({
+            'comparison': [f"{a} vs {b}" for a, b in zip(g1, g2)],
+            'group1': g1,
+            'group2': g2,
+        })
+        out.attrs['pairwise'] = PairwiseMatrix.from_indices(
+            levels, cols['group1'], cols['group2'], cols['p_adj'], control=str(control_label))
+
+    out['statistic'] = cols['statistic']
+    out['df'] = cols['df']
+    out['p_raw'] = cols['p_raw']
+    out['p_adj'] = cols['p_adj']
+    out['reject'] = cols['reject'].astype(bool)
+    return out
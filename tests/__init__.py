@@ -0,0 +1 @@
+# graph_app/tests/__init__.py
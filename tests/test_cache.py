@@ -0,0 +1,62 @@
+# graph_app/tests/test_cache.py
+"""Cache de resultados (stats/cache.py): round trip em disco, LRU e chave por conteúdo."""
+
+import numpy as np
+import pandas as pd
+
+from stats import cache as cache_mod
+from stats.cache import ResultCache, cached_test, fingerprint_frame
+
+
+def _frame():
+    return pd.DataFrame({'g': list("aabbcc"), 'v': np.arange(6.0), 'other': 1})
+
+
+def test_disk_round_trip(tmp_path):
+    first = ResultCache(disk_dir=str(tmp_path))
+    res = pd.DataFrame({'p': [0.01, 0.2]})
+    first.put("k", res)
+    # nova sessão: só o disco tem o valor
+    second = ResultCache(disk_dir=str(tmp_path))
+    got = second.get("k")
+    pd.testing.assert_frame_equal(got, res)
+    assert second.stats()["disk_hits"] == 1
+    # cópias: alterar o retorno não altera o cache
+    got.loc[0, 'p'] = 1.0
+    assert second.get("k").loc[0, 'p'] == 0.01
+
+
+def test_memory_lru_and_disk_limit(tmp_path):
+    c = ResultCache(max_items=2, disk_dir=str(tmp_path), max_disk_bytes=1)
+    for k in "abc":
+        c.put(k, k * 1000)
+    assert c.stats()["entries"] == 2
+    assert c.get("a") is None
+    assert len(list(tmp_path.iterdir())) <= 1
+
+
+def test_fingerprint_ignores_index_and_other_columns():
+    df = _frame()
+    moved = df.set_axis(range(10, 16))
+    moved['other'] = 2
+    assert fingerprint_frame(df, ['g', 'v']) == fingerprint_frame(moved, ['g', 'v'])
+    changed = df.copy()
+    changed.loc[0, 'v'] = 0.5
+    assert fingerprint_frame(df, ['g', 'v']) != fingerprint_frame(changed, ['g', 'v'])
+
+
+def test_cached_test_key(monkeypatch):
+    monkeypatch.setattr(cache_mod, "_cache", ResultCache())
+    calls = []
+
+    @cached_test("fake")
+    def fake(df, group_col, value_col, alpha=0.05, timeout=60):
+        calls.append(alpha)
+        return pd.DataFrame({'n': [len(df)]})
+
+    df = _frame()
+    fake(df, 'g', 'v')
+    fake(df.copy(), 'g', 'v', timeout=5)    # timeout não entra na chave
+    fake(df, 'g', 'v', alpha=0.01)
+    assert calls == [0.05, 0.01]
+    assert cache_mod.get_cache().stats()["hits"] == 1
@@ -0,0 +1,61 @@
+# graph_app/tests/test_csv_reader.py
+"""Inferência de tipos de ingest/csv_reader.py e leitura de abas (ingest/workbook.py)."""
+
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ingest.csv_reader import categorize_columns, infer_column_kinds, read_csv_fast
+from ingest.sidecar import SidecarStore
+from ingest.workbook import WorkbookCache
+
+
+def test_kinds():
+    sample = pd.DataFrame({'g': list('aabb') * 3, 'v': np.arange(12.0), 'n': [str(i) for i in range(12)],
+                           'id': [f'x{i}' for i in range(12)]})
+    assert infer_column_kinds(sample) == {'g': 'category', 'v': 'numeric', 'n': 'numeric', 'id': 'text'}
+
+
+def test_text_column_with_non_numeric_rows_outside_sample(tmp_path):
+    path = tmp_path / "d.csv"
+    rows = [f"{101 + i % 2},{i}" for i in range(50)] + ["WT,50"]
+    path.write_text("id,v\n" + "\n".join(rows) + "\n")
+    df = read_csv_fast(str(path), sample_rows=10, engine='c')
+    assert df['id'].notna().all()
+    assert 'WT' in set(df['id'].astype(str))
+    assert pd.api.types.is_numeric_dtype(df['v'])
+
+
+def _dates_frame():
+    return pd.DataFrame({
+        'when': pd.date_range('2024-01-01', periods=6),
+        'took': pd.to_timedelta(np.arange(6), unit='s'),
+        'stamp': pd.Series(list(pd.date_range('2024-01-01', periods=6)), dtype=object),
+        'day': [dt.date(2024, 1, i + 1) for i in range(6)],
+        'g': list('aabbcc'),
+        'v': np.arange(6.0),
+    })
+
+
+def test_dates_keep_their_dtype():
+    df = _dates_frame()
+    out = categorize_columns(df.copy())
+    for col in ('when', 'took', 'stamp', 'day'):
+        assert out[col].dtype == df[col].dtype
+        assert out[col].tolist() == df[col].tolist()
+    assert isinstance(out['g'].dtype, pd.CategoricalDtype)
+
+
+def test_workbook_sheet_with_dates_round_trip(tmp_path):
+    pytest.importorskip("openpyxl")
+    path = tmp_path / "d.xlsx"
+    _dates_frame()[['when', 'g', 'v']].to_excel(path, index=False)
+    cache = WorkbookCache(sidecars=SidecarStore(str(tmp_path / "sidecars")))
+    first = cache.sheet(str(path), 0)
+    assert pd.api.types.is_datetime64_any_dtype(first['when'])
+    # segunda sessão: vem do sidecar em disco
+    again = WorkbookCache(sidecars=SidecarStore(str(tmp_path / "sidecars"))).sheet(str(path), 0)
+    assert pd.api.types.is_datetime64_any_dtype(again['when'])
+    pd.testing.assert_frame_equal(first, again)
@@ -0,0 +1,109 @@
+# graph_app/tests/test_dunnett.py
+"""
+Dunnett nativo (stats/native.py) contra valores de referência.
+
+Casos e valores de R (multcomp::glht / DescTools::DunnettTest) e do Matlab
+(multcompare com "Approximate", false), os mesmos da suíte do SciPy
+(scipy/stats/tests/test_multicomp.py); valores críticos da tabela de
+Dunnett (1964), bilateral, alpha = 0.05, grupos de mesmo tamanho.
+
+R e Matlab integram a t multivariada por quasi-Monte Carlo (pmvt/qmvt do
+mvtnorm usam abseps = 0.001), então a comparação com eles é na precisão
+deles; a precisão da quadratura é conferida contra scipy.stats.multivariate_t
+com maxpts = 4e6 (HIGH_PRECISION).
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import t as t_dist
+
+from stats.native import _dunnett_critical, _dunnett_sf, dunnett_many_to_one
+
+CASES = {
+    # Matlab multcompare (doc); estatísticas, p e ICs de R multcomp
+    "matlab": dict(
+        samples=[[24.0, 27.0, 33.0, 32.0, 28.0, 19.0, 37.0, 31.0, 36.0, 36.0,
+                  34.0, 38.0, 32.0, 38.0, 32.0],
+                 [26.0, 24.0, 26.0, 25.0, 29.0, 29.5, 16.5, 36.0, 44.0],
+                 [25.0, 27.0, 19.0], [25.0, 20.0], [28.0]],
+        control=[18.0, 15.0, 18.0, 16.0, 17.0, 15.0, 14.0, 14.0, 14.0, 15.0, 15.0,
+                 14.0, 15.0, 14.0, 22.0, 18.0, 21.0, 21.0, 10.0, 10.0, 11.0, 9.0,
+                 25.0, 26.0, 17.5, 16.0, 15.5, 14.5, 22.0, 22.0, 24.0, 22.5, 29.0,
+                 24.5, 20.0, 18.0, 18.5, 17.5, 26.5, 13.0, 16.5, 13.0, 13.0, 13.0,
+                 28.0, 27.0, 34.0, 31.0, 29.0, 27.0, 24.0, 23.0, 38.0, 36.0, 25.0,
+                 38.0, 26.0, 22.0, 36.0, 27.0, 27.0, 32.0, 28.0, 31.0],
+        statistic=[5.27356, 2.91270, 0.60831, 0.27002, 0.96637],
+        # Matlab; R dá só "< 1e-4" para o primeiro
+        pvalue=[4.727e-06, 0.022346, 0.97912, 0.99953, 0.86579],
+        lwr=[5.3633917835622, 0.7296142201217, -8.3879817106607, -11.9090753452911, -11.7655021543469],
+        upr=[15.9709832164378, 13.8936496687672, 13.4556900439941, 14.6434503452911, 25.4998771543469]),
+    # Dunnett (1955), R DescTools::DunnettTest
+    "dunnett1955": dict(
+        samples=[[9.76, 8.80, 7.68, 9.36], [12.80, 9.68, 12.16, 9.20, 10.55]],
+        control=[7.40, 8.50, 7.20, 8.24, 9.84, 8.32],
+        statistic=[0.85703, 3.69375],
+        pvalue=[0.6201020, 0.0058254],
+        lwr=[-1.2564116462124, 0.8396273539789],
+        upr=[2.5564116462124, 4.4163726460211]),
+    "balanced": dict(
+        samples=[[55, 64, 64], [55, 49, 52], [50, 44, 41]],
+        control=[55, 47, 48],
+        statistic=[3.09073, 0.56195, -1.40488],
+        pvalue=[0.036407, 0.896539, 0.409295],
+        lwr=[0.7529028025053, -8.2470971974947, -15.2470971974947],
+        upr=[21.2470971974947, 12.2470971974947, 5.2470971974947]),
+}
+
+
+# P(max |T| > estatística) do caso "matlab": scipy.stats.multivariate_t, maxpts=4e6
+HIGH_PRECISION = [4.73586e-06, 0.022342346, 0.979126720, 0.999534983, 0.865811032]
+
+
+def _frame(case):
+    # o controle 'C' e os tratados 'T1'.. na ordem dos níveis
+    groups = [('C', case['control'])] + [(f'T{i + 1}', s) for i, s in enumerate(case['samples'])]
+    return pd.DataFrame({'g': np.concatenate([[g] * len(s) for g, s in groups]),
+                         'v': np.concatenate([s for _, s in groups]).astype(float)})
+
+
+@pytest.mark.parametrize("name", list(CASES))
+def test_reference_values(name):
+    case = CASES[name]
+    res = dunnett_many_to_one(_frame(case), 'g', 'v', 'C')
+    np.testing.assert_allclose(res['statistic'], case['statistic'], atol=1e-5)
+    np.testing.assert_allclose(res['pval'], case['pvalue'], atol=1e-3)
+    # valor crítico do R (qmvt) com erro relativo ~1e-3
+    half = (np.asarray(case['upr']) - np.asarray(case['lwr'])) / 2
+    np.testing.assert_allclose((res['upr.ci'] - res['lwr.ci']) / 2, half, rtol=1e-3)
+    np.testing.assert_allclose((res['upr.ci'] + res['lwr.ci']) / 2, np.asarray(case['upr']) - half, atol=1e-6)
+
+
+def test_high_precision_and_tail():
+    res = dunnett_many_to_one(_frame(CASES["matlab"]), 'g', 'v', 'C')
+    np.testing.assert_allclose(res['pval'], HIGH_PRECISION, atol=1e-7)
+    # cauda: erro relativo, e não só absoluto
+    assert res['pval'].iloc[0] == pytest.approx(HIGH_PRECISION[0], rel=1e-3)
+    assert res['pval'].iloc[0] == pytest.approx(CASES["matlab"]['pvalue'][0], rel=5e-3)
+
+
+def test_deterministic():
+    df = _frame(CASES["matlab"])
+    a = dunnett_many_to_one(df, 'g', 'v', 'C')
+    b = dunnett_many_to_one(df, 'g', 'v', 'C')
+    pd.testing.assert_frame_equal(a, b)
+
+
+@pytest.mark.parametrize("df", [3, 10, 1000])
+def test_single_comparison_is_t_test(df):
+    t = np.array([0.5, 2.0, 6.0])
+    np.testing.assert_allclose(_dunnett_sf(t, [np.sqrt(0.5)], df), 2 * t_dist.sf(t, df), rtol=1e-4)
+
+
+@pytest.mark.parametrize("df, table", [
+    (10, [2.23, 2.57, 2.76, 2.89, 2.99, 3.07, 3.14, 3.19, 3.24]),
+    (20, [2.09, 2.38, 2.54, 2.65, 2.73, 2.80, 2.86, 2.90, 2.95]),
+])
+def test_critical_value_table(df, table):
+    got = [_dunnett_critical(np.full(p, np.sqrt(0.5)), df, 0.05) for p in range(1, 10)]
+    np.testing.assert_allclose(got, table, atol=0.006)
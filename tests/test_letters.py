@@ -0,0 +1,70 @@
+# graph_app/tests/test_letters.py
+"""Letras (compact letter display) de stats/helpers.py."""
+
+import time
+
+import numpy as np
+import pytest
+
+from stats.helpers import assign_letters_from_pairwise, compact_letter_display, letter_name
+from stats.pairwise import PairwiseMatrix
+
+
+def _not_different(k, flip=0.0, seed=0):
+    """Grupos numa reta: não diferem se as médias estão a menos de 1; flip troca pares ao acaso."""
+    rng = np.random.default_rng(seed)
+    m = np.sort(rng.uniform(0, 10, k))
+    nd = np.abs(m[:, None] - m[None, :]) < 1.0
+    noise = np.triu(rng.random((k, k)) < flip, 1)
+    nd ^= noise | noise.T
+    np.fill_diagonal(nd, True)
+    return nd
+
+
+def _assert_valid(nd, L):
+    shared = (L.astype(int) @ L.T.astype(int)) > 0
+    assert L.any(axis=0).all()
+    assert L.any(axis=1).all()
+    assert (shared == nd).all()
+
+
+def test_letter_names():
+    assert [letter_name(i) for i in (0, 25, 26, 51, 52, 53)] == ['a', 'z', 'A', 'Z', 'aa', 'ab']
+
+
+def test_known_display():
+    # A ~ B, B ~ C, A != C: A=a, B=ab, C=b
+    p = PairwiseMatrix.from_dict({frozenset({'A', 'B'}): 0.3, frozenset({'B', 'C'}): 0.2,
+                                  frozenset({'A', 'C'}): 0.01}, labels=['A', 'B', 'C'])
+    assert assign_letters_from_pairwise(['A', 'B', 'C'], p, 0.05) == {'A': 'a', 'B': 'ab', 'C': 'b'}
+
+
+def test_all_equal_and_all_different():
+    assert compact_letter_display(np.ones((4, 4), dtype=bool)).shape == (4, 1)
+    L = compact_letter_display(np.eye(4, dtype=bool))
+    assert L.shape == (4, 4)
+    _assert_valid(np.eye(4, dtype=bool), L)
+
+
+@pytest.mark.parametrize("flip", [0.0, 0.05, 0.2])
+@pytest.mark.parametrize("seed", range(5))
+def test_random_inputs_are_valid(flip, seed):
+    nd = _not_different(40, flip, seed)
+    L = compact_letter_display(nd)
+    _assert_valid(nd, L)
+    # sem colunas contidas em outra
+    inter = L.T.astype(int) @ L.astype(int)
+    size = np.diag(inter)
+    contained = (inter == size[:, None]) & ~np.eye(L.shape[1], dtype=bool)
+    assert not contained.any()
+
+
+@pytest.mark.parametrize("flip, limit", [(0.0, 1.0), (0.05, 5.0)])
+def test_300_groups_timing(flip, limit):
+    nd = _not_different(300, flip)
+    start = time.perf_counter()
+    L = compact_letter_display(nd)
+    elapsed = time.perf_counter() - start
+    _assert_valid(nd, L)
+    assert L.shape[1] <= 4 * 300
+    assert elapsed < limit
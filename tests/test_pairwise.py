@@ -0,0 +1,24 @@
+# graph_app/tests/test_pairwise.py
+"""Separação dos nomes de comparação (stats/pairwise.py: split_comparisons)."""
+
+import pandas as pd
+
+from stats.pairwise import split_comparisons
+
+
+def _pairs(out):
+    return [None if pd.isna(a) else (a, b) for a, b in zip(out['group1'], out['group2'])]
+
+
+def test_generic_separators():
+    out = split_comparisons(['B-A', 'C vs B', 'L : a vs b', 'Box x Bag', 'T-1 - T-2', 'x / y'])
+    assert _pairs(out) == [('B', 'A'), ('C', 'B'), ('a', 'b'), ('Box', 'Bag'), ('T-1', 'T-2'), ('x', 'y')]
+    assert out['level'].iloc[2] == 'L'
+    assert out['level'].drop(index=2).isna().all()
+
+
+def test_ambiguous_hyphens_need_labels():
+    names = ['T-1-T-2', 'WT-KO', 'a-b-c']
+    assert _pairs(split_comparisons(names)) == [None, ('WT', 'KO'), None]
+    out = split_comparisons(names, labels=['T-1', 'T-2', 'WT', 'KO', 'a-b', 'c'])
+    assert _pairs(out) == [('T-1', 'T-2'), ('WT', 'KO'), ('a-b', 'c')]
@@ -0,0 +1,63 @@
+# graph_app/tests/test_parallel.py
+"""stats/parallel.py: vários testes de uma vez, com cancelamento pelo job."""
+
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from stats import tests as stats_tests
+from stats.grouped import GroupedData
+from stats.jobs import Job, JobCancelled, check_cancelled
+from stats.parallel import merge_results, run_tests_parallel
+
+
+def _frame(k=5, n=20, seed=1):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({'g': np.repeat([f'G{i}' for i in range(k)], n),
+                         'v': rng.normal(np.repeat(np.arange(k) * 0.3, n), 1.0)})
+
+
+SPECS = [("Tukey", "tukey_test", {"alpha": 0.05}),
+         ("Dunnett", "dunnett_test", {"control_label": "G0", "alpha": 0.05}),
+         ("T-test", "pairwise_ttests_vs_control", {"control_label": "G0", "alpha": 0.05})]
+
+
+def test_same_results_as_serial():
+    df = _frame()
+    grouped = GroupedData(df, 'g', 'v')
+    results = run_tests_parallel(df, 'g', 'v', SPECS, grouped=grouped)
+    assert list(results) == ["Tukey", "Dunnett", "T-test"]
+    for method, func, kwargs in SPECS:
+        expected = getattr(stats_tests, func)(df, 'g', 'v', **kwargs)
+        pd.testing.assert_frame_equal(results[method], expected)
+    merged = merge_results(results)
+    assert set(merged['method']) == {"Tukey", "Dunnett", "T-test"}
+
+
+def test_failures_are_returned():
+    df = _frame()
+    results = run_tests_parallel(df, 'g', 'v', [("Dunnett", "dunnett_test", {"control_label": "nope"})])
+    assert isinstance(results["Dunnett"], Exception)
+
+
+def test_cancel(monkeypatch):
+    started = threading.Event()
+
+    def slow_test(df, group_col, value_col, **kwargs):
+        started.set()
+        while True:
+            check_cancelled()   # roda como parte do job da thread principal
+            time.sleep(0.01)
+
+    monkeypatch.setattr(stats_tests, "tukey_test", slow_test)
+    job = Job(lambda: run_tests_parallel(_frame(), 'g', 'v', SPECS[:1])).start()
+    assert started.wait(5)
+    job.cancel()
+    deadline = time.monotonic() + 5
+    while not job.done and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert job.done
+    assert isinstance(job.error, JobCancelled)
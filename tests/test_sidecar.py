@@ -0,0 +1,49 @@
+# graph_app/tests/test_sidecar.py
+"""Sidecars das abas de planilha (ingest/sidecar.py): round trip e invalidação."""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from ingest.sidecar import SidecarStore
+
+
+def _source(tmp_path, text="x"):
+    path = tmp_path / "book.xlsx"
+    path.write_text(text)
+    return str(path)
+
+
+def test_round_trip(tmp_path):
+    path = _source(tmp_path)
+    store = SidecarStore(str(tmp_path / "sc"))
+    df = pd.DataFrame({'g': pd.Categorical(['a', 'b', 'a']), 'v': [1.0, np.nan, 3.0],
+                       'when': pd.to_datetime(['2024-01-01', '2024-01-02', None])})
+    assert store.load(path, "Plan1") is None
+    store.save(path, "Plan1", df)
+    store.save_sheet_names(path, ["Plan1", "Plan2"])
+    again = SidecarStore(str(tmp_path / "sc"))
+    pd.testing.assert_frame_equal(again.load(path, "Plan1"), df)
+    assert again.sheet_names(path) == ["Plan1", "Plan2"]
+    assert again.load(path, "Plan2") is None
+
+
+def test_rewritten_file_invalidates(tmp_path):
+    path = _source(tmp_path)
+    store = SidecarStore(str(tmp_path / "sc"))
+    store.save(path, 0, pd.DataFrame({'v': [1, 2]}))
+    st = os.stat(path)
+    _source(tmp_path, "changed")
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert store.load(path, 0) is None
+    assert store.sheet_names(path) is None
+
+
+def test_disabled_store(tmp_path):
+    path = _source(tmp_path)
+    store = SidecarStore(str(tmp_path / "sc"))
+    store.enabled = False
+    store.save(path, 0, pd.DataFrame({'v': [1]}))
+    assert store.load(path, 0) is None
+    assert not (tmp_path / "sc").exists()
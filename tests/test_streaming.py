@@ -0,0 +1,59 @@
+# graph_app/tests/test_streaming.py
+"""Resumo em blocos (stats/streaming.py) contra o groupby do pandas em memória."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from stats.streaming import QuantileSketch, StreamingSummary, streaming_summary_csv
+
+
+def _frame(n=20_000, seed=0):
+    rng = np.random.default_rng(seed)
+    g = rng.choice(['a', 'b', 'c', 'd'], n, p=[0.4, 0.3, 0.2, 0.1])
+    return pd.DataFrame({'g': g, 'v': rng.lognormal(0, 1, n)})
+
+
+def _check(summ, df):
+    ref = df.groupby('g')['v'].agg(['count', 'mean', 'std', 'median'])
+    np.testing.assert_array_equal(summ['g'], ref.index)
+    np.testing.assert_array_equal(summ['count'], ref['count'])
+    np.testing.assert_allclose(summ['mean'], ref['mean'], rtol=1e-12)
+    np.testing.assert_allclose(summ['std'], ref['std'], rtol=1e-10)
+    # mediana do sketch: aproximada
+    np.testing.assert_allclose(summ['median'], ref['median'], rtol=1e-2)
+
+
+def test_csv_in_chunks(tmp_path):
+    df = _frame()
+    path = tmp_path / "big.csv"
+    df.to_csv(path, index=False)
+    seen = []
+    summ = streaming_summary_csv(str(path), 'g', 'v', chunksize=3_000, progress=seen.append)
+    _check(summ, df)
+    assert seen[-1] == len(df)
+
+
+def test_merge_equals_single_pass():
+    df = _frame(seed=1)
+    whole = StreamingSummary('g', 'v')
+    whole.update(df)
+    left, right = StreamingSummary('g', 'v'), StreamingSummary('g', 'v')
+    left.update(df.iloc[:7_000])
+    right.update(df.iloc[7_000:].sort_values('g', ascending=False))
+    left.merge(right)
+    _check(left.result(), df)
+    pd.testing.assert_frame_equal(left.result().drop(columns='median'), whole.result().drop(columns='median'))
+
+
+@pytest.mark.parametrize("q", [0.01, 0.25, 0.5, 0.9, 0.99])
+def test_sketch_quantiles(q):
+    rng = np.random.default_rng(2)
+    values = rng.normal(size=(2, 50_000))
+    sk = QuantileSketch()
+    for part in np.array_split(np.arange(50_000), 10):
+        sk.update(np.repeat([0, 1], len(part)), values[:, part].ravel())
+    # erro em termos de posto: |F(quantil do sketch) - q|
+    rank = (values <= sk.quantile(q, 2)[:, None]).mean(axis=1)
+    np.testing.assert_allclose(rank, q, atol=2e-3)
+    assert len(sk.mean) <= 2 * sk.compression
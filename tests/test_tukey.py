@@ -0,0 +1,41 @@
+# graph_app/tests/test_tukey.py
+"""Studentized range (spline + quadratura) e Tukey HSD nativos contra scipy.stats."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats as sps
+
+from stats.native import studentized_range_ppf, studentized_range_sf, tukey_hsd
+
+
+@pytest.mark.parametrize("k, df", [(2, 5), (3, 10), (4, 20), (8, 40), (20, 120), (5, 1e6)])
+def test_sf_matches_scipy(k, df):
+    q = np.array([0.5, 1.5, 2.5, 3.5, 5.0, 7.0])
+    ref = sps.studentized_range.sf(q, k, df)
+    np.testing.assert_allclose(studentized_range_sf(q, k, df), ref, rtol=1e-4, atol=1e-7)
+
+
+@pytest.mark.parametrize("k, df", [(3, 10), (6, 30), (12, 200)])
+def test_ppf_matches_scipy(k, df):
+    assert studentized_range_ppf(0.95, k, df) == pytest.approx(sps.studentized_range.ppf(0.95, k, df), rel=1e-5)
+
+
+def test_tukey_hsd_matches_scipy():
+    rng = np.random.default_rng(4)
+    sizes = [8, 11, 9, 14]
+    labels = np.repeat(list("ABCD"), sizes)
+    values = rng.normal(0, 1, len(labels)) + np.repeat([0.0, 0.4, 1.1, 1.3], sizes)
+    df = pd.DataFrame({'g': labels, 'v': values})
+    res = tukey_hsd(df, 'g', 'v')
+    ref = sps.tukey_hsd(*[values[labels == g] for g in "ABCD"])
+    ci = ref.confidence_interval(0.95)
+    pos = {g: i for i, g in enumerate("ABCD")}
+    for _, row in res.iterrows():
+        i, j = pos[row['group1']], pos[row['group2']]
+        assert row['diff'] == pytest.approx(ref.statistic[i, j])
+        assert row['p.adj'] == pytest.approx(ref.pvalue[i, j], rel=1e-4, abs=1e-7)
+        assert row['lwr'] == pytest.approx(ci.low[i, j], rel=1e-5)
+        assert row['upr'] == pytest.approx(ci.high[i, j], rel=1e-5)
+    # ordem de linhas do TukeyHSD do R
+    assert res['comparison'].tolist() == ["B-A", "C-A", "D-A", "C-B", "D-B", "D-C"]
@@ -0,0 +1,147 @@
+# graph_app/tests/test_watch.py
+"""Modo watch: detecção de append/rewrite (ingest/watch.py) e visão incremental (stats/analysis.py)."""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ingest.csv_reader import group_category, read_csv_fast
+from ingest.watch import AppendBuffer, FileWatcher, append_rows, read_appended_csv
+from stats.analysis import AnalysisView
+from stats.grouped import GroupedData
+
+
+def _watcher(path):
+    return FileWatcher(str(path), callback=lambda change: None)
+
+
+def _describe(w):
+    return w._describe(os.path.getsize(w.path))
+
+
+def test_append_and_rewrite(tmp_path):
+    path = tmp_path / "d.csv"
+    path.write_text("g,v\nb,1\na,2\n")
+    w = _watcher(path)
+    with open(path, "a") as f:
+        f.write("c,3\nA,4\n")
+    change = _describe(w)
+    assert change.kind == 'append'
+    assert change.rows.values.tolist() == [['c', 3], ['A', 4]]
+
+    # mesmo cabeçalho, arquivo maior, mas bytes antigos mudaram: rewrite
+    path.write_text("g,v\nb,9\na,2\nc,3\nA,4\nd,5\n")
+    assert _describe(w).kind == 'rewrite'
+    with open(path, "a") as f:
+        f.write("e,6\n")
+    change = _describe(w)
+    assert change.kind == 'append'
+    assert change.rows.values.tolist() == [['e', 6]]
+
+
+def test_incomplete_line_waits(tmp_path):
+    path = tmp_path / "d.csv"
+    path.write_text("g,v\na,1\n")
+    w = _watcher(path)
+    with open(path, "a") as f:
+        f.write("b,2\nc,")
+    change = _describe(w)
+    assert change.rows.values.tolist() == [['b', 2]]
+    # o offset para no fim da última linha completa
+    assert w.offset == len(b"g,v\na,1\nb,2\n") < os.path.getsize(path)
+    # um watcher novo a partir desse offset (watch desligado e religado) não corta a linha
+    w2 = FileWatcher(str(path), callback=lambda change: None, offset=w.offset)
+    with open(path, "a") as f:
+        f.write("3\n")
+    assert _describe(w2).rows.values.tolist() == [['c', 3]]
+
+
+def test_read_appended_csv(tmp_path):
+    path = tmp_path / "d.csv"
+    path.write_text("g,v\na,1\nb,2\n")
+    rows, offset = read_appended_csv(str(path), len(b"g,v\n"))
+    assert rows.values.tolist() == [['a', 1], ['b', 2]]
+    assert offset == os.path.getsize(path)
+
+
+def test_append_buffer_matches_append_rows():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'g': group_category(pd.Series(list('bca') * 4)), 'v': np.arange(12),
+                       'id': [f'x{i}' for i in range(12)], 'f': np.ones(12)})
+    buf, expected = AppendBuffer(df, capacity=16), df
+    for _ in range(30):
+        k = int(rng.integers(1, 20))
+        rows = pd.DataFrame({'g': rng.choice(list('abcdz') + ['A'], k),
+                             'v': [str(x) if rng.random() > 0.1 else 'bad' for x in rng.integers(0, 9, k)],
+                             'id': [f'y{i}' for i in range(k)], 'f': rng.random(k)})
+        previous, snapshot = buf.frame, buf.frame.copy()
+        expected = append_rows(expected, rows)
+        pd.testing.assert_frame_equal(buf.append(rows), expected)
+        # quadros devolvidos antes não mudam
+        pd.testing.assert_frame_equal(previous, snapshot)
+    assert list(expected['g'].cat.categories) == sorted(expected['g'].cat.categories)
+
+
+def test_extend_matches_fresh_view():
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({'g': group_category(pd.Series(rng.choice(list('bdf'), 200))),
+                       'v': rng.normal(size=200)})
+    view = AnalysisView(df, 'g', 'v')
+    view.grouped.moments()
+    buf = AppendBuffer(df)
+    for letters in ('ab', 'ce', 'bf'):
+        rows = pd.DataFrame({'g': rng.choice(list(letters), 50), 'v': rng.normal(size=50)})
+        full = buf.append(rows)
+        view = view.extend(full, rows)
+        fresh = AnalysisView(full, 'g', 'v')
+        assert list(view.levels) == list(fresh.levels)
+        np.testing.assert_array_equal(view.codes, fresh.codes)
+        labels, n, mean, var = view.grouped.moments()
+        labels2, n2, mean2, var2 = fresh.grouped.moments()
+        assert list(labels) == list(labels2)
+        np.testing.assert_array_equal(n, n2)
+        np.testing.assert_allclose(mean, mean2)
+        np.testing.assert_allclose(var, var2)
+
+
+def test_csv_round_trip(tmp_path):
+    path = tmp_path / "d.csv"
+    path.write_text("g,v\na,1.5\nb,2.5\n")
+    df = read_csv_fast(str(path), engine='c')
+    w = _watcher(path)
+    with open(path, "a") as f:
+        f.write("c,3.5\n")
+    df = AppendBuffer(df).append(_describe(w).rows)
+    pd.testing.assert_frame_equal(df, read_csv_fast(str(path), engine='c'), check_categorical=False)
+
+
+def test_factor_view_and_extend():
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame({'g': rng.choice(['C', 'T1', 'T2'], 120), 'f': rng.choice(['x', 'y'], 120),
+                       'v': rng.normal(size=120)})
+    df.loc[3, 'f'] = None
+    df.loc[5, 'v'] = np.nan
+    view = AnalysisView(df, 'g', 'v', fator_col='f')
+    assert len(view) == 118
+    assert view.grouped.keys == ['g', 'f']
+    ref = GroupedData(df, ['g', 'f'], 'v')
+    np.testing.assert_array_equal(view.grouped.n, ref.n)
+    np.testing.assert_allclose(view.grouped.mean, ref.mean)
+    rows = pd.DataFrame({'g': ['T3', 'C'], 'f': ['z', 'x'], 'v': [1.0, 2.0]})
+    full = pd.concat([df, rows], ignore_index=True)
+    extended, fresh = view.extend(full, rows), AnalysisView(full, 'g', 'v', fator_col='f')
+    assert [list(l) for l in extended.key_levels] == [list(l) for l in fresh.key_levels]
+    np.testing.assert_array_equal(extended.codes, fresh.codes)
+    np.testing.assert_array_equal(extended.grouped.n, fresh.grouped.n)
+    np.testing.assert_allclose(extended.grouped.mean, fresh.grouped.mean)
+    np.testing.assert_allclose(extended.grouped.var, fresh.grouped.var)
+
+
+def test_infinite_values_are_kept():
+    df = pd.DataFrame({'g': ['a', 'a', 'b', 'b'], 'v': [1.0, np.inf, 2.0, np.nan]})
+    view = AnalysisView(df, 'g', 'v')
+    assert len(view) == 3
+    assert view.grouped.n.tolist() == [2.0, 1.0]
+    assert np.isinf(view.grouped.mean[0])
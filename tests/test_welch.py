@@ -0,0 +1,58 @@
+# graph_app/tests/test_welch.py
+"""Welch t-test e p.adjust nativos (stats/native.py) contra SciPy e valores do R."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats as sps
+
+from stats.analysis import AnalysisView
+from stats.native import p_adjust
+from stats.tests import pairwise_ttests_vs_control
+
+
+def _frame(seed=0):
+    rng = np.random.default_rng(seed)
+    g = np.repeat(['C', 'T1', 'T2'], [12, 9, 15])
+    return pd.DataFrame({'g': g, 'v': rng.normal(0, 1, len(g)) + (g == 'T2') * 1.2})
+
+
+def test_welch_matches_scipy():
+    df = _frame()
+    res = pairwise_ttests_vs_control(df, 'g', 'v', control_label='C', p_adjust_method='none')
+    for _, row in res.iterrows():
+        ref = sps.ttest_ind(df.loc[df.g == 'C', 'v'], df.loc[df.g == row['group2'], 'v'], equal_var=False)
+        assert row['statistic'] == pytest.approx(ref.statistic, rel=1e-10)
+        assert row['p_raw'] == pytest.approx(ref.pvalue, rel=1e-10)
+
+
+# p.adjust(p, method) no R 4.x
+P = [0.01, 0.02, 0.03, 0.04, 0.05, np.nan]
+R_P_ADJUST = {
+    'holm': [0.05, 0.08, 0.09, 0.09, 0.09],
+    'hochberg': [0.05, 0.05, 0.05, 0.05, 0.05],
+    'bonferroni': [0.05, 0.10, 0.15, 0.20, 0.25],
+    'BH': [0.05, 0.05, 0.05, 0.05, 0.05],
+    'BY': [0.1141667, 0.1141667, 0.1141667, 0.1141667, 0.1141667],
+}
+
+
+@pytest.mark.parametrize("method", list(R_P_ADJUST))
+def test_p_adjust_matches_r(method):
+    out = p_adjust(P, method)
+    np.testing.assert_allclose(out[:5], R_P_ADJUST[method], atol=1e-7)
+    assert np.isnan(out[5])
+
+
+def test_two_by_two_from_factor_view():
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({'g': np.tile(['C', 'T1', 'T2'], 40), 'f': np.repeat(['x', 'y'], 60),
+                       'v': rng.normal(size=120), 'extra': 1})
+    df.loc[7, 'v'] = np.nan
+    expected = pairwise_ttests_vs_control(df[['f', 'g', 'v']].dropna().copy(), 'g', 'v',
+                                          control_label='C', fator_col='f')
+    view = AnalysisView(df, 'g', 'v', fator_col='f')
+    got = pairwise_ttests_vs_control(view.frame, 'g', 'v', control_label='C', fator_col='f',
+                                     grouped=view.grouped)
+    pd.testing.assert_frame_equal(got.reset_index(drop=True), expected.reset_index(drop=True),
+                                  check_dtype=False, check_categorical=False)
@@ -0,0 +1,218 @@
+import tkinter as tk
+from tkinter import ttk
+
+import numpy as np
+import pandas as pd
+
+
+def format_block(block: pd.DataFrame) -> np.ndarray:
+    """Format a DataFrame block as a 2-D array of display strings, one column at a time.
+
+    Floats use '%.6g' (so +/-inf show as 'inf'/'-inf'), missing values
+    become '' (same rules as the old per-cell _format_val, but vectorized
+    per column).
+    """
+    out = np.empty(block.shape, dtype=object)
+    for j in range(block.shape[1]):
+        s = block.iloc[:, j]
+        missing = s.isna().to_numpy()
+        if pd.api.types.is_float_dtype(s):
+            vals = np.char.mod('%.6g', np.nan_to_num(s.to_numpy(dtype=np.float64), nan=0.0, posinf=np.inf, neginf=-np.inf)).astype(object)
+        else:
+            vals = s.astype(str).to_numpy(dtype=object)
+        vals[missing] = ""
+        out[:, j] = vals
+    return out
+
+
+class DataGrid(ttk.Frame):
+    """A virtualized table view for large DataFrames.
+
+    Usage:
+        from ui.data_grid import DataGrid
+        self.grid_view = DataGrid(parent)
+        self.grid_view.pack(fill=tk.BOTH, expand=True)
+        self.grid_view.set_dataframe(df)
+
+    Only the visible window of rows and columns exists as Tk items: the
+    Treeview holds a fixed pool of rows (one screen) and columns, and
+    scrolling just rewrites their values from the DataFrame. Cells of the
+    window are formatted per column with format_block.
+    """
+
+    COL_WIDTH = 120
+    INDEX_WIDTH = 70
+
+    def __init__(self, parent, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.df = None
+        self.row0 = 0           # first visible row
+        self.col0 = 0           # first visible column
+        self.n_rows = 1         # size of the row pool (rows on screen)
+        self.n_cols = 1         # size of the column pool
+        self._items = []
+        self._pending = None
+
+        style = ttk.Style(self)
+        try:
+            self.row_height = int(style.lookup("Treeview", "rowheight") or 20)
+        except (tk.TclError, ValueError):
+            self.row_height = 20
+
+        self.tree = ttk.Treeview(self, show='tree headings', selectmode='browse')
+        self.vbar = ttk.Scrollbar(self, orient="vertical", command=self._on_vscroll)
+        self.hbar = ttk.Scrollbar(self, orient="horizontal", command=self._on_hscroll)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.vbar.grid(row=0, column=1, sticky="ns")
+        self.hbar.grid(row=1, column=0, sticky="ew")
+        self.status = ttk.Label(self, text="", anchor='w')
+        self.status.grid(row=2, column=0, columnspan=2, sticky="ew")
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+
+        self.tree.column("#0", width=self.INDEX_WIDTH, stretch=False, anchor='e')
+        self.tree.heading("#0", text="#")
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Shift-MouseWheel>", self._on_shift_wheel)
+        # X11 wheel events and paging keys; "break" keeps the Treeview from scrolling its own pool
+        for key, rows, cols in (("<Button-4>", -3, 0), ("<Button-5>", 3, 0),
+                                ("<Shift-Button-4>", 0, -1), ("<Shift-Button-5>", 0, 1),
+                                ("<Prior>", "-page", 0), ("<Next>", "page", 0),
+                                ("<Home>", "-all", 0), ("<End>", "all", 0)):
+            self.tree.bind(key, lambda e, r=rows, c=cols: self._on_key_scroll(r, c))
+
+    # ---------- data ----------
+    def set_dataframe(self, df, keep_position=False):
+        self.df = df
+        if not keep_position:
+            self.row0 = 0
+            self.col0 = 0
+        self._rebuild()
+
+    def clear(self):
+        self.set_dataframe(None)
+
+    @property
+    def total_rows(self):
+        return 0 if self.df is None else len(self.df)
+
+    @property
+    def total_cols(self):
+        return 0 if self.df is None else self.df.shape[1]
+
+    # ---------- pool of Tk items ----------
+    def _pool_size(self):
+        height = max(self.tree.winfo_height(), 1)
+        width = max(self.tree.winfo_width(), 1)
+        # heading row takes about one row of height
+        rows = max(1, height // self.row_height - 1)
+        cols = max(1, (width - self.INDEX_WIDTH) // self.COL_WIDTH + 1)
+        return rows, cols
+
+    def _rebuild(self):
+        """Resize the row/column pool to the widget and redraw."""
+        rows, cols = self._pool_size()
+        self.n_rows = min(rows, max(self.total_rows, 1))
+        self.n_cols = min(cols, max(self.total_cols, 1))
+
+        col_ids = [f"c{j}" for j in range(self.n_cols)] if self.df is not None else []
+        self.tree['columns'] = col_ids
+        for cid in col_ids:
+            self.tree.column(cid, width=self.COL_WIDTH, stretch=False, anchor='w')
+
+        wanted = self.n_rows if self.df is not None else 0
+        while len(self._items) > wanted:
+            self.tree.delete(self._items.pop())
+        while len(self._items) < wanted:
+            self._items.append(self.tree.insert("", tk.END, text=""))
+        self.refresh()
+
+    def refresh(self):
+        """Write the current window of the DataFrame into the pooled items."""
+        if self.df is None:
+            self.vbar.set(0, 1)
+            self.hbar.set(0, 1)
+            self.status.config(text="")
+            return
+        self.row0 = int(np.clip(self.row0, 0, max(self.total_rows - self.n_rows, 0)))
+        self.col0 = int(np.clip(self.col0, 0, max(self.total_cols - self.n_cols, 0)))
+        r1 = min(self.row0 + self.n_rows, self.total_rows)
+        c1 = min(self.col0 + self.n_cols, self.total_cols)
+
+        columns = list(self.df.columns[self.col0:c1])
+        for j, cid in enumerate(self.tree['columns']):
+            self.tree.heading(cid, text=str(columns[j]) if j < len(columns) else "")
+
+        cells = format_block(self.df.iloc[self.row0:r1, self.col0:c1])
+        index = self.df.index[self.row0:r1]
+        for k, iid in enumerate(self._items):
+            if k < len(cells):
+                self.tree.item(iid, text=str(index[k]), values=list(cells[k]))
+            else:
+                self.tree.item(iid, text="", values=[])
+
+        total_r, total_c = max(self.total_rows, 1), max(self.total_cols, 1)
+        self.vbar.set(self.row0 / total_r, r1 / total_r)
+        self.hbar.set(self.col0 / total_c, c1 / total_c)
+        self.status.config(text=(
+            f"rows {self.row0 + 1:,}-{r1:,} of {self.total_rows:,}  |  "
+            f"columns {self.col0 + 1}-{c1} of {self.total_cols}"))
+
+    # ---------- scrolling ----------
+    def scroll_rows(self, delta):
+        self.row0 += int(delta)
+        self._schedule_refresh()
+
+    def scroll_cols(self, delta):
+        self.col0 += int(delta)
+        self._schedule_refresh()
+
+    def _schedule_refresh(self):
+        # coalesce bursts of scroll events into one redraw
+        if self._pending is None:
+            self._pending = self.after_idle(self._do_refresh)
+
+    def _do_refresh(self):
+        self._pending = None
+        self.refresh()
+
+    def _scroll_command(self, args, total, page, current):
+        if not args:
+            return current
+        if args[0] == "moveto":
+            return int(float(args[1]) * total)
+        if args[0] == "scroll":
+            step = int(args[1]) * (page if args[2] == "pages" else 1)
+            return current + step
+        return current
+
+    def _on_vscroll(self, *args):
+        self.row0 = self._scroll_command(args, self.total_rows, self.n_rows, self.row0)
+        self._schedule_refresh()
+
+    def _on_hscroll(self, *args):
+        self.col0 = self._scroll_command(args, self.total_cols, self.n_cols, self.col0)
+        self._schedule_refresh()
+
+    def _on_key_scroll(self, rows, cols):
+        steps = {"page": self.n_rows, "-page": -self.n_rows,
+                 "all": self.total_rows, "-all": -self.total_rows}
+        if rows:
+            self.scroll_rows(steps.get(rows, rows))
+        if cols:
+            self.scroll_cols(cols)
+        return "break"
+
+    def _on_wheel(self, event):
+        self.scroll_rows(-3 if event.delta > 0 else 3)
+        return "break"
+
+    def _on_shift_wheel(self, event):
+        self.scroll_cols(-1 if event.delta > 0 else 1)
+        return "break"
+
+    def _on_resize(self, event):
+        rows, cols = self._pool_size()
+        if (min(rows, max(self.total_rows, 1)), min(cols, max(self.total_cols, 1))) != (self.n_rows, self.n_cols):
+            self._rebuild()
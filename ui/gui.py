@@ -2,23 +2,39 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, colorchooser
 import pandas as pd
 import threading
+import queue
 import os
 import traceback
 
 from ui.plot_tab import PlotTab
+from ui.data_grid import DataGrid
 from stats.summary import summary_by_group
-from stats.tests import tukey_test_r, dunnett_test_r, pairwise_ttests_vs_control_r
-from stats.helpers import find_pvalue_column, parse_pair_name_for_group
+from stats.analysis import analysis_view
+from stats.streaming import streaming_summary_csv
+from stats.cache import get_cache
+from stats.r_probe import start_probe, r_ready_for
+from stats.jobs import Job, JobCancelled, set_stage
+from stats.tests import tukey_test, dunnett_test, pairwise_ttests_vs_control
+from stats.parallel import run_tests_parallel, merge_results
+from stats.pairwise import PairwiseMatrix
+from ingest.workbook import get_workbook_cache
+from ingest.csv_reader import read_csv_fast, categorize_columns
+from ingest.sidecar import COLUMNAR_EXTENSIONS, read_columnar
+from ingest.profile import profile_frame, start_profile
+from ingest.watch import AppendBuffer, FileWatcher
 from charts.plotter import *
 from export.save_fig import save_chart
 from export.save_excel import export_report_xlsx
 from export.save_pdf import export_report_pdf
 
 EXAMPLE_PATH = os.path.join("data", "exemplos.xlsx")
+STREAM_PREVIEW_ROWS = 200
+# rótulo do combobox -> modo de barra de erro dos plotters
+ERROR_BAR_LABELS = {"SEM": "sem", "SD": "sd", "95% CI (bootstrap)": "ci"}
 
 
 class StatApp(tk.Tk):
-    def __init__(self):
+    def __init__(self, r_installer=None):
         super().__init__()
         self.title("Grafitics: personalized statistics in graphs and in real time.")
         self.state('zoomed')
@@ -30,16 +46,38 @@ class StatApp(tk.Tk):
         # data / state
         self.df = None
         self.fig = None
-        self.canvas_plot = None
+        self.chart = None       # ChartHandle do gráfico atual (charts/handle.py)
         self.last_stats_df = None
         self.last_summary_df = None
         self.last_test_method = None
-        # maps for annotations
-        self.pmap_pairwise = {}   # frozenset({g1,g2}) -> p
-        self.pmap_vs_control = {}  # other_group -> p
+        # p-values of the last test, for annotations (stats/pairwise.py)
+        self.pairwise = None
         self.control_selected = None
+        # R environment (filled by the background probe)
+        self.r_installer = r_installer
+        self.r_probe = None
+        self.stats_job = None
+        # visão (grupo, valor) e GroupedData da análise atual (stats/analysis.py, stats/grouped.py)
+        self.analysis_view = None
+        self.factor_view = None
+        self.grouped = None
+        # perfil das colunas de self.df (ingest/profile.py), calculado em segundo plano
+        self.profile = None
+        self.profile_job = None
+        # modo watch: monitora current_file e refaz análise/gráfico quando ele muda
+        self.file_watcher = None
+        self.current_file_size = None
+        self.append_buffer = None
+        self.refresh_pending = False
+        self.auto_chart = False
+        # CSV aberto em modo streaming (self.df guarda só a prévia)
+        self.streaming_source = None
+        # callbacks das threads de fundo (probe, perfil, watch): o Tk só é tocado
+        # pela thread principal, que esvazia esta fila em _drain_ui_queue
+        self.ui_queue = queue.Queue()
+        # resultados de testes repetidos também ficam em disco entre sessões
+        get_cache().enable_disk()
 
-        
         if not hasattr(self, 'notebook'):
             self.notebook = ttk.Notebook(self)
             self.notebook.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
@@ -55,6 +93,9 @@ class StatApp(tk.Tk):
         self.plot_tab.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
 
         self._build_ui()
+        self.after(50, self._drain_ui_queue)
+        # verifica Rscript/pacotes sem bloquear a abertura da janela
+        self.start_r_probe()
 
 
     def _build_ui(self):
@@ -70,15 +111,23 @@ class StatApp(tk.Tk):
             row=0, column=0, sticky="w")
         ttk.Button(left, text="Load example", command=self.load_example).grid(
             row=0, column=1, sticky="w")
+        # CSV grande: só uma prévia fica em memória e o resumo é feito em blocos
+        self.stream_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(left, text="Stream large CSV (summary only)", variable=self.stream_var).grid(
+            row=0, column=2, columnspan=3, sticky="w")
 
         ttk.Label(left, text="sheet:").grid(row=1, column=0, sticky="w")
         self.sheet_cb = ttk.Combobox(left, values=[], state='readonly')
         self.sheet_cb.grid(row=1, column=1)
         self.sheet_cb.bind("<<ComboboxSelected>>", self.on_sheet_select)
+        self.watch_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(left, text="Watch file (auto refresh)", variable=self.watch_var,
+                        command=self.toggle_watch).grid(row=1, column=2, columnspan=3, sticky="w")
 
         ttk.Label(left, text="Group col:").grid(row=2, column=0, sticky="w")
         self.group_col_cb = ttk.Combobox(left, values=[], state='readonly')
         self.group_col_cb.grid(row=2, column=1)
+        self.group_col_cb.bind("<<ComboboxSelected>>", self.on_group_col_select)
         ttk.Label(left, text="Value col:").grid(row=3, column=0, sticky="w")
         self.value_col_cb = ttk.Combobox(left, values=[], state='readonly')
         self.value_col_cb.grid(row=3, column=1)
@@ -111,6 +160,11 @@ class StatApp(tk.Tk):
 
         ttk.Button(left, text="Compute statistics", command=self.compute_stats_thread).grid(
             row=7, column=0, columnspan=2, pady=6)
+        self.cancel_btn = ttk.Button(left, text="Cancel", command=self.cancel_stats, state='disabled')
+        self.cancel_btn.grid(row=7, column=2, pady=6, sticky='w')
+        self.run_all_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(left, text="Run all tests (parallel)", variable=self.run_all_var).grid(
+            row=7, column=3, columnspan=2, sticky='w')
 
         # t-test mode
         ttk.Label(left, text="T-test mode:").grid(row=8, column=0, sticky='w')
@@ -124,9 +178,20 @@ class StatApp(tk.Tk):
         ttk.Radiobutton(left, text="Control vs others", variable=self.ttest_mode,
                         value='control').grid(row=8, column=4, sticky='w')
 
+        # backend: native engines or R (enabled after the R probe)
+        ttk.Label(left, text="Backend:").grid(row=9, column=0, sticky='w')
+        self.backend_var = tk.StringVar(value='native')
+        ttk.Radiobutton(left, text="Native", variable=self.backend_var,
+                        value='native').grid(row=9, column=1, sticky='w')
+        self.backend_r_rb = ttk.Radiobutton(left, text="R", variable=self.backend_var,
+                                            value='r', command=self.on_backend_change)
+        self.backend_r_rb.grid(row=9, column=2, sticky='w')
+        self.r_status_lbl = ttk.Label(left, text="R: checking...")
+        self.r_status_lbl.grid(row=9, column=3, columnspan=2, sticky='w')
+
         self.status_lbl = ttk.Label(
             left, text="Select file", relief='sunken', anchor='w')
-        self.status_lbl.grid(row=9, column=0, columnspan=4,
+        self.status_lbl.grid(row=10, column=0, columnspan=4,
                              sticky='we', pady=(6, 0))
 
         # ========= right panel (plot options) =========
@@ -172,6 +237,11 @@ class StatApp(tk.Tk):
         self.font_spin = ttk.Spinbox(right, from_=6, to=30)
         self.font_spin.set(10)
         self.font_spin.grid(row=6, column=1)
+        ttk.Label(right, text="Error bars:").grid(row=6, column=2, sticky='e')
+        self.error_bars_cb = ttk.Combobox(
+            right, values=list(ERROR_BAR_LABELS), state='readonly', width=18)
+        self.error_bars_cb.set("SEM")
+        self.error_bars_cb.grid(row=6, column=3, sticky='w')
 
         # ========= LINHA 7 =========
         ttk.Label(right, text="Image size (cm):").grid(
@@ -210,7 +280,7 @@ class StatApp(tk.Tk):
         ttk.Button(right, text="Export report (.xlsx)",
                    command=lambda: export_report_xlsx(self)).grid(row=9, column=0)
         ttk.Button(right, text="Export report (.pdf)",
-                   command=lambda: export_report_pdf(self)).grid(row=9, column=1)
+                   command=lambda: export_report_pdf(self, dpi=self.plot_tab.dpi)).grid(row=9, column=1)
 
         # ========= bottom =========
         bottom = ttk.Frame(self.tab_stats, padding=6)
@@ -218,26 +288,81 @@ class StatApp(tk.Tk):
         frame_table = ttk.LabelFrame(bottom, text="Data & preview")
         frame_table.pack(side=tk.LEFT, fill=tk.BOTH,
                          expand=True, padx=6, pady=6)
-        self.tree = ttk.Treeview(frame_table, columns=(
-            "a", "b", "c"), show='headings')
-        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        self.tree_scroll = ttk.Scrollbar(
-            frame_table, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=self.tree_scroll.set)
-        self.tree_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        # grade virtualizada: só a janela visível de linhas/colunas vira item Tk
+        self.data_grid = DataGrid(frame_table)
+        self.data_grid.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
         frame_stats = ttk.LabelFrame(bottom, text="Statistics & Plot")
         frame_stats.pack(side=tk.RIGHT, fill=tk.BOTH,
                          expand=True, padx=6, pady=6)
         self.stats_text = tk.Text(frame_stats, width=60, height=12)
-        self.stats_text.pack(side=tk.TOP, fill=tk.BOTH, expand=False)
-        self.plot_frame = ttk.Frame(frame_stats)
-        self.plot_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        self.stats_text.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+
+    # ---------- background callbacks ----------
+    def _post(self, func, *args):
+        """Agenda func(*args) na thread do Tk; pode ser chamado de qualquer thread."""
+        self.ui_queue.put((func, args))
+
+    def _drain_ui_queue(self):
+        """Executa os callbacks enfileirados pelas threads de fundo."""
+        while True:
+            try:
+                func, args = self.ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                func(*args)
+            except Exception:
+                traceback.print_exc()
+        self.after(50, self._drain_ui_queue)
+
+    # ---------- R backend ----------
+    def start_r_probe(self, force=False):
+        self.r_status_lbl.config(text="R: checking...")
+        start_probe(lambda probe: self._post(self._on_r_probe, probe), force=force)
+
+    def _on_r_probe(self, probe):
+        self.r_probe = probe
+        if not probe.get('rscript'):
+            self.r_status_lbl.config(text="R not found (native engines)")
+            if self.backend_var.get() == 'r':
+                self.backend_var.set('native')
+            return
+        missing = [p for p, ok in probe.get('packages', {}).items() if not ok]
+        txt = f"R {probe.get('version') or ''}".strip()
+        if missing:
+            txt += f" (missing: {', '.join(missing)})"
+        self.r_status_lbl.config(text=txt)
+
+    def on_backend_change(self):
+        if self.backend_var.get() != 'r' or self.r_probe is None:
+            return
+        if self.r_probe.get('rscript'):
+            return
+        self.backend_var.set('native')
+        if self.r_installer and messagebox.askyesno(
+                "R not found", "R was not found. Install it now? Native engines are used meanwhile."):
+            threading.Thread(target=self._install_r, daemon=True).start()
+
+    def _install_r(self):
+        def notify(msg):
+            self._post(messagebox.showwarning, "Grafitics-Message", msg)
+        try:
+            self.r_installer(notify=notify)
+        finally:
+            self._post(self.start_r_probe, True)
+
+    def _backend_for(self, test):
+        """'r' só quando escolhido e o probe indica Rscript + pacotes do teste; senão 'native'."""
+        if self.backend_var.get() == 'r' and r_ready_for(self.r_probe, test):
+            return 'r'
+        return 'native'
 
     # ---------- file handling ----------
     def load_file(self):
         fpath = filedialog.askopenfilename(title="Open data file", filetypes=[(
-            "All data", "*.csv *.xlsx *.xls"), ("Excel", "*.xlsx *.xls"), ("CSV", "*.csv")])
+            "All data", "*.csv *.xlsx *.xls *.parquet *.feather"), ("Excel", "*.xlsx *.xls"), ("CSV", "*.csv"),
+            ("Parquet/Feather", "*.parquet *.feather")])
         if not fpath:
             return
         self._load_path(fpath)
@@ -254,19 +379,39 @@ class StatApp(tk.Tk):
         self.current_file = fpath
         try:
             if ext in (".xlsx", ".xls"):
-                xls = pd.ExcelFile(fpath)
-                sheets = xls.sheet_names
+                # handle aberto uma vez; abas lidas sob demanda e mantidas em cache
+                workbooks = get_workbook_cache()
+                sheets = workbooks.sheet_names(fpath)
                 self.sheet_cb['values'] = sheets
                 self.sheet_cb.set(sheets[0])
                 self.current_sheet = sheets[0]
-                self.df = pd.read_excel(fpath, sheet_name=self.current_sheet)
+                self.df = workbooks.sheet(fpath, self.current_sheet)
+                self.streaming_source = None
+            elif ext in COLUMNAR_EXTENSIONS:
+                self.sheet_cb['values'] = []
+                self.current_sheet = None
+                self.df = categorize_columns(read_columnar(fpath))
+                self.streaming_source = None
+            elif self.stream_var.get():
+                self.sheet_cb['values'] = []
+                self.current_sheet = None
+                self.df = pd.read_csv(fpath, nrows=STREAM_PREVIEW_ROWS)
+                self.streaming_source = fpath
             else:
                 self.sheet_cb['values'] = []
                 self.current_sheet = None
-                self.df = pd.read_csv(fpath)
-            self.status_lbl.config(text=f"Loaded: {os.path.basename(fpath)}")
-            self.populate_columns()
+                self.df = read_csv_fast(fpath)
+                self.streaming_source = None
+            if self.streaming_source:
+                self.status_lbl.config(
+                    text=f"Streaming: {os.path.basename(fpath)} (preview of {len(self.df)} rows)")
+            else:
+                self.status_lbl.config(text=f"Loaded: {os.path.basename(fpath)}")
+            self.current_file_size = os.path.getsize(fpath)
+            self.append_buffer = None
             self.display_dataframe_preview()
+            self.start_profile()
+            self.toggle_watch()
         except Exception as e:
             messagebox.showerror("Load error", str(e))
             self.status_lbl.config(text="Error loading file.")
@@ -277,64 +422,176 @@ class StatApp(tk.Tk):
             return
         self.current_sheet = sheet
         try:
-            self.df = pd.read_excel(self.current_file, sheet_name=sheet)
-            self.populate_columns()
+            self.df = get_workbook_cache().sheet(self.current_file, sheet)
             self.display_dataframe_preview()
+            self.start_profile()
         except Exception as e:
             messagebox.showerror("Error", str(e))
 
+    def start_profile(self, populate=True):
+        """
+        Perfil das colunas em segundo plano; com populate os comboboxes são
+        preenchidos quando ele chega (no refresh do modo watch, só é guardado).
+        """
+        if self.profile_job is not None and not self.profile_job.done:
+            self.profile_job.cancel()
+        self.profile = None
+        if populate:
+            cols = list(self.df.columns) if self.df is not None else []
+            self.group_col_cb['values'] = cols
+            self.value_col_cb['values'] = cols
+        if self.df is None:
+            return
+        df = self.df
+        self.profile_job = start_profile(df, lambda prof: self._post(self._on_profile, prof, populate))
+
+    def _on_profile(self, profile, populate=True):
+        # descarta perfis de um frame que já foi substituído
+        if not profile.matches(self.df):
+            return
+        self.profile = profile
+        if populate:
+            self.populate_columns()
+
+    def _current_profile(self):
+        """Perfil de self.df; calculado na hora se o de segundo plano ainda não chegou."""
+        if self.profile is None or not self.profile.matches(self.df):
+            self.profile = profile_frame(self.df)
+        return self.profile
+
+    # ---------- watch mode ----------
+    def toggle_watch(self):
+        if self.file_watcher is not None:
+            self.file_watcher.stop()
+            self.file_watcher = None
+        if not self.watch_var.get() or not getattr(self, 'current_file', None):
+            return
+        if self.streaming_source:
+            self.status_lbl.config(text="Watch mode is not available for streamed CSVs.")
+            return
+        self.file_watcher = FileWatcher(
+            self.current_file, lambda change: self._post(self._on_file_change, change),
+            offset=self.current_file_size).start()
+
+    def _on_file_change(self, change):
+        """Incorpora a mudança do arquivo e refaz a análise (uma vez por rajada de gravações)."""
+        if self.file_watcher is None or change.path != self.current_file:
+            return
+        try:
+            if change.kind == 'append':
+                if change.rows is None or change.rows.empty:
+                    return
+                old = self.df
+                # linhas antigas ficam nos arrays do buffer: custo só das novas
+                if self.append_buffer is None or self.append_buffer.frame is not old:
+                    self.append_buffer = AppendBuffer(old)
+                self.df = self.append_buffer.append(change.rows)
+                # momentos por grupo atualizados só com as linhas novas
+                if self.analysis_view is not None and self.analysis_view.source is old:
+                    self.analysis_view = self.analysis_view.extend(self.df, change.rows)
+                if self.factor_view is not None and self.factor_view.source is old:
+                    self.factor_view = self.factor_view.extend(self.df, change.rows)
+                msg = f"{len(change.rows):,} new rows"
+            else:
+                self.df = self._read_current()
+                self.analysis_view = self.factor_view = None
+                self.append_buffer = None
+                msg = "file changed, reloaded"
+        except Exception as e:
+            self.status_lbl.config(text=f"Watch: could not read {os.path.basename(change.path)} ({e})")
+            return
+        # offset do watcher: fim da última linha completa lida (não o tamanho do arquivo)
+        self.current_file_size = self.file_watcher.offset
+        self.data_grid.set_dataframe(self.df, keep_position=True)
+        self.start_profile(populate=False)
+        self.status_lbl.config(text=f"Watch: {msg} ({len(self.df):,} rows)")
+        self._auto_refresh()
+
+    def _read_current(self):
+        """Relê current_file (aba atual, no caso do Excel)."""
+        ext = os.path.splitext(self.current_file.lower())[1]
+        if ext in (".xlsx", ".xls"):
+            return get_workbook_cache().sheet(self.current_file, self.current_sheet)
+        if ext in COLUMNAR_EXTENSIONS:
+            return categorize_columns(read_columnar(self.current_file))
+        return read_csv_fast(self.current_file)
+
+    def _auto_refresh(self):
+        # só refaz se já houve uma análise; o gráfico é refeito se já havia um
+        if getattr(self, 'analysis_df', None) is None:
+            return
+        if self.stats_job is not None and not self.stats_job.done:
+            self.refresh_pending = True
+            return
+        self.auto_chart = self.fig is not None
+        self.compute_stats_thread()
+
     def populate_columns(self):
         if self.df is None:
             return
-        cols = list(self.df.columns)
+        profile = self._current_profile()
+        cols = profile.names()
         self.group_col_cb['values'] = cols
         self.value_col_cb['values'] = cols
-        numeric_cols = [
-            c for c in cols if pd.api.types.is_numeric_dtype(self.df[c])]
-        cat_cols = [
-            c for c in cols if not pd.api.types.is_numeric_dtype(self.df[c])]
+        numeric_cols = profile.numeric_columns()
+        cat_cols = profile.categorical_columns()
         if numeric_cols:
             self.value_col_cb.set(numeric_cols[0])
         if cat_cols:
             self.group_col_cb.set(cat_cols[0])
-            values = self.df[cat_cols[0]].dropna().unique().tolist()
-            self.control_cb['values'] = values
-            if values:
-                self.control_cb.set(values[0])
+            self.on_group_col_select()
 
-    def display_dataframe_preview(self):
-        for c in self.tree['columns']:
-            self.tree.heading(c, text="")
-        for r in self.tree.get_children():
-            self.tree.delete(r)
-        if self.df is None:
+    def on_group_col_select(self, event=None):
+        """Lista de controles = níveis da coluna de grupo (do perfil)."""
+        if self.df is None or self.profile is None:
             return
-        cols = list(self.df.columns)[:6]
-        self.tree['columns'] = cols
-        self.tree['show'] = 'headings'
-        for c in cols:
-            self.tree.heading(c, text=c)
-            self.tree.column(c, width=120, anchor='w')
-        for _, row in self.df.head(200).iterrows():
-            vals = [self._format_val(row.get(c)) for c in cols]
-            self.tree.insert("", tk.END, values=vals)
-
-    def _format_val(self, v):
-        if pd.isna(v):
-            return ""
-        if isinstance(v, float):
-            return f"{v:.6g}"
-        return str(v)
+        values = self.profile.levels(self.group_col_cb.get())
+        self.control_cb['values'] = values
+        if values and self.control_cb.get() not in values:
+            self.control_cb.set(values[0])
+
+    def display_dataframe_preview(self):
+        self.data_grid.set_dataframe(self.df)
 
     # ---------- compute stats ----------
     def compute_stats_thread(self):
-        t = threading.Thread(target=self.compute_stats, daemon=True)
-        t.start()
+        if self.stats_job is not None and not self.stats_job.done:
+            self.status_lbl.config(text="A calculation is already running (Cancel to stop it).")
+            return
+        name = "All tests" if self.run_all_var.get() else self.test_var.get()
+        self.stats_job = Job(self.compute_stats, name=name).start()
+        self.cancel_btn.config(state='normal')
+        self.after(200, self._poll_stats_job)
+
+    def _poll_stats_job(self):
+        """Mostra etapa e tempo decorrido do job até ele terminar."""
+        job = self.stats_job
+        if job is None:
+            return
+        if job.done:
+            self.cancel_btn.config(state='disabled')
+            if self.refresh_pending:
+                self.refresh_pending = False
+                self._auto_refresh()
+            elif self.auto_chart:
+                self.auto_chart = False
+                if not job.cancelled and self.analysis_df is not None:
+                    self.generate_chart_thread()
+            return
+        # na etapa 'report' o próprio compute_stats escreve a mensagem final
+        if job.stage != "report":
+            self.status_lbl.config(text=f"{job.name}: {job.stage} ({job.elapsed:.1f} s)")
+        self.after(200, self._poll_stats_job)
+
+    def cancel_stats(self):
+        if self.stats_job is not None and not self.stats_job.done:
+            self.stats_job.cancel()
+            self.status_lbl.config(text="Cancelling...")
 
     def compute_stats(self):
         self.status_lbl.config(text="Calculating...")
-        self.pmap_pairwise = {}
-        self.pmap_vs_control = {}
+        set_stage("prepare")
+        self.pairwise = None
         self.control_selected = None
         try:
             if self.df is None:
@@ -347,42 +604,76 @@ class StatApp(tk.Tk):
             fator_col = None
             if not group_col or not value_col:
                 raise RuntimeError("Choose valid columns.")
-            df = self.df[[group_col, value_col]].dropna().copy()
-            df[group_col] = df[group_col].astype(str)
-            df[value_col] = pd.to_numeric(df[value_col], errors='coerce')
-            df = df.dropna(subset=[value_col])
-            summ = summary_by_group(df, group_col, value_col)
+            if self.streaming_source:
+                self._compute_streaming_summary(group_col, value_col)
+                return
+            # códigos do grupo + valores válidos, sem cópias intermediárias; a mesma
+            # visão (e o GroupedData dela) é reaproveitada enquanto df e colunas não mudam
+            self.analysis_view = analysis_view(self.df, group_col, value_col, previous=self.analysis_view)
+            df = self.analysis_view.frame
+            self.grouped = self.analysis_view.grouped
+            # IC bootstrap no resumo quando for usado nas barras de erro (fica em cache no grouped)
+            ci = 0.95 if self._error_bars_mode() == "ci" else None
+            # em série (n_jobs=1): abrir um pool de processos por cálculo custa mais que o bootstrap
+            summ = summary_by_group(df, group_col, value_col, grouped=self.grouped, ci=ci)
             test = self.test_var.get()
             alpha = float(self.pvar.get())
+            backend = self._backend_for(test)
             result_text = [
                 f"Summary by group:\n{summ.to_string(index=False)}\n\n"]
-
-            # ---------------- Tukey (via R) ----------------
-            if test == "Tukey":
+            if self.backend_var.get() == 'r' and backend != 'r':
+                result_text.append(
+                    "R backend unavailable for this test; using native engine.\n\n")
+
+            # ---------------- all tests (em paralelo) ----------------
+            if self.run_all_var.get():
+                specs = [("Tukey", "tukey_test",
+                          {"alpha": alpha, "backend": self._backend_for("Tukey"), "timeout": 120})]
+                if control:
+                    specs.append(("Dunnett", "dunnett_test",
+                                  {"control_label": control, "alpha": alpha,
+                                   "backend": self._backend_for("Dunnett"), "timeout": 180}))
+                    specs.append(("T-test", "pairwise_ttests_vs_control",
+                                  {"control_label": control, "alpha": alpha, "p_adjust_method": 'holm',
+                                   "backend": self._backend_for("T-test"), "timeout": 120}))
+                else:
+                    result_text.append(
+                        "No control group selected: Dunnett and T-test skipped.\n\n")
+                results = run_tests_parallel(df, group_col, value_col, specs, grouped=self.grouped)
+                for method, res in results.items():
+                    if isinstance(res, Exception):
+                        result_text.append(f"{method} failed: {res}\n\n")
+                    else:
+                        result_text.append(f"{method} results:\n{res.to_string(index=False)}\n\n")
+                ok = {m: r for m, r in results.items() if isinstance(r, pd.DataFrame)}
+                self.last_stats_df = merge_results(ok)
+                self.last_summary_df = summ
+                self.last_test_method = " + ".join(ok) or None
+                # anotações do gráfico seguem o teste selecionado nos radiobuttons;
+                # Tukey é todos-contra-todos: sem controle (como no ramo Tukey abaixo)
+                vs_control = test in ("Dunnett", "T-test")
+                if vs_control:
+                    self.mode = 'control'
+                if test in ok:
+                    self.pairwise = PairwiseMatrix.from_result(
+                        ok[test], control if vs_control else None, labels=summ[group_col])
+
+            # ---------------- Tukey ----------------
+            elif test == "Tukey":
                 try:
-                    tk_res = tukey_test_r(
-                        df, group_col, value_col, alpha=alpha, timeout=120)
+                    tk_res = tukey_test(
+                        df, group_col, value_col, alpha=alpha, backend=backend, timeout=120,
+                        grouped=self.grouped)
+                except JobCancelled:
+                    raise
                 except Exception as e:
-                    raise RuntimeError(f"Tukey (R) falhou: {e}")
-                result_text.append("Tukey HSD results (R):\n")
+                    raise RuntimeError(f"Tukey falhou: {e}")
+                result_text.append("Tukey HSD results:\n")
                 result_text.append(tk_res.to_string(index=False))
                 self.last_stats_df = tk_res
                 self.last_summary_df = summ
-                self.last_test_method = "Tukey (R)"
-                # fill pairwise pmap
-                pcol = find_pvalue_column(tk_res)
-                comp_col = 'comparison' if 'comparison' in tk_res.columns else tk_res.columns[
-                    0]
-                for _, row in tk_res.iterrows():
-                    comp = str(row.get(comp_col, ''))
-                    g1, g2 = parse_pair_name_for_group(comp)
-                    p = row.get(pcol) if pcol in row.index else None
-                    try:
-                        p = float(p)
-                    except:
-                        p = None
-                    if g1 and g2:
-                        self.pmap_pairwise[frozenset({str(g1), str(g2)})] = p
+                self.last_test_method = "Tukey"
+                self.pairwise = PairwiseMatrix.from_result(tk_res, labels=summ[group_col])
 
             # ---------------- T-test ----------------
             elif test == "T-test":
@@ -402,129 +693,76 @@ class StatApp(tk.Tk):
                         raise RuntimeError(
                             "Mode Classic t-test requires exactly 2 groups in the selected column.")
                     gA, gB = unique_groups[0], unique_groups[1]
-                    # call R t.test pair (we have simpler pairwise wrapper)
-                    tt = pairwise_ttests_vs_control_r(
-                        df, group_col, value_col, control_label=gA, alpha=alpha, p_adjust_method='holm', timeout=120)
+                    # pairwise wrapper with control=gA (single comparison)
+                    tt = pairwise_ttests_vs_control(
+                        df, group_col, value_col, control_label=gA, alpha=alpha, p_adjust_method='holm', backend=backend, timeout=120,
+                        grouped=self.grouped)
                     # if we did control=gA it returns comparisons gA vs other(s). For classic that will be a single row.
-                    result_text.append("T-test (R) results:\n")
+                    result_text.append("T-test results:\n")
                     result_text.append(tt.to_string(index=False))
                     self.last_stats_df = tt
                     self.last_summary_df = summ
-                    self.last_test_method = f"T-test (R, mode={self.mode})"
-                    # if one comparison, extract p and create pairwise map
-                    for _, row in tt.iterrows():
-                        comp = str(row.get('comparison', ''))
-                        g1, g2 = parse_pair_name_for_group(comp)
-                        p = row.get('p_adj') if 'p_adj' in row.index else row.get(
-                            'p_raw', None)
-                        try:
-                            p = float(p)
-                        except:
-                            p = None
-                        if g1 and g2:
-                            self.pmap_pairwise[frozenset(
-                                {str(g1), str(g2)})] = p
-                            # also fill vs_control map (if control present)
-                            ctrl = g1 if 'vs' in comp and comp.startswith(
-                                str(g1)) else None
-                            if ctrl:
-                                other = g2
-                                self.pmap_vs_control[str(other)] = p
+                    self.last_test_method = f"T-test (mode={self.mode})"
+                    self.pairwise = PairwiseMatrix.from_result(tt, control=gA, labels=summ[group_col])
 
                 elif self.mode == 'chipboard':
                     if not len(unique_groups) != 2:
                         raise RuntimeError(
                             "Choose the column with the factors in group_col.")
 
-                    cols = list(self.df.columns)
-                    cat_cols = [
-                        c for c in cols if not pd.api.types.is_numeric_dtype(self.df[c])]
-                    if cat_cols:
-                        for col in cat_cols:
-                            groups = self.df[col].dropna().astype(
-                                str).unique().tolist()
-                            try:
-                                if len(groups) == 2 and control in groups:
-                                    fator_col = col
-                                    df = self.df[[
-                                        fator_col, group_col, value_col]].dropna().copy()
-                                    break
-                            except:
-                                raise RuntimeError(
-                                    "Your table must contain at least one column with 2 unique treatments")
-
-                    tt = pairwise_ttests_vs_control_r(
-                        df, group_col, value_col, control_label=control, alpha=alpha, timeout=120, fator_col=fator_col)
-                    result_text.append(f"T-test (R) mode two-by-two:\n")
+                    # fator de 2 níveis que contém o controle, lido do perfil das colunas
+                    fator_col = self._current_profile().two_level_factor(containing=control)
+                    grouped = self.grouped
+                    if fator_col:
+                        # visão grupo x fator, sem copiar o quadro (reaproveitada entre cliques)
+                        self.factor_view = analysis_view(self.df, group_col, value_col,
+                                                         fator_col=fator_col, previous=self.factor_view)
+                        df, grouped = self.factor_view.frame, self.factor_view.grouped
+
+                    tt = pairwise_ttests_vs_control(
+                        df, group_col, value_col, control_label=control, alpha=alpha, backend=backend, timeout=120,
+                        fator_col=fator_col, grouped=grouped)
+                    result_text.append(f"T-test mode two-by-two:\n")
                     result_text.append(tt.to_string(index=False))
                     self.last_stats_df = tt
                     self.last_summary_df = summ
-                    self.last_test_method = "T-test (R, two-by-two)"
+                    self.last_test_method = "T-test (two-by-two)"
 
                 else:
                     # control vs others (explicit)
                     if not control:
                         raise RuntimeError(
                             "Choose a control group for T-test (control mode).")
-                    tt = pairwise_ttests_vs_control_r(
-                        df, group_col, value_col, control_label=control, alpha=alpha, p_adjust_method='holm', timeout=120)
-                    result_text.append(f"T-test (R) {control} vs others:\n")
+                    tt = pairwise_ttests_vs_control(
+                        df, group_col, value_col, control_label=control, alpha=alpha, p_adjust_method='holm', backend=backend, timeout=120,
+                        grouped=self.grouped)
+                    result_text.append(f"T-test {control} vs others:\n")
                     result_text.append(tt.to_string(index=False))
                     self.last_stats_df = tt
                     self.last_summary_df = summ
-                    self.last_test_method = "T-test (R, control-vs-others)"
-                    pcol = find_pvalue_column(tt) or (
-                        'p_adj' if 'p_adj' in tt.columns else None)
-                    for _, row in tt.iterrows():
-                        comp = row.get('comparison', '')
-                        g1, g2 = parse_pair_name_for_group(
-                            comp, control_label=control)
-                        other = g2 if g1 == control else (
-                            g1 if g2 == control else None)
-                        p = row.get(
-                            'p_adj') if 'p_adj' in row.index else row.get(pcol)
-                        try:
-                            p = float(p)
-                        except:
-                            p = None
-                        self.pmap_pairwise[frozenset({str(g1), str(g2)})] = p
-                        if other:
-                            self.pmap_vs_control[str(other)] = p
-
-            # ---------------- Dunnett (via R) ----------------
+                    self.last_test_method = "T-test (control-vs-others)"
+                    self.pairwise = PairwiseMatrix.from_result(tt, control=control, labels=summ[group_col])
+
+            # ---------------- Dunnett ----------------
             elif test == "Dunnett":
                 if not control:
                     raise RuntimeError("Choose a control group for Dunnett.")
                 try:
-                    dunnett_res = dunnett_test_r(
-                        df, group_col, value_col, control_label=control, alpha=alpha, timeout=180)
+                    dunnett_res = dunnett_test(
+                        df, group_col, value_col, control_label=control, alpha=alpha, backend=backend, timeout=180,
+                        grouped=self.grouped)
+                except JobCancelled:
+                    raise
                 except Exception as e:
                     # bubble-up error but provide helpful message
-                    raise RuntimeError(f"Dunnett (R) falhou: {e}")
-                result_text.append("Dunnett results (R):\n")
+                    raise RuntimeError(f"Dunnett falhou: {e}")
+                result_text.append("Dunnett results:\n")
                 result_text.append(dunnett_res.to_string(index=False))
                 self.last_stats_df = dunnett_res
                 self.last_summary_df = summ
-                self.last_test_method = "Dunnett (R)"
-                pcol = find_pvalue_column(dunnett_res)
-                comp_col = 'comparison' if 'comparison' in dunnett_res.columns else dunnett_res.columns[
-                    0]
-                for _, row in dunnett_res.iterrows():
-                    comp = str(row.get(comp_col, ''))
-                    g1, g2 = parse_pair_name_for_group(
-                        comp, control_label=control)
-                    other = g2 if g1 == control else (
-                        g1 if g2 == control else None)
-                    p = None
-                    if pcol and pcol in row.index:
-                        try:
-                            p = float(row[pcol])
-                        except:
-                            p = None
-                    if g1 and g2:
-                        self.pmap_pairwise[frozenset({str(g1), str(g2)})] = p
-                    if other:
-                        self.pmap_vs_control[str(other)] = p
+                self.last_test_method = "Dunnett"
+                self.pairwise = PairwiseMatrix.from_result(
+                    dunnett_res, control=control, labels=summ[group_col])
 
             else:
                 result_text.append("Test not implemented.\n")
@@ -532,19 +770,67 @@ class StatApp(tk.Tk):
                 self.last_summary_df = summ
                 self.last_test_method = None
 
+            set_stage("report")
             self.analysis_df = df
             self.group_col_name = group_col
             self.value_col_name = value_col
             self.fator_col_name = fator_col if fator_col and self.mode == 'chipboard' else None
             self.stats_text.delete("1.0", tk.END)
             self.stats_text.insert(tk.END, "\n".join(result_text))
-            self.status_lbl.config(text="Calculation completed.")
+            cache = get_cache().stats()
+            self.status_lbl.config(
+                text=f"Calculation completed. (cache: {cache['hits']} hits / {cache['misses']} misses)")
+        except JobCancelled:
+            self.status_lbl.config(text="Calculation cancelled.")
         except Exception as e:
             self.status_lbl.config(text=f"Erro: {e}")
             tb = traceback.format_exc()
             messagebox.showerror("Erro", f"{e}\n\n{tb}")
 
+    def _compute_streaming_summary(self, group_col, value_col):
+        """Resumo por grupo do CSV inteiro, lido em blocos (stats/streaming.py)."""
+        def progress(rows):
+            set_stage(f"stream ({rows:,} rows)")
+
+        summ = streaming_summary_csv(self.streaming_source, group_col, value_col, progress=progress)
+        self.grouped = None
+        result_text = [
+            f"Summary by group (streamed from {os.path.basename(self.streaming_source)}):\n"
+            f"{summ.to_string(index=False)}\n\n"
+            "Median from a mergeable quantile sketch (approximate).\n\n"]
+
+        # Tukey/Dunnett/Welch só precisam de count/mean/std por grupo: rodam sobre o resumo
+        set_stage("compute")
+        test = self.test_var.get()
+        alpha = float(self.pvar.get())
+        control = self.control_selected
+        res = None
+        if test == "Tukey":
+            res = tukey_test(None, group_col, value_col, alpha=alpha, summary=summ)
+            self.pairwise = PairwiseMatrix.from_result(res, labels=summ[group_col])
+        elif test in ("Dunnett", "T-test") and control and self.mode != 'chipboard':
+            func = dunnett_test if test == "Dunnett" else pairwise_ttests_vs_control
+            res = func(None, group_col, value_col, control_label=control, alpha=alpha, summary=summ)
+            self.pairwise = PairwiseMatrix.from_result(res, control=control, labels=summ[group_col])
+        if res is not None:
+            result_text.append(f"{test} results (from the group summary):\n{res.to_string(index=False)}")
+        elif test in ("Dunnett", "T-test"):
+            result_text.append(
+                f"{test} on a streamed file needs a control group (two-by-two mode needs the full data).")
+
+        set_stage("report")
+        self.last_summary_df = summ
+        self.last_stats_df = res
+        self.last_test_method = test if res is not None else None
+        self.analysis_df = None
+        self.stats_text.delete("1.0", tk.END)
+        self.stats_text.insert(tk.END, "".join(result_text))
+        self.status_lbl.config(text=f"Streaming summary completed ({int(summ['count'].sum()):,} rows).")
+
     # ---------- plotting ----------
+    def _error_bars_mode(self):
+        return ERROR_BAR_LABELS.get(self.error_bars_cb.get(), "sem")
+
     def pick_color(self):
         c = colorchooser.askcolor(
             title="Choose color", initialcolor=self.bar_color)[1]
@@ -573,7 +859,8 @@ class StatApp(tk.Tk):
 
         test = self.test_var.get()
         if self.mode == 'chipboard' and test == "T-test":
-            self.fig = generate_multi_barplot(
+            plotter = generate_multi_barplot
+            kwargs = dict(
                 df=self.analysis_df,
                 x_col=self.group_col_name,
                 group_col=self.fator_col_name,
@@ -584,16 +871,17 @@ class StatApp(tk.Tk):
                 alpha=float(self.pvar.get()),
                 figsize=(w_in, h_in) if (w_in and h_in) else None,
                 fontsize=int(self.font_spin.get()),
+                error_bars=self._error_bars_mode(),
             )
 
         else:
-            self.fig = generate_barplot(
+            plotter = generate_barplot
+            kwargs = dict(
                 df=self.analysis_df,
                 group_col=self.group_col_name,
                 value_col=self.value_col_name,
                 bar_color=self.bar_color,
-                pmap_pairwise=self.pmap_pairwise,
-                pmap_vs_control=self.pmap_vs_control,
+                pmap_pairwise=self.pairwise,
                 control=self.control_selected,
                 alpha=float(self.pvar.get()),
                 show_legend=self.legend_var.get(),
@@ -603,22 +891,18 @@ class StatApp(tk.Tk):
                 figsize=(w_in, h_in) if (w_in and h_in) else None,
                 fontsize=int(self.font_spin.get()),
                 bracket_scope=self.bracket_scope.get(),
-                color_mode=self.color_mode_var.get()
+                color_mode=self.color_mode_var.get(),
+                grouped=self.grouped,
+                error_bars=self._error_bars_mode()
             )
-        # embed figure
-        """
-        """
+        # mesmos dados/estatísticas: só título, rótulos, fonte e cores mudam no gráfico atual
+        if self.chart is not None and self.chart.matches(plotter, **kwargs):
+            self.chart.update(**kwargs)
+        else:
+            self.chart = plotter(**kwargs)
+        self.fig = self.chart.fig
 
+        # prévia na resolução da tela; o DPI do spinbox só é usado ao salvar/exportar
         self.plot_tab.set_figure(self.fig, int(self.dpi_spin.get()), (w_in, h_in))
-
-        
-        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-        if self.canvas_plot:
-            self.canvas_plot.get_tk_widget().destroy()
-            self.canvas_plot = None
-        canvas = FigureCanvasTkAgg(self.fig, master=self.plot_frame)
-        canvas.draw()
-        widget = canvas.get_tk_widget()
-        widget.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
-        self.canvas_plot = canvas
+        self.notebook.select(self.tab_plot)
 
@@ -19,9 +19,16 @@ class PlotTab(ttk.Frame):
     - embedded canvas + matplotlib navigation toolbar
     - buttons to save the current figure (delegates to filedialog)
     - controls to toggle legend deduplication and automatic placement
+    - zoom levels ("Fit" scales the figure to the viewport)
     - a status label
+
+    The preview is rasterized at screen resolution (times the zoom), so
+    redraws stay cheap; the export DPI given to set_figure is only used
+    when the image is saved.
     """
 
+    ZOOM_LEVELS = ("Fit", "50%", "75%", "100%", "150%", "200%")
+
     def __init__(self, parent, **kwargs):
         super().__init__(parent, **kwargs)
         self.parent = parent
@@ -30,8 +37,9 @@ class PlotTab(ttk.Frame):
         else:
             self.fig = None
         self.canvas_plot = None
-        self.dpi = 300
+        self.dpi = 300  # export dpi (used only when saving)
         self.figsize = (8, 8)  # default figsize in inches
+        self._pending = None
 
         # Top controls
         ctrl = ttk.Frame(self)
@@ -44,15 +52,33 @@ class PlotTab(ttk.Frame):
 
         ttk.Button(ctrl, text="Refresh", command=self._refresh).pack(side=tk.LEFT, padx=6)
 
+        ttk.Label(ctrl, text="Zoom:").pack(side=tk.LEFT, padx=(12, 2))
+        self.zoom_var = tk.StringVar(value="Fit")
+        zoom_cb = ttk.Combobox(ctrl, textvariable=self.zoom_var, values=self.ZOOM_LEVELS,
+                               state='readonly', width=6)
+        zoom_cb.pack(side=tk.LEFT)
+        zoom_cb.bind("<<ComboboxSelected>>", lambda e: self._render())
+
         # status
         self.status = ttk.Label(self, text="No figure loaded.")
         self.status.pack(side=tk.BOTTOM, fill=tk.X, padx=6, pady=4)
 
-        # canvas container
+        # canvas container: a scrollable viewport holding the figure canvas at preview size
         self.canvas_container = ttk.Frame(self)
         self.canvas_container.pack(fill=tk.BOTH, expand=True)
+        self.viewport = tk.Canvas(self.canvas_container, highlightthickness=0)
+        vbar = ttk.Scrollbar(self.canvas_container, orient="vertical", command=self.viewport.yview)
+        hbar = ttk.Scrollbar(self.canvas_container, orient="horizontal", command=self.viewport.xview)
+        self.viewport.configure(yscrollcommand=vbar.set, xscrollcommand=hbar.set)
+        self.viewport.grid(row=0, column=0, sticky="nsew")
+        vbar.grid(row=0, column=1, sticky="ns")
+        hbar.grid(row=1, column=0, sticky="ew")
+        self.canvas_container.rowconfigure(0, weight=1)
+        self.canvas_container.columnconfigure(0, weight=1)
+        self.viewport.bind("<Configure>", self._on_viewport_resize)
 
     def set_figure(self, fig, dpi, figsize):
+        """Show fig in the preview; dpi is the export resolution, applied only by save_image."""
         self.fig = fig
         self.dpi = dpi
         self.figsize = figsize
@@ -61,31 +87,55 @@ class PlotTab(ttk.Frame):
     def save_image(self):
         save_chart(fig=self.fig, figsize_inches=self.figsize, dpi_override=self.dpi)
 
+    def preview_dpi(self):
+        """Resolution of the on-screen preview: screen DPI times the zoom, or whatever fits the viewport."""
+        w_in, h_in = self.figsize
+        zoom = self.zoom_var.get()
+        if zoom == "Fit":
+            width = max(self.viewport.winfo_width(), 1)
+            height = max(self.viewport.winfo_height(), 1)
+            return max(min(width / w_in, height / h_in), 10.0)
+        return self.winfo_fpixels('1i') * float(zoom.rstrip('%')) / 100.0
+
     def update_figure(self):
         if self.fig is None:
             self.status.config(text="No figure loaded.")
             return
 
-        # Ajusta o tamanho do canvas para o tamanho da figura
+        if self.canvas_plot is None or self.canvas_plot.figure is not self.fig:
+            if self.canvas_plot:
+                self.canvas_plot.get_tk_widget().destroy()
+                self.canvas_plot = None
+            self.canvas_plot = FigureCanvasTkAgg(self.fig, master=self.viewport)
+            self.viewport.delete("all")
+            self.viewport.create_window(0, 0, anchor='nw', window=self.canvas_plot.get_tk_widget())
+        self._render()
+
+    def _render(self):
+        """Rasterize the figure at preview resolution; the export size in inches is left untouched."""
+        self._pending = None
+        if self.fig is None or self.canvas_plot is None:
+            return
         w_in, h_in = self.figsize
-        dpi = self.dpi
-        width_px, height_px = int(w_in * dpi), int(h_in * dpi)
-
-        if self.canvas_plot:
-            self.canvas_plot.get_tk_widget().destroy()
-            self.canvas_plot = None
-
-        # recria canvas respeitando figsize/dpi
-        self.canvas_plot = FigureCanvasTkAgg(self.fig, master=self.canvas_container)
-        widget = self.canvas_plot.get_tk_widget()
-        widget.config(width=width_px, height=height_px)  # trava no tamanho definido
-        widget.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
-
-        self.canvas_plot.draw()
+        dpi = self.preview_dpi()
+        self.fig.set_size_inches(w_in, h_in, forward=False)
+        self.fig.set_dpi(dpi)
+        width_px, height_px = int(round(w_in * dpi)), int(round(h_in * dpi))
+        self.canvas_plot.get_tk_widget().config(width=width_px, height=height_px)
+        self.viewport.config(scrollregion=(0, 0, width_px, height_px))
+        self.canvas_plot.draw_idle()
+
+        export_px = f"{int(w_in * self.dpi)}×{int(h_in * self.dpi)}px"
         self.status.config(
-            text=f"Figure loaded ({w_in:.1f}×{h_in:.1f} in, {dpi} dpi → {width_px}×{height_px}px)."
+            text=f"Preview {self.zoom_var.get()} ({width_px}×{height_px}px)  |  "
+                 f"export {w_in:.1f}×{h_in:.1f} in, {self.dpi} dpi → {export_px}."
         )
 
+    def _on_viewport_resize(self, event):
+        # only "Fit" depends on the viewport; coalesce resize bursts into one redraw
+        if self.zoom_var.get() == "Fit" and self.fig is not None and self._pending is None:
+            self._pending = self.after_idle(self._render)
+
     def _refresh(self):
         """Re-run the legend dedupe/loc logic on the currently loaded figure and redraw."""
         if self.fig is None:
@@ -94,7 +144,7 @@ class PlotTab(ttk.Frame):
         if self.best_loc_var.get():
             for ax in self.fig.get_axes():
                 ax.legend(loc='best', frameon=False)
-        self.canvas_plot.draw()
+        self.canvas_plot.draw_idle()
         self.status.config(text="Refreshed figure.")
 
 